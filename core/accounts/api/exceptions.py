@@ -0,0 +1,23 @@
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler
+
+from accounts.hashing import PasswordHashingBusy
+
+
+class PasswordHashingUnavailable(APIException):
+    status_code = 503
+    default_detail = _('Too many passwords are hashed, try again later.')
+    default_code = 'password_hashing_busy'
+
+
+def api_exception_handler(exc, context):
+    """
+    DRF's exception handler, which also answers a full password hashing
+    pool with a 503.
+    """
+
+    if isinstance(exc, PasswordHashingBusy):
+        exc = PasswordHashingUnavailable()
+    return exception_handler(exc, context)
@@ -1,15 +1,37 @@
 from django.contrib.auth import get_user_model, authenticate
 
 from rest_framework import serializers
+from rest_framework.exceptions import Throttled
 from rest_framework.status import HTTP_401_UNAUTHORIZED, HTTP_400_BAD_REQUEST
 
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer, TokenRefreshSerializer, TokenVerifySerializer
+)
 from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+
+from ....revocations import is_token_revoked, revoke_token
+from ....throttling import check_login_attempt, login_succeeded
 
 
 User = get_user_model()
 
 
+def throttle_login(request, endpoint, email):
+    """
+    Reject a login attempt over the budgets of its endpoint, before its
+    password is hashed by authenticate().
+    :param request: login request
+    :param endpoint: name of the budget in settings.LOGIN_THROTTLE_RATES
+    :param email: email the attempt logs in with
+    """
+
+    wait = check_login_attempt(request, endpoint, email)
+    if wait is not None:
+        raise Throttled(wait=wait)
+
+
 # Login For Session Authentication
 class LoginSerializer(serializers.Serializer):
     """
@@ -18,6 +40,7 @@ class LoginSerializer(serializers.Serializer):
       * password.
     It will try to authenticate the user with when validated.
     """
+    throttle_endpoint = 'session'
     email = serializers.EmailField(max_length=128)
     password = serializers.CharField(
         max_length=255,
@@ -31,6 +54,7 @@ class LoginSerializer(serializers.Serializer):
         password = attrs.get('password')
 
         if email and password:
+            throttle_login(request, self.throttle_endpoint, email)
             user = authenticate(
                 request=request, email=email, password=password
             )
@@ -53,6 +77,7 @@ class LoginSerializer(serializers.Serializer):
 
         # We have a valid user, put it in the serializer's validated_data.
         # It will be used in the view.
+        login_succeeded(email)
         attrs['user'] = user
         return attrs
 
@@ -66,6 +91,7 @@ class CustomAuthTokenSerializer(serializers.Serializer):
       * token.
     It will try to authenticate to give a token to the user.
     """
+    throttle_endpoint = 'token'
     email = serializers.EmailField(
         label="Email",
         write_only=True
@@ -86,6 +112,9 @@ class CustomAuthTokenSerializer(serializers.Serializer):
         password = attrs.get('password')
 
         if email and password:
+            throttle_login(
+                self.context.get('request'), self.throttle_endpoint, email
+            )
             user = authenticate(
                 request=self.context.get('request'),
                 email=email,
@@ -112,6 +141,7 @@ class CustomAuthTokenSerializer(serializers.Serializer):
                 code=HTTP_401_UNAUTHORIZED
             )
 
+        login_succeeded(email)
         attrs['user'] = user
         return attrs
 
@@ -126,8 +156,13 @@ class CustomTokenObtainSerializer(TokenObtainPairSerializer):
       * username.
     It will try to authenticate to give a pair of tokens to the user.
     """
+    throttle_endpoint = 'jwt'
 
     def validate(self, attrs):
+        throttle_login(
+            self.context.get('request'), self.throttle_endpoint,
+            attrs.get(self.username_field)
+        )
         validated_data = super().validate(attrs)
 
         if not self.user.is_verified:
@@ -135,8 +170,56 @@ class CustomTokenObtainSerializer(TokenObtainPairSerializer):
                 'Verification: You are not verified your account yet.',
             )
 
+        login_succeeded(self.user.email)
         validated_data['user_id'] = self.user.id
         validated_data['email'] = self.user.email
         validated_data['username'] = self.user.username
 
         return validated_data
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    This serializer refuses to refresh a revoked token "JWT authentication".
+    A rotated refresh token is revoked, it can't be used twice.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if is_token_revoked(refresh):
+            raise InvalidToken('Token is revoked')
+
+        validated_data = super().validate(attrs)
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            revoke_token(refresh)
+
+        return validated_data
+
+
+class CustomTokenVerifySerializer(TokenVerifySerializer):
+    """
+    This serializer doesn't verify a revoked token "JWT authentication".
+    """
+
+    def validate(self, attrs):
+        validated_data = super().validate(attrs)
+        if is_token_revoked(UntypedToken(attrs['token'])):
+            raise InvalidToken('Token is revoked')
+
+        return validated_data
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """
+    This serializer defines one field for logout in "JWT authentication":
+      * refresh.
+    The refresh token is revoked until it expires.
+    """
+    refresh = serializers.CharField(write_only=True)
+
+    def validate(self, attrs):
+        attrs['refresh'] = RefreshToken(attrs['refresh'])
+        return attrs
+
+    def save(self):
+        revoke_token(self.validated_data['refresh'])
@@ -4,7 +4,13 @@ from django.contrib.auth import get_user_model
 from django.urls import reverse
 
 from rest_framework.test import APIClient
-from rest_framework.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED
+from rest_framework.status import (
+    HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_401_UNAUTHORIZED
+)
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from accounts.authentications import CachedJWTAuthentication
+from accounts.revocations import revoke_token
 
 
 User = get_user_model()
@@ -53,3 +59,70 @@ class TestAccountsAPIJWTAuthentication:
         response = api_client.post(path=url, data=data)
         assert response.status_code == status_code
         print(response.data)
+
+
+@pytest.fixture
+def token_pair(api_client, test_user):
+    test_user.is_verified = True
+    test_user.save()
+    response = api_client.post(
+        path=reverse("accounts:api-v1:jwt-create"),
+        data={"email": "test_email@test.com", "password": "far!@#$%"},
+    )
+    return response.data["access"], response.data["refresh"]
+
+
+@pytest.mark.django_db
+class TestAccountsAPIJWTRevocation:
+    def test_logout_revokes_refresh_token(self, api_client, token_pair):
+        access, refresh = token_pair
+        response = api_client.post(
+            path=reverse("accounts:api-v1:jwt-logout"),
+            data={"refresh": refresh},
+        )
+        assert response.status_code == HTTP_204_NO_CONTENT
+
+        response = api_client.post(
+            path=reverse("accounts:api-v1:jwt-refresh"),
+            data={"refresh": refresh},
+        )
+        assert response.status_code == HTTP_401_UNAUTHORIZED
+
+        response = api_client.post(
+            path=reverse("accounts:api-v1:jwt-verify"),
+            data={"token": refresh},
+        )
+        assert response.status_code == HTTP_401_UNAUTHORIZED
+
+    def test_logout_revokes_access_token_of_request(
+        self, api_client, token_pair
+    ):
+        access, refresh = token_pair
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        url = reverse("accounts:api-v1:jwt-logout")
+
+        response = api_client.post(path=url, data={"refresh": refresh})
+        assert response.status_code == HTTP_204_NO_CONTENT
+
+        response = api_client.post(path=url, data={"refresh": refresh})
+        assert response.status_code == HTTP_401_UNAUTHORIZED
+
+    def test_invalid_refresh_token_is_refused(self, api_client):
+        response = api_client.post(
+            path=reverse("accounts:api-v1:jwt-logout"),
+            data={"refresh": "not-a-token"},
+        )
+        assert response.status_code == HTTP_401_UNAUTHORIZED
+
+    def test_revocation_check_has_no_query(
+        self, token_pair, django_assert_num_queries
+    ):
+        access, refresh = token_pair
+        authentication = CachedJWTAuthentication()
+        with django_assert_num_queries(0):
+            validated_token = authentication.get_validated_token(access)
+
+        revoke_token(validated_token)
+        with django_assert_num_queries(0):
+            with pytest.raises(InvalidToken):
+                authentication.get_validated_token(access)
@@ -1,7 +1,5 @@
 import pytest
 
-from time import sleep
-
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
@@ -11,9 +9,7 @@ from rest_framework.status import (
     HTTP_400_BAD_REQUEST
 )
 from rest_framework_simplejwt.tokens import RefreshToken
-from mail_templated import EmailMessage
-
-from ....utils import EmailThread
+from accounts.utils import queue_email, send_due_emails
 
 User = get_user_model()
 
@@ -47,16 +43,15 @@ class TestAccountsAPIPasswordManagements:
         username = user.username
         urls = 'accounts/api/v1/reset_password/confirm/'
 
-        activation_email = EmailMessage(
+        queue_email(
             template_name='email/reset_password.tpl',
             context={
                 'user': username,
                 'token': f'{self.domain}{urls}{token}/',
             },
-            from_email='sender@example.com',
-            to=[email]
+            to=email
         )
-        EmailThread(activation_email).start()
+        send_due_emails()
 
     @pytest.mark.parametrize(
         'old_password, new_password, confirm_new_password, status_code', [
@@ -95,7 +90,7 @@ class TestAccountsAPIPasswordManagements:
 
         response = api_client.post(path=url, data=data)
 
-        sleep(1)
+        send_due_emails()
         assert response.status_code == HTTP_200_OK
 
         assert len(mailoutbox) == 1
@@ -122,4 +117,4 @@ class TestAccountsAPIPasswordManagements:
 
         # check token
         assert response.status_code == HTTP_202_ACCEPTED
-        assert mailoutbox[0].context['token'] == f'http://127.0.0.1:8000{url}'
+        assert f'http://127.0.0.1:8000{url}' in mailoutbox[0].body
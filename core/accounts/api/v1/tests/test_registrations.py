@@ -1,5 +1,3 @@
-from time import sleep
-
 import pytest
 
 from django.contrib.auth import get_user_model
@@ -11,12 +9,12 @@ from rest_framework.status import (
     HTTP_401_UNAUTHORIZED,
     HTTP_202_ACCEPTED,
     HTTP_200_OK,
+    HTTP_400_BAD_REQUEST,
 )
 
-from mail_templated import EmailMessage
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from ....utils import EmailThread
+from accounts.utils import queue_email, send_due_emails
 
 User = get_user_model()
 
@@ -50,16 +48,15 @@ class TestAccountsAPIRegistrations:
         username = "test_username"
         urls = "accounts/api/v1/activation/confirm/"
 
-        activation_email = EmailMessage(
+        queue_email(
             template_name="email/activation_account.tpl",
             context={
                 "user": username,
                 "token": f"{self.domain}{urls}{token}/",
             },
-            from_email="sender@example.com",
-            to=[email],
+            to=email,
         )
-        EmailThread(activation_email).start()
+        send_due_emails()
 
     @pytest.mark.parametrize(
         "email, username, password, confirm_password, status_code",
@@ -108,7 +105,7 @@ class TestAccountsAPIRegistrations:
         }
         response = api_client.post(path=url, data=data)
 
-        sleep(1)
+        send_due_emails()
         response_code = response.status_code
         assert response_code == status_code
 
@@ -136,7 +133,7 @@ class TestAccountsAPIRegistrations:
         response = api_client.get(path=url)
 
         # check token
-        assert mailoutbox[0].context["token"] == f"http://127.0.0.1:8000{url}"
+        assert f"http://127.0.0.1:8000{url}" in mailoutbox[0].body
         assert response.status_code == HTTP_202_ACCEPTED
 
     def test_accounts_api_activation_resend_view(
@@ -154,7 +151,28 @@ class TestAccountsAPIRegistrations:
 
         assert response.status_code == HTTP_200_OK
 
+        send_due_emails()
         assert len(mailoutbox) == 1
         mail = mailoutbox[0]
         assert mail.subject == "Email Verification"
         assert list(mail.to) == [test_user.email]
+
+    def test_accounts_api_activation_confirm_is_one_update(
+        self, api_client, test_user, django_assert_num_queries
+    ):
+        token = self.get_token_for_user(test_user)
+        url = reverse(
+            "accounts:api-v1:activation-confirm", kwargs={"token": token}
+        )
+
+        with django_assert_num_queries(1) as captured:
+            response = api_client.get(path=url)
+        assert response.status_code == HTTP_202_ACCEPTED
+        assert captured.captured_queries[0]["sql"].startswith("UPDATE")
+
+        test_user.refresh_from_db()
+        assert test_user.is_verified
+
+        with django_assert_num_queries(1):
+            response = api_client.get(path=url)
+        assert response.status_code == HTTP_400_BAD_REQUEST
@@ -1,5 +1,4 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
 
 from .views import (
     LoginGenericAPIView,
@@ -7,6 +6,9 @@ from .views import (
     CustomObtainAuthTokenView,
     DiscardAuthTokenAPIView,
     CustomTokenObtainPairView,
+    CustomTokenRefreshView,
+    CustomTokenVerifyView,
+    JWTLogoutGenericAPIView,
     ChangePasswordGenericAPIView,
     AccountActivationConfirmAPIView,
     AccountActivationResendGenericAPIView,
@@ -70,6 +72,13 @@ urlpatterns = [
     path(
         "jwt/create/", CustomTokenObtainPairView.as_view(), name="jwt-create"
     ),
-    path("jwt/refresh/", TokenRefreshView.as_view(), name="jwt-refresh"),
-    path("jwt/verify/", TokenVerifyView.as_view(), name="jwt-verify"),
+    path(
+        "jwt/refresh/", CustomTokenRefreshView.as_view(), name="jwt-refresh"
+    ),
+    path(
+        "jwt/verify/", CustomTokenVerifyView.as_view(), name="jwt-verify"
+    ),
+    path(
+        "jwt/logout/", JWTLogoutGenericAPIView.as_view(), name="jwt-logout"
+    ),
 ]
@@ -11,11 +11,17 @@ from rest_framework.status import (
     HTTP_401_UNAUTHORIZED
 )
 
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.views import (
+    TokenObtainPairView, TokenRefreshView, TokenVerifyView
+)
 
+from ....authentications import CachedJWTAuthentication
+from ....revocations import revoke_token
 from ..serializers import (
     LoginSerializer, CustomAuthTokenSerializer,
-    CustomTokenObtainSerializer,
+    CustomTokenObtainSerializer, CustomTokenRefreshSerializer,
+    CustomTokenVerifySerializer, TokenRevokeSerializer,
 )
 
 
@@ -31,7 +37,7 @@ class LoginGenericAPIView(GenericAPIView):
     serializer_class = LoginSerializer
 
     def post(self, request):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data['user']
             if user is not None and user.is_active:
@@ -88,3 +94,43 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     This view should be accessible also for unauthenticated users.
     """
     serializer_class = CustomTokenObtainSerializer
+
+
+class CustomTokenRefreshView(TokenRefreshView):
+    """
+    refresh view to get a new access token, revoked refresh tokens
+    are refused.
+    This view should be accessible also for unauthenticated users.
+    """
+    serializer_class = CustomTokenRefreshSerializer
+
+
+class CustomTokenVerifyView(TokenVerifyView):
+    """
+    verify view to check a token, revoked tokens are not valid.
+    This view should be accessible also for unauthenticated users.
+    """
+    serializer_class = CustomTokenVerifySerializer
+
+
+# Discard JWT Authentication
+class JWTLogoutGenericAPIView(GenericAPIView):
+    """
+    logout view for "JWT", it revokes the refresh token and the access
+    token of the request if it was authenticated with one.
+    This view should be accessible also for unauthenticated users.
+    """
+    authentication_classes = [CachedJWTAuthentication]
+    serializer_class = TokenRevokeSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as error:
+            raise InvalidToken(error.args[0])
+
+        serializer.save()
+        if request.auth is not None:
+            revoke_token(request.auth)
+        return Response(status=HTTP_204_NO_CONTENT)
@@ -1,5 +1,6 @@
-from django.contrib.auth import get_user_model
+from django.contrib.auth import get_user_model, update_session_auth_hash
 
+from rest_framework.authentication import SessionAuthentication
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -13,10 +14,10 @@ from jwt.exceptions import ExpiredSignatureError, InvalidSignatureError
 
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from mail_templated import EmailMessage
 from decouple import config
 
-from ....utils import EmailThread
+from ....sessions import logout_other_sessions
+from ....utils import queue_email
 from ..serializers import (
     ChangePasswordSerializer, ResetPasswordSerializer,
     ResetPasswordConfirmSerializer
@@ -57,6 +58,7 @@ class ResetPasswordConfirmGenericAPIView(GenericAPIView):
 
             user_obj.set_password(new_password)
             user_obj.save()
+            logout_other_sessions(user_obj)
             return Response(
                 {'new_password': 'Password changed successfully.'},
                 status=HTTP_202_ACCEPTED
@@ -87,16 +89,14 @@ class ResetPasswordGenericAPIView(GenericAPIView):
         domain = 'http://127.0.0.1:8000/'
         url = 'accounts/api/v1/reset_password/confirm/'
 
-        activation_email = EmailMessage(
+        queue_email(
             'email/reset_password.tpl',
             {
                 'user': username,
                 'token': f'{domain}{url}{token}/',
             },
-            'sender@example.com',
-            [email]
+            email
         )
-        EmailThread(activation_email).start()
         return Response(
             {
                 'detail': "We've emailed you a link for "
@@ -139,6 +139,13 @@ class ChangePasswordGenericAPIView(GenericAPIView):
 
             user_obj.set_password(new_password)
             user_obj.save()
+            # a browser session that changed the password stays logged in.
+            authenticator = request.successful_authenticator
+            if isinstance(authenticator, SessionAuthentication):
+                update_session_auth_hash(request, user_obj)
+                logout_other_sessions(user_obj, request)
+            else:
+                logout_other_sessions(user_obj)
             return Response(
                 {'new_password': 'Password changed successfully.'},
                 status=HTTP_202_ACCEPTED
@@ -1,4 +1,4 @@
-from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.contrib.auth import get_user_model
 
 from rest_framework.generics import GenericAPIView
@@ -10,15 +10,11 @@ from rest_framework.status import (
     HTTP_401_UNAUTHORIZED
 )
 
-from jwt import decode
 from jwt.exceptions import ExpiredSignatureError, InvalidSignatureError
 
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from mail_templated import EmailMessage
-from decouple import config
-
-from ....utils import EmailThread
+from ....utils import decode_activation_token, queue_email
 from ..serializers import (
     RegistrationModelSerializer, AccountActivationResendSerializer,
 )
@@ -41,27 +37,24 @@ class RegistrationGenericAPIView(GenericAPIView):
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            serializer.save()
-
             email = serializer.validated_data['email']
             username = serializer.validated_data['username']
-            user_obj = get_object_or_404(User, email=email)
-
-            token = self.get_token_for_user(user_obj)
-            domain = 'http://127.0.0.1:8000/'
-            url = 'accounts/api/v1/activation/confirm/'
-
-            activation_email = EmailMessage(
-                template_name='email/activation_account.tpl',
-                context={
-                    'user': username,
-                    'token': f'{domain}{url}{token}/',
-                },
-                from_email='sender@example.com',
-                to=[email]
-            )
 
-            EmailThread(activation_email).start()
+            with transaction.atomic():
+                user_obj = serializer.save()
+
+                token = self.get_token_for_user(user_obj)
+                domain = 'http://127.0.0.1:8000/'
+                url = 'accounts/api/v1/activation/confirm/'
+
+                queue_email(
+                    template_name='email/activation_account.tpl',
+                    context={
+                        'user': username,
+                        'token': f'{domain}{url}{token}/',
+                    },
+                    to=email
+                )
 
             data = {
                 'detail': 'Your activation email sent to your inbox.',
@@ -82,10 +75,7 @@ class AccountActivationConfirmAPIView(APIView):
     """
     def get(self, request, token, *args, **kwargs):
         try:
-            decoded_token = decode(
-                jwt=token, key=config('SECRET_KEY'), algorithms=['HS256']
-            )
-            user_id = decoded_token.get('user_id')
+            user_id = decode_activation_token(token)
         except ExpiredSignatureError:
             return Response(
                 {'detail': 'Your token has been expired.'},
@@ -97,16 +87,12 @@ class AccountActivationConfirmAPIView(APIView):
                 status=HTTP_400_BAD_REQUEST
             )
 
-        user = User.objects.get(pk=user_id)
-        if user.is_verified:
+        if not User.objects.activate(user_id):
             return Response(
                 {'detail': 'Your account has already verified.'},
                 status=HTTP_400_BAD_REQUEST
             )
 
-        user.is_verified = True
-        user.save()
-
         return Response(
             {'detail': 'Your account have been verified successfully.'},
             status=HTTP_202_ACCEPTED
@@ -131,16 +117,14 @@ class AccountActivationResendGenericAPIView(GenericAPIView):
         domain = 'http://127.0.0.1:8000/'
         url = 'accounts/api/v1/activation/confirm/'
 
-        activation_email = EmailMessage(
+        queue_email(
             'email/activation_account.tpl',
             {
                 'user': username,
                 'token': f'{domain}{url}{token}/',
             },
-            'sender@example.com',
-            [email]
+            email
         )
-        EmailThread(activation_email).start()
         return Response(
             {'detail': 'Your activation resend successfully.'},
             status=HTTP_200_OK
@@ -0,0 +1,94 @@
+from django.contrib.auth.backends import ModelBackend
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .principals import get_cached_user, get_cached_token_user_id
+from .revocations import is_token_revoked
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that loads the user of a session from the principal
+    cache, it is used by SessionAuthentication and the login required
+    views alike.
+    """
+
+    def get_user(self, user_id):
+        user_obj = get_cached_user(user_id)
+        if user_obj is not None and self.user_can_authenticate(user_obj):
+            return user_obj
+        return None
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that resolves the token key and its user through
+    the principal cache instead of a Token and User join.
+    """
+
+    def load_token(self, key):
+        model = self.get_model()
+        try:
+            return model.objects.select_related('user').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+    def authenticate_credentials(self, key):
+        user_id = get_cached_token_user_id(key, self.load_token)
+        user_obj = get_cached_user(user_id)
+        if user_obj is None or not user_obj.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        return user_obj, self.get_model()(key=key, user=user_obj)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that refuses revoked tokens and loads the user of
+    the token from the principal cache.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken(_('Token is revoked'))
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+
+        user_obj = get_cached_user(user_id)
+        if user_obj is None:
+            raise exceptions.AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+
+        if not user_obj.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # the password isn't cached, it is loaded for this check.
+            revoke_claim = validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+            if revoke_claim != get_md5_hash_password(user_obj.password):
+                raise exceptions.AuthenticationFailed(
+                    _("The user's password has been changed."),
+                    code='password_changed'
+                )
+
+        return user_obj
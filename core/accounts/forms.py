@@ -3,6 +3,9 @@ from django import forms
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 
+from .hashing import PasswordHashingBusy
+from .throttling import check_login_attempt, login_succeeded
+
 
 # Getting User Model
 
@@ -24,18 +27,42 @@ class AccountActivationResendForm(forms.Form):
 class CustomAuthenticationForm(AuthenticationForm):
     username = forms.CharField(required=False)
     email = forms.EmailField(max_length=255, required=True)
+    throttle_endpoint = 'form'
+    error_messages = {
+        **AuthenticationForm.error_messages,
+        'throttled': 'Too many login attempts, '
+                     'try again in %(wait)d seconds.',
+        'busy': 'Too many logins in progress, try again later.',
+    }
 
     def clean(self):
         email = self.cleaned_data.get('email')
         password = self.cleaned_data.get('password')
 
         if email is not None and password:
-            self.user_cache = authenticate(
-                self.request, email=email, password=password
+            wait = check_login_attempt(
+                self.request, self.throttle_endpoint, email
             )
+            if wait is not None:
+                raise forms.ValidationError(
+                    self.error_messages['throttled'],
+                    code='throttled',
+                    params={'wait': wait},
+                )
+
+            try:
+                self.user_cache = authenticate(
+                    self.request, email=email, password=password
+                )
+            except PasswordHashingBusy:
+                raise forms.ValidationError(
+                    self.error_messages['busy'], code='busy'
+                )
+
             if self.user_cache is None:
                 raise self.get_invalid_login_error()
             else:
                 self.confirm_login_allowed(self.user_cache)
+                login_succeeded(email)
 
         return self.cleaned_data
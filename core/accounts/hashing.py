@@ -0,0 +1,169 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    get_hasher, identify_hasher, is_password_usable, make_password
+)
+from django.utils.translation import gettext_lazy as _
+
+
+class PasswordHashingBusy(Exception):
+    """
+    Raised when no worker of the hashing pool is free in time. The api
+    exception handler and PasswordHashingBusyMiddleware answer it with a
+    503.
+    """
+
+    message = _('Too many passwords are hashed, try again later.')
+
+
+def _setup_worker():
+    # spawned workers start without django, DJANGO_SETTINGS_MODULE is
+    # inherited from the environment of the web process.
+    django.setup()
+
+
+def _check_password(password, encoded, preferred):
+    """
+    django's check_password without the setter, run in a worker.
+    :return: (is_correct, must_update)
+    """
+
+    preferred = get_hasher(preferred)
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False
+
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    is_correct = hasher.verify(password, encoded)
+    if not is_correct and not hasher_changed and must_update:
+        hasher.harden_runtime(password, encoded)
+    return is_correct, must_update
+
+
+class HashingPool:
+    """
+    Process pool that hashes and verifies passwords out of the request
+    thread. At most `workers` passwords are hashed at once and `queue_size`
+    more wait for a worker, a caller that can't get a place within
+    `timeout` seconds gets PasswordHashingBusy instead of a hash.
+    """
+
+    def __init__(self, workers, queue_size, timeout):
+        self.workers = workers
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.pid = os.getpid()
+        self.executor_lock = threading.Lock()
+        self.executor = self.start_executor()
+
+    def start_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_setup_worker,
+        )
+
+    def restart_executor(self, broken):
+        with self.executor_lock:
+            # another thread may have restarted it already.
+            if self.executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.executor = self.start_executor()
+
+    def run(self, function, *args):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PasswordHashingBusy()
+        try:
+            executor = self.executor
+            try:
+                return executor.submit(function, *args).result()
+            except BrokenProcessPool:
+                # a worker died and took the executor down with it, the
+                # password is hashed once more in a new one.
+                self.restart_executor(executor)
+                return self.executor.submit(function, *args).result()
+        finally:
+            self.slots.release()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    """
+    :return: HashingPool of this process, None when passwords are hashed
+        in the calling thread.
+    """
+
+    global _pool
+    if settings.PASSWORD_HASHING_WORKERS <= 0:
+        return None
+
+    # a forked web worker starts its own pool, the parent's can't be used.
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = HashingPool(
+                    settings.PASSWORD_HASHING_WORKERS,
+                    settings.PASSWORD_HASHING_QUEUE_SIZE,
+                    settings.PASSWORD_HASHING_TIMEOUT,
+                )
+    return _pool
+
+
+def hash_password(password, salt=None, hasher='default'):
+    """
+    make_password in the hashing pool.
+    :param password: raw password, None makes an unusable password
+    :return: encoded password.
+    """
+
+    pool = get_hashing_pool()
+    if password is None or pool is None:
+        return make_password(password, salt, hasher)
+    # the hasher is chosen with the settings of this process.
+    hasher = get_hasher(hasher).algorithm
+    return pool.run(make_password, password, salt, hasher)
+
+
+def verify_password(password, encoded, setter=None, preferred='default'):
+    """
+    check_password in the hashing pool. A correct password stored with an
+    outdated hasher or iteration count is passed to the setter, which
+    stores it again with the preferred hasher.
+    :param password: raw password
+    :param encoded: stored password
+    :param setter: callable taking the raw password
+    :param preferred: hasher the password should be stored with
+    :return: True if the password is correct.
+    """
+
+    if password is None or not is_password_usable(encoded):
+        return False
+
+    pool = get_hashing_pool()
+    if pool is None:
+        is_correct, must_update = _check_password(
+            password, encoded, preferred
+        )
+    else:
+        is_correct, must_update = pool.run(
+            _check_password, password, encoded,
+            get_hasher(preferred).algorithm
+        )
+
+    if setter and is_correct and must_update:
+        setter(password)
+    return is_correct
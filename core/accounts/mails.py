@@ -0,0 +1,112 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+from django.core.mail import EmailMultiAlternatives
+from django.template import Context, engines
+from django.template.loader_tags import ExtendsNode
+
+
+# mail_templated base template, subject and body are not autoescaped.
+MAIL_BASE_TEMPLATE = 'mail_templated/base.tpl'
+MAIL_BLOCKS = (('subject', False), ('body', False), ('html', True))
+
+
+class RenderedMail(NamedTuple):
+    subject: str
+    body: str
+    html: str
+
+
+class CompiledMail:
+    """
+    The subject, body and html blocks of a mail_templated template,
+    compiled once. Rendering them directly skips loading the template and
+    splitting the rendered text on the block markers for every email.
+    """
+
+    def __init__(self, template_name):
+        template = engines['django'].engine.get_template(template_name)
+        extends = template.nodelist.get_nodes_by_type(ExtendsNode)
+        parent_name = extends and extends[0].parent_name.token.strip('"\'')
+        if parent_name != MAIL_BASE_TEMPLATE:
+            raise ValueError(
+                f'{template_name} must extend {MAIL_BASE_TEMPLATE}.'
+            )
+
+        self.template_name = template_name
+        self.blocks = [
+            (name, extends[0].blocks.get(name), autoescape)
+            for name, autoescape in MAIL_BLOCKS
+        ]
+
+    def render(self, context):
+        """
+        :param context: django Context, reused between renders
+        :return: RenderedMail
+        """
+
+        parts = {}
+        for name, block, autoescape in self.blocks:
+            if block is None:
+                parts[name] = ''
+                continue
+            context.autoescape = autoescape
+            parts[name] = block.nodelist.render(context).strip('\n\r')
+        return RenderedMail(parts['subject'], parts['body'], parts['html'])
+
+
+@lru_cache(maxsize=None)
+def get_compiled_mail(template_name):
+    return CompiledMail(template_name)
+
+
+def render_mail(template_name, context):
+    """
+    Render one email of a mail_templated template.
+    :param template_name: template name, like 'email/activation_account.tpl'
+    :param context: template context dict
+    :return: RenderedMail
+    """
+
+    return render_mails(template_name, [context])[0]
+
+
+def render_mails(template_name, contexts):
+    """
+    Render the emails of many recipients with one compiled template and
+    one Context, each recipient's values are pushed on top of it.
+    :param template_name: template name
+    :param contexts: list of template context dicts
+    :return: list of RenderedMail, in the order of the contexts
+    """
+
+    compiled_mail = get_compiled_mail(template_name)
+    context = Context()
+    rendered = []
+    for values in contexts:
+        with context.push(values):
+            rendered.append(compiled_mail.render(context))
+    return rendered
+
+
+def build_message(rendered, from_email, to, connection=None):
+    """
+    Build the email of a rendered mail like mail_templated does, an html
+    only mail is sent with the html as its body.
+    :param rendered: RenderedMail
+    :param from_email: sender email address
+    :param to: list of recipient email addresses
+    :param connection: email backend connection
+    :return: EmailMultiAlternatives
+    """
+
+    message = EmailMultiAlternatives(
+        rendered.subject, rendered.body, from_email, to,
+        connection=connection
+    )
+    if rendered.html and rendered.body:
+        message.attach_alternative(rendered.html, 'text/html')
+    elif rendered.html:
+        message.body = rendered.html
+        message.content_subtype = 'html'
+    return message
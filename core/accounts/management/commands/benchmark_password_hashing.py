@@ -0,0 +1,78 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+
+from accounts.hashing import HashingPool, _check_password
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarking logins per second, checking passwords in the request "
+        "threads against checking them in the hashing pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--logins', type=int, default=50,
+            help='Number of password checks in each run.'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=(os.cpu_count() or 1) * 2,
+            help='Number of request threads checking passwords at once.'
+        )
+        parser.add_argument(
+            '--workers', type=int,
+            default=settings.PASSWORD_HASHING_WORKERS or os.cpu_count(),
+            help='Number of processes of the hashing pool.'
+        )
+
+    def inline_run(self, encoded):
+        return _check_password('far!@#$%', encoded, 'default')
+
+    def benchmark(self, check, encoded, logins, threads):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(check, [encoded] * logins))
+        elapsed = time.perf_counter() - started
+
+        assert all(is_correct for is_correct, _ in results)
+        return logins / elapsed
+
+    def handle(self, *args, **options):
+        logins, threads = options['logins'], options['threads']
+        cores = os.cpu_count() or 1
+        encoded = make_password('far!@#$%')
+
+        pool = HashingPool(options['workers'], threads, timeout=None)
+        try:
+            # start the workers before timing them.
+            pool.run(_check_password, 'far!@#$%', encoded, 'default')
+
+            def pool_run(encoded):
+                return pool.run(
+                    _check_password, 'far!@#$%', encoded, 'default'
+                )
+
+            before = self.benchmark(self.inline_run, encoded, logins, threads)
+            after = self.benchmark(pool_run, encoded, logins, threads)
+        finally:
+            pool.shutdown()
+
+        self.stdout.write(
+            f'{logins} logins from {threads} threads on {cores} cores, '
+            f'{options["workers"]} hashing workers:'
+        )
+        self.stdout.write(
+            f'request thread: {before:.1f} logins/s '
+            f'({before / cores:.1f} per core)'
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'hashing pool:   {after:.1f} logins/s '
+                f'({after / cores:.1f} per core)'
+            )
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from accounts.throttling import get_rejection_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Showing the login attempts rejected by the login throttle, by "
+        "endpoint and by the ip or email budget that rejected them."
+    )
+
+    def handle(self, *args, **options):
+        metrics = get_rejection_metrics()
+        for name, rejected in metrics.items():
+            self.stdout.write(f'{name}: {rejected}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{sum(metrics.values())} login attempts rejected.'
+            )
+        )
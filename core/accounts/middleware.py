@@ -0,0 +1,25 @@
+from django.http import HttpResponse
+
+from .hashing import PasswordHashingBusy
+
+
+class PasswordHashingBusyMiddleware:
+    """
+    Answer a request whose password couldn't be hashed, like a signup or
+    a password change while the hashing pool is full, with a 503 instead
+    of a server error.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, PasswordHashingBusy):
+            return HttpResponse(
+                PasswordHashingBusy.message, status=503,
+                content_type='text/plain; charset=utf-8',
+            )
+        return None
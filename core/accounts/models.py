@@ -1,9 +1,15 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import (
     AbstractBaseUser, BaseUserManager, PermissionsMixin
 )
 from django.utils.translation import ugettext_lazy as _
 
+from .hashing import hash_password, verify_password
+
 
 # Create your models here.
 
@@ -57,6 +63,24 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email, username, password, **extra_fields)
 
+    def activate(self, user_id):
+        """
+        Verify a user with one conditional UPDATE of its two columns.
+        :param user_id: primary key of the user
+        :return: True if the user was verified by this call, False if it
+            was already verified or doesn't exist.
+        """
+
+        from .principals import invalidate_principal
+
+        activated = self.filter(pk=user_id, is_verified=False).update(
+            is_verified=True, updated_date=timezone.now()
+        )
+        # update() sends no post_save, the cached user is dropped here.
+        if activated:
+            invalidate_principal(user_id=user_id)
+        return bool(activated)
+
 
 class User(AbstractBaseUser, PermissionsMixin):
     """
@@ -80,3 +104,94 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.username
+
+    def set_password(self, raw_password):
+        # hashed in the hashing pool, not in the request thread.
+        self.password = hash_password(raw_password)
+        self._password = raw_password
+        self.__dict__.pop('_session_auth_hash', None)
+
+    def get_session_auth_hash(self):
+        # a user from the principal cache carries the hash, not the
+        # password it is computed from.
+        session_auth_hash = self.__dict__.get('_session_auth_hash')
+        if session_auth_hash is not None:
+            return session_auth_hash
+        return super(User, self).get_session_auth_hash()
+
+    def check_password(self, raw_password):
+        """
+        Check the password in the hashing pool, a correct password is
+        stored again if the preferred hasher or its iterations changed.
+        :param raw_password: password to check
+        :return: True if the password is correct.
+        """
+
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # password_changed() isn't sent for a rehash.
+            self._password = None
+            self.save(update_fields=['password'])
+
+        return verify_password(raw_password, self.password, setter)
+
+
+class OutgoingEmail(models.Model):
+    """
+    Transactional outbox of the emails. A row is written in the same
+    transaction as the change it announces and celery sends it after the
+    commit, so no email is lost on a restart or sent for a rolled back
+    change. Sent rows are deleted, failed rows are kept for inspection.
+    """
+
+    PENDING = 'pending'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, _('Pending')),
+        (FAILED, _('Failed')),
+    )
+
+    template_name = models.CharField(max_length=255)
+    context = models.JSONField(default=dict)
+    from_email = models.CharField(max_length=255)
+    to = models.EmailField()
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_date = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_date = models.DateTimeField(auto_now_add=True)
+
+    def retry_later(self, error):
+        """
+        Record a failed attempt, the email is tried again after an
+        exponential backoff until EMAIL_OUTBOX_MAX_ATTEMPTS is reached.
+        :param error: exception of the attempt
+        """
+
+        self.attempts += 1
+        self.last_error = repr(error)
+        if self.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            self.status = self.FAILED
+        else:
+            delay = timedelta(
+                seconds=settings.EMAIL_OUTBOX_RETRY_DELAY
+                * 2 ** (self.attempts - 1)
+            )
+            self.next_attempt_date = timezone.now() + delay
+        self.save(update_fields=(
+            'attempts', 'last_error', 'status', 'next_attempt_date'
+        ))
+
+    def __str__(self):
+        return f'{self.template_name} to {self.to}'
+
+    class Meta:
+        indexes = [
+            # the pending emails that are due, in the order they are sent.
+            models.Index(
+                fields=['status', 'next_attempt_date'],
+                name='outgoing_email_due_idx',
+            ),
+        ]
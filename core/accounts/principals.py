@@ -0,0 +1,142 @@
+from functools import partial
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.contrib.auth import SESSION_KEY, get_user_model
+
+from rest_framework.authentication import TokenAuthentication
+
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+PRINCIPAL_USER_KEY = 'principal:user:{user_id}'
+PRINCIPAL_TOKEN_KEY = 'principal:token:{key}'
+
+
+# Get user model
+User = get_user_model()
+
+
+# the fields authentication and permission checks read, the others are
+# deferred and loaded from the database if a view reads them.
+PRINCIPAL_FIELDS = (
+    'id', 'email', 'username',
+    'is_active', 'is_verified', 'is_staff', 'is_superuser',
+)
+
+
+def cache_user(user_obj):
+    """
+    Store the compact record of a user, its PRINCIPAL_FIELDS and its
+    session auth hash. Sessions are verified against that HMAC of the
+    password, the password hash itself isn't cached.
+    :param user_obj: user instance loaded from the database
+    """
+
+    record = tuple(getattr(user_obj, name) for name in PRINCIPAL_FIELDS)
+    record += (user_obj.get_session_auth_hash(),)
+    cache.set(
+        PRINCIPAL_USER_KEY.format(user_id=user_obj.pk),
+        record,
+        timeout=settings.PRINCIPAL_CACHE_TIMEOUT,
+    )
+
+
+def get_cached_user(user_id):
+    """
+    Return a user from the principal cache, loading it on a miss.
+    :param user_id: primary key of the user
+    :return: user instance or None if there is no such user.
+    """
+
+    record = cache.get(PRINCIPAL_USER_KEY.format(user_id=user_id))
+    if record is not None:
+        *values, session_auth_hash = record
+        user_obj = User.from_db(DEFAULT_DB_ALIAS, PRINCIPAL_FIELDS, values)
+        user_obj._session_auth_hash = session_auth_hash
+        return user_obj
+
+    user_obj = User.objects.filter(pk=user_id).first()
+    if user_obj is not None:
+        cache_user(user_obj)
+    return user_obj
+
+
+def get_cached_token_user_id(key, load_token):
+    """
+    Return the user id of an auth token, loading the token on a miss.
+    :param key: token key
+    :param load_token: callable loading the token with its user, it
+        raises if the token doesn't exist
+    :return: user id
+    """
+
+    cache_key = PRINCIPAL_TOKEN_KEY.format(key=key)
+    user_id = cache.get(cache_key)
+    if user_id is None:
+        token = load_token(key)
+        user_id = token.user_id
+        cache.set(
+            cache_key, user_id, timeout=settings.PRINCIPAL_CACHE_TIMEOUT
+        )
+        cache_user(token.user)
+    return user_id
+
+
+def get_request_user_id(request):
+    """
+    Return the id of the user a request authenticates as, from its
+    session, its cached token or its jwt, without a database query. It
+    runs before authentication, so nothing else is checked.
+    :param request: django request
+    :return: user id as a string, None if it isn't known.
+    """
+
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        engine = import_module(settings.SESSION_ENGINE)
+        user_id = engine.SessionStore(session_key).get(SESSION_KEY)
+        return None if user_id is None else str(user_id)
+
+    auth = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(auth) != 2:
+        return None
+    keyword, credentials = auth
+    if keyword == TokenAuthentication.keyword:
+        user_id = cache.get(PRINCIPAL_TOKEN_KEY.format(key=credentials))
+    elif keyword in api_settings.AUTH_HEADER_TYPES:
+        try:
+            token = AccessToken(credentials)
+        except TokenError:
+            return None
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+    else:
+        return None
+    return None if user_id is None else str(user_id)
+
+
+def _delete_keys(keys):
+    cache.delete_many(keys)
+
+
+def invalidate_principal(user_id=None, token_key=None):
+    """
+    Drop a cached user and/or token. Inside a transaction they are dropped
+    again on commit, a request could cache the old row before it.
+    :param user_id: changed or deleted user
+    :param token_key: deleted token
+    """
+
+    keys = []
+    if user_id is not None:
+        keys.append(PRINCIPAL_USER_KEY.format(user_id=user_id))
+    if token_key is not None:
+        keys.append(PRINCIPAL_TOKEN_KEY.format(key=token_key))
+
+    _delete_keys(keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(_delete_keys, keys))
@@ -0,0 +1,113 @@
+from hashlib import sha256
+from time import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+from django_redis.cache import RedisCache
+
+from rest_framework_simplejwt.settings import api_settings
+
+
+REVOKED_TOKEN_KEY = 'jwt:revoked:{jti}'
+REVOKED_BLOOM_KEY = 'jwt:revoked:bloom:{window}'
+
+
+class RevocationList:
+    """
+    Revoked jwt ids. On redis a bloom filter answers most checks with one
+    pipeline of GETBIT, only its positive hits are confirmed against the
+    exact key of the jti. Other caches keep the exact keys only.
+
+    A revoked token is only relevant until it expires, so the filter is
+    kept per window of the refresh token lifetime and a check reads the
+    current and the previous window, older filters expire by themselves.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.is_redis = isinstance(cache, RedisCache)
+
+    @property
+    def window_size(self):
+        return int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+
+    def get_bloom_key(self, window):
+        return self.cache.client.make_key(
+            REVOKED_BLOOM_KEY.format(window=window)
+        )
+
+    def get_positions(self, jti):
+        # double hashing, k positions out of two 64 bit halves of a digest.
+        digest = sha256(jti.encode()).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:16], 'big') | 1
+        bits = settings.JWT_REVOCATION_BLOOM_BITS
+        return [
+            (first + number * second) % bits
+            for number in range(settings.JWT_REVOCATION_BLOOM_HASHES)
+        ]
+
+    def add(self, jti, expires_in):
+        """
+        :param jti: jwt id of the revoked token
+        :param expires_in: seconds until the token expires
+        """
+
+        self.cache.set(REVOKED_TOKEN_KEY.format(jti=jti), 1, expires_in)
+        if not self.is_redis:
+            return
+
+        window = int(time()) // self.window_size
+        key = self.get_bloom_key(window)
+        pipeline = self.cache.client.get_client(write=True).pipeline()
+        for position in self.get_positions(jti):
+            pipeline.setbit(key, position, 1)
+        pipeline.expire(key, self.window_size * 2)
+        pipeline.execute()
+
+    def might_contain(self, jti):
+        """
+        :return: False if the jti is surely not revoked.
+        """
+
+        window = int(time()) // self.window_size
+        positions = self.get_positions(jti)
+        keys = [self.get_bloom_key(window), self.get_bloom_key(window - 1)]
+        pipeline = self.cache.client.get_client(write=False).pipeline()
+        for key in keys:
+            for position in positions:
+                pipeline.getbit(key, position)
+
+        bits = pipeline.execute()
+        return all(bits[:len(positions)]) or all(bits[len(positions):])
+
+    def __contains__(self, jti):
+        if self.is_redis and not self.might_contain(jti):
+            return False
+        return self.cache.has_key(REVOKED_TOKEN_KEY.format(jti=jti))
+
+
+def get_revocation_list():
+    return RevocationList(caches[DEFAULT_CACHE_ALIAS])
+
+
+def revoke_token(token):
+    """
+    Revoke a jwt until it expires.
+    :param token: simplejwt token, access or refresh
+    """
+
+    expires_in = int(token['exp'] - time())
+    if expires_in > 0:
+        get_revocation_list().add(token[api_settings.JTI_CLAIM], expires_in)
+
+
+def is_token_revoked(token):
+    """
+    :param token: validated simplejwt token
+    :return: True if the token was revoked.
+    """
+
+    jti = token.get(api_settings.JTI_CLAIM)
+    return jti is not None and jti in get_revocation_list()
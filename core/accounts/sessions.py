@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.cache import (
+    SessionStore as CacheSessionStore
+)
+
+from django_redis.cache import RedisCache
+
+
+SESSION_INDEX_KEY = 'session:user:{user_id}'
+
+
+class SessionIndex:
+    """
+    Session keys of each user, to delete all the sessions of a user at
+    once. On redis the index is a set changed with single commands, other
+    caches keep a python set in the cache, which is good enough for tests and
+    development.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.is_redis = isinstance(cache, RedisCache)
+
+    def get_key(self, user_id):
+        key = SESSION_INDEX_KEY.format(user_id=user_id)
+        if self.is_redis:
+            return self.cache.client.make_key(key)
+        return key
+
+    def add(self, user_id, session_key):
+        key = self.get_key(user_id)
+        if self.is_redis:
+            client = self.cache.client.get_client(write=True)
+            pipeline = client.pipeline()
+            pipeline.sadd(key, session_key)
+            pipeline.expire(key, settings.SESSION_COOKIE_AGE)
+            pipeline.execute()
+        else:
+            session_keys = self.cache.get(key, set())
+            session_keys.add(session_key)
+            self.cache.set(key, session_keys, settings.SESSION_COOKIE_AGE)
+
+    def remove(self, user_id, session_key):
+        key = self.get_key(user_id)
+        if self.is_redis:
+            self.cache.client.get_client(write=True).srem(key, session_key)
+        else:
+            session_keys = self.cache.get(key, set())
+            session_keys.discard(session_key)
+            self.cache.set(key, session_keys, settings.SESSION_COOKIE_AGE)
+
+    def pop(self, user_id):
+        """
+        :return: session keys of the user, the index is emptied.
+        """
+
+        key = self.get_key(user_id)
+        if self.is_redis:
+            client = self.cache.client.get_client(write=True)
+            pipeline = client.pipeline()
+            pipeline.smembers(key)
+            pipeline.delete(key)
+            session_keys, _ = pipeline.execute()
+            return {session_key.decode() for session_key in session_keys}
+
+        session_keys = self.cache.get(key, set())
+        self.cache.delete(key)
+        return session_keys
+
+
+class SessionStore(CacheSessionStore):
+    """
+    Cache session store that also indexes the sessions by user, so
+    reading a session never hits the database and all the sessions of a
+    user can be deleted together.
+    """
+
+    def __init__(self, session_key=None):
+        super(SessionStore, self).__init__(session_key)
+        self.index = SessionIndex(self._cache)
+
+    def save(self, must_create=False):
+        super(SessionStore, self).save(must_create)
+        user_id = self._session.get(SESSION_KEY)
+        if user_id is not None:
+            self.index.add(user_id, self.session_key)
+
+    def flush(self):
+        # logout flushes the session, it leaves the user's index too.
+        user_id = self.get(SESSION_KEY)
+        if user_id is not None and self.session_key is not None:
+            self.index.remove(user_id, self.session_key)
+        super(SessionStore, self).flush()
+
+    def delete_user_sessions(self, user_id, keep_session_key=None):
+        """
+        Delete every session of a user with one cache call.
+        :param user_id: owner of the sessions
+        :param keep_session_key: session that stays logged in, like the one
+            that changed the password
+        :return: number of deleted sessions.
+        """
+
+        session_keys = self.index.pop(user_id)
+        if keep_session_key in session_keys:
+            session_keys.discard(keep_session_key)
+            self.index.add(user_id, keep_session_key)
+
+        self._cache.delete_many(
+            [self.cache_key_prefix + key for key in session_keys]
+        )
+        return len(session_keys)
+
+
+def logout_other_sessions(user_obj, request=None):
+    """
+    Log a user out everywhere, except in the session of the request.
+    :param user_obj: user, whose password changed for example
+    :param request: request whose session stays logged in, if any
+    """
+
+    keep_session_key = None
+    if request is not None:
+        session_user_id = request.session.get(SESSION_KEY)
+        if session_user_id == str(user_obj.pk):
+            keep_session_key = request.session.session_key
+    return SessionStore().delete_user_sessions(user_obj.pk, keep_session_key)
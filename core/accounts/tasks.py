@@ -0,0 +1,22 @@
+from django.conf import settings
+
+from .utils import send_due_emails
+from core.celery import app as celery_app
+
+
+@celery_app.task
+def send_outgoing_emails():
+    sent_count = send_due_emails(settings.EMAIL_OUTBOX_BATCH_SIZE)
+    # a full batch means there may be more due emails.
+    if sent_count == settings.EMAIL_OUTBOX_BATCH_SIZE:
+        send_outgoing_emails.delay()
+
+
+@celery_app.on_after_finalize.connect
+def setup_periodic_tasks(sender, **kwargs):
+    # picks up emails whose commit hook was lost and the retries.
+    sender.add_periodic_task(
+        settings.EMAIL_OUTBOX_DRAIN_INTERVAL,
+        send_outgoing_emails.s(),
+        name='sending due outbox emails.'
+    )
@@ -0,0 +1,115 @@
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from accounts import hashing
+from accounts.hashing import (
+    HashingPool, PasswordHashingBusy, _check_password, hash_password
+)
+
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user():
+    user = User.objects.create_user(
+        email='test_email@test.com',
+        username='test_username',
+        password='far!@#$%',
+        is_verified=True,
+    )
+    return user
+
+
+@pytest.fixture
+def full_pool(monkeypatch):
+    pool = HashingPool(workers=1, queue_size=0, timeout=0.01)
+    pool.slots.acquire()
+    monkeypatch.setattr(hashing, 'get_hashing_pool', lambda: pool)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.django_db
+class TestAccountsPasswordHashing:
+
+    @pytest.mark.parametrize('workers', [0, 1])
+    def test_password_round_trip(self, test_user, settings, workers):
+        settings.PASSWORD_HASHING_WORKERS = workers
+        test_user.set_password('new!@#$%')
+
+        assert test_user.password.startswith('pbkdf2_sha256$')
+        assert test_user.check_password('new!@#$%')
+        assert not test_user.check_password('far!@#$%')
+
+    def test_login_rehashes_with_preferred_hasher(self, test_user):
+        test_user.password = make_password('far!@#$%', hasher='pbkdf2_sha1')
+        test_user.save()
+
+        assert test_user.check_password('far!@#$%')
+        test_user.refresh_from_db()
+        assert test_user.password.startswith('pbkdf2_sha256$')
+
+    def test_wrong_password_is_not_rehashed(self, test_user):
+        encoded = make_password('far!@#$%', hasher='pbkdf2_sha1')
+        test_user.password = encoded
+        test_user.save()
+
+        assert not test_user.check_password('wrong')
+        test_user.refresh_from_db()
+        assert test_user.password == encoded
+
+    def test_unusable_password_skips_the_pool(self):
+        assert not hash_password(None).startswith('pbkdf2')
+
+    def test_full_pool_sheds_the_request(self):
+        pool = HashingPool(workers=1, queue_size=0, timeout=0.01)
+        pool.slots.acquire()
+        try:
+            with pytest.raises(PasswordHashingBusy):
+                pool.run(_check_password, 'far!@#$%', '', 'default')
+        finally:
+            pool.shutdown()
+
+    def test_broken_pool_is_restarted(self):
+        pool = HashingPool(workers=1, queue_size=0, timeout=None)
+        try:
+            pool.run(_check_password, 'far!@#$%', '', 'default')
+            broken = pool.executor
+            # a worker killed by the os takes the executor down.
+            for process in list(broken._processes.values()):
+                process.kill()
+                process.join()
+
+            encoded = pool.run(make_password, 'far!@#$%', None, 'default')
+            assert pool.executor is not broken
+            assert _check_password('far!@#$%', encoded, 'default')[0]
+        finally:
+            pool.shutdown()
+
+    def test_full_pool_register_view_503(self, client, full_pool):
+        response = client.post(reverse('accounts:register'), {
+            'email': 'test_register@test.com',
+            'username': 'test_username_register',
+            'password1': 'password2register',
+            'password2': 'password2register',
+        })
+        assert response.status_code == 503
+        assert not User.objects.filter(
+            email='test_register@test.com'
+        ).exists()
+
+    def test_full_pool_api_register_view_503(self, full_pool):
+        response = APIClient().post(reverse('accounts:api-v1:register'), {
+            'email': 'test_register@test.com',
+            'username': 'test_username_register',
+            'password': 'far!@#$%',
+            'confirm_password': 'far!@#$%',
+        })
+        assert response.status_code == 503
+        assert response.data['detail'].code == 'password_hashing_busy'
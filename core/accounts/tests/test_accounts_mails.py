@@ -0,0 +1,59 @@
+import pytest
+
+from mail_templated import EmailMessage
+
+from accounts.mails import (
+    build_message, get_compiled_mail, render_mail, render_mails
+)
+
+
+TEMPLATES = ('email/activation_account.tpl', 'email/reset_password.tpl')
+
+
+def get_context(number=0):
+    return {
+        'user': f'test_<user>_{number}',
+        'token': f'http://127.0.0.1:8000/confirm/token_{number}/',
+    }
+
+
+class TestAccountsMails:
+
+    @pytest.mark.parametrize('template_name', TEMPLATES)
+    def test_rendered_mail_matches_mail_templated(self, template_name):
+        expected = EmailMessage(
+            template_name, get_context(), 'sender@example.com',
+            ['test@test.com'], render=True
+        )
+        message = build_message(
+            render_mail(template_name, get_context()),
+            'sender@example.com', ['test@test.com']
+        )
+
+        assert message.subject == expected.subject
+        assert message.body == expected.body
+        assert message.content_subtype == expected.content_subtype
+        assert message.alternatives == expected.alternatives
+
+    def test_template_is_compiled_once(self):
+        get_compiled_mail.cache_clear()
+        for number in range(3):
+            render_mail(TEMPLATES[0], get_context(number))
+
+        cache_info = get_compiled_mail.cache_info()
+        assert (cache_info.misses, cache_info.hits) == (1, 2)
+
+    def test_batch_rendering_keeps_recipients_apart(self):
+        contexts = [get_context(number) for number in range(5)]
+        rendered = render_mails(TEMPLATES[0], contexts)
+
+        assert len(rendered) == 5
+        for number, mail in enumerate(rendered):
+            assert mail.subject == 'Email Verification'
+            assert f'token_{number}/' in mail.html
+            assert f'test_&lt;user&gt;_{number}' in mail.html
+            assert f'token_{number + 1}/' not in mail.html
+
+    def test_template_without_mail_blocks_is_refused(self):
+        with pytest.raises(ValueError):
+            render_mail('email/reset_password.html', get_context())
@@ -0,0 +1,174 @@
+import threading
+from datetime import timedelta
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+
+import pytest
+
+from django.db import transaction
+from django.utils import timezone
+
+from accounts import utils
+from accounts.models import OutgoingEmail
+from accounts.utils import claim_due_emails, queue_email, send_due_emails
+
+
+class StubSMTPHandler(StreamRequestHandler):
+    """
+    Just enough of SMTP for django's smtp backend, every message is
+    accepted and recorded with the connection that sent it.
+    """
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        connection = server.connections
+        self.reply('220 stub ESMTP')
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == 'QUIT':
+                self.reply('221 bye')
+                return
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 stub')
+            elif command == 'RCPT' and server.refused_rcpt in line:
+                self.reply('550 no such user')
+            elif command == 'DATA':
+                self.reply('354 end with .')
+                data = []
+                for data_line in self.rfile:
+                    if data_line.rstrip(b'\r\n') == b'.':
+                        break
+                    data.append(data_line)
+                server.messages.append((connection, b''.join(data)))
+                self.reply('250 queued')
+            else:
+                self.reply('250 ok')
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = ThreadingTCPServer(('127.0.0.1', 0), StubSMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.messages = []
+    server.refused_rcpt = 'refused@'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST = '127.0.0.1'
+    settings.EMAIL_PORT = server.server_address[1]
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_HOST_USER = ''
+    settings.EMAIL_HOST_PASSWORD = ''
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def queue_activation_email(to):
+    return queue_email(
+        'email/activation_account.tpl',
+        {'user': 'test_username', 'token': 'http://testserver/token/'},
+        to
+    )
+
+
+@pytest.mark.django_db
+class TestAccountsOutbox:
+
+    def test_batch_is_sent_over_one_connection(self, smtp_server):
+        for number in range(3):
+            queue_activation_email(f'test_{number}@test.com')
+
+        assert send_due_emails() == 3
+        assert smtp_server.connections == 1
+        assert len(smtp_server.messages) == 3
+        assert not OutgoingEmail.objects.exists()
+
+    def test_batch_size_limits_the_sent_emails(self, smtp_server):
+        for number in range(3):
+            queue_activation_email(f'test_{number}@test.com')
+
+        assert send_due_emails(batch_size=2) == 2
+        assert OutgoingEmail.objects.count() == 1
+
+    def test_email_is_queued_in_the_callers_transaction(self, smtp_server):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                queue_activation_email('test@test.com')
+                raise RuntimeError('rolled back')
+
+        assert not OutgoingEmail.objects.exists()
+        assert send_due_emails() == 0
+
+    def test_refused_email_is_retried_with_backoff(self, smtp_server):
+        queue_activation_email('test@test.com')
+        queue_activation_email('refused@test.com')
+
+        assert send_due_emails() == 1
+        refused = OutgoingEmail.objects.get()
+        assert refused.attempts == 1
+        assert refused.status == OutgoingEmail.PENDING
+        assert refused.next_attempt_date > timezone.now()
+        assert 'no such user' in refused.last_error
+
+        # not due yet
+        assert send_due_emails() == 0
+
+    def test_email_fails_after_max_attempts(self, smtp_server, settings):
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        queue_activation_email('refused@test.com')
+        for _ in range(2):
+            OutgoingEmail.objects.update(
+                next_attempt_date=timezone.now() - timedelta(seconds=1)
+            )
+            send_due_emails()
+
+        refused = OutgoingEmail.objects.get()
+        assert refused.attempts == 2
+        assert refused.status == OutgoingEmail.FAILED
+
+    def test_unreachable_server_keeps_the_batch(self, smtp_server):
+        queue_activation_email('test@test.com')
+        smtp_server.shutdown()
+        smtp_server.server_close()
+
+        assert send_due_emails() == 0
+        assert OutgoingEmail.objects.get().attempts == 1
+
+    def test_claimed_batch_is_left_to_its_worker(self, smtp_server):
+        queue_activation_email('test@test.com')
+        assert len(claim_due_emails(10)) == 1
+
+        # another worker finds nothing due until the claim runs out.
+        assert send_due_emails() == 0
+        assert smtp_server.messages == []
+
+    def test_sent_email_is_recorded_before_the_next_one(
+            self, smtp_server, monkeypatch
+    ):
+        for number in range(2):
+            queue_activation_email(f'test_{number}@test.com')
+        build_message = utils.build_message
+        messages = []
+
+        def crash_on_second_message(*args, **kwargs):
+            if messages:
+                raise SystemExit('worker killed')
+            messages.append(1)
+            return build_message(*args, **kwargs)
+
+        monkeypatch.setattr(utils, 'build_message', crash_on_second_message)
+        with pytest.raises(SystemExit):
+            send_due_emails()
+
+        # only the unsent email is left, claimed until it is sent again.
+        unsent = OutgoingEmail.objects.get()
+        assert unsent.to == 'test_1@test.com'
+        assert unsent.next_attempt_date > timezone.now()
@@ -0,0 +1,113 @@
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.authentications import (
+    CachedModelBackend,
+    CachedTokenAuthentication,
+    CachedJWTAuthentication,
+)
+from accounts.principals import PRINCIPAL_USER_KEY
+
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user():
+    user = User.objects.create_user(
+        email='test_email@test.com',
+        username='test_username',
+        password='far!@#$%',
+        is_verified=True,
+    )
+    return user
+
+
+@pytest.fixture
+def test_token(test_user):
+    return Token.objects.create(user=test_user)
+
+
+@pytest.mark.django_db
+class TestAccountsPrincipalCache:
+
+    def test_session_backend_loads_user_once(
+            self, test_user, django_assert_num_queries
+    ):
+        backend = CachedModelBackend()
+        with django_assert_num_queries(1):
+            backend.get_user(test_user.pk)
+        with django_assert_num_queries(0):
+            user_obj = backend.get_user(test_user.pk)
+
+        assert user_obj == test_user
+        with django_assert_num_queries(0):
+            assert user_obj.get_session_auth_hash() == \
+                test_user.get_session_auth_hash()
+
+    def test_cached_record_leaves_out_the_password(self, test_user):
+        CachedModelBackend().get_user(test_user.pk)
+        record = cache.get(PRINCIPAL_USER_KEY.format(user_id=test_user.pk))
+
+        assert test_user.password not in record
+        assert test_user.get_session_auth_hash() in record
+        assert test_user.email in record
+
+    def test_token_authentication_loads_token_once(
+            self, test_user, test_token, django_assert_num_queries
+    ):
+        authentication = CachedTokenAuthentication()
+        with django_assert_num_queries(1):
+            authentication.authenticate_credentials(test_token.key)
+        with django_assert_num_queries(0):
+            user_obj, token = authentication.authenticate_credentials(
+                test_token.key
+            )
+
+        assert user_obj == test_user
+        assert token.key == test_token.key
+
+    def test_jwt_authentication_loads_user_once(
+            self, test_user, django_assert_num_queries
+    ):
+        authentication = CachedJWTAuthentication()
+        validated_token = AccessToken.for_user(test_user)
+        with django_assert_num_queries(1):
+            authentication.get_user(validated_token)
+        with django_assert_num_queries(0):
+            assert authentication.get_user(validated_token) == test_user
+
+    def test_user_save_invalidates_cached_user(self, test_user, test_token):
+        authentication = CachedTokenAuthentication()
+        authentication.authenticate_credentials(test_token.key)
+
+        test_user.is_active = False
+        test_user.save()
+        with pytest.raises(AuthenticationFailed):
+            authentication.authenticate_credentials(test_token.key)
+
+        backend = CachedModelBackend()
+        backend.get_user(test_user.pk)
+        test_user.is_active = True
+        test_user.set_password('new!@#$%')
+        test_user.save()
+        assert backend.get_user(test_user.pk).check_password('new!@#$%')
+
+    def test_discarded_token_is_not_accepted(self, test_user, test_token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {test_token.key}')
+        response = client.post(reverse('accounts:api-v1:token-logout'))
+        assert response.status_code == 204
+
+        with pytest.raises(AuthenticationFailed):
+            CachedTokenAuthentication().authenticate_credentials(
+                test_token.key
+            )
@@ -0,0 +1,100 @@
+import pytest
+
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from accounts.sessions import SessionStore, logout_other_sessions
+
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # user ids are reused between tests, so are their session indexes.
+    cache.clear()
+
+
+@pytest.fixture
+def test_user():
+    user = User.objects.create_user(
+        email='test_email@test.com',
+        username='test_username',
+        password='far!@#$%',
+        is_verified=True,
+    )
+    return user
+
+
+def get_logged_in_client(user, client_class=Client):
+    client = client_class()
+    client.force_login(user)
+    return client
+
+
+def is_logged_in(client):
+    session = SessionStore(client.cookies['sessionid'].value)
+    return SESSION_KEY in session.load()
+
+
+@pytest.mark.django_db
+class TestAccountsSessions:
+
+    def test_session_is_loaded_without_database(
+            self, test_user, django_assert_num_queries
+    ):
+        client = get_logged_in_client(test_user)
+        session = SessionStore(client.cookies['sessionid'].value)
+        with django_assert_num_queries(0):
+            assert session.load()[SESSION_KEY] == str(test_user.pk)
+
+    def test_logout_other_sessions_deletes_every_session(self, test_user):
+        clients = [get_logged_in_client(test_user) for _ in range(3)]
+        other_user = User.objects.create_user(
+            email='other@test.com', username='other_username',
+            password='far!@#$%', is_verified=True
+        )
+        other_client = get_logged_in_client(other_user)
+
+        assert logout_other_sessions(test_user) == 3
+        assert not any(is_logged_in(client) for client in clients)
+        assert is_logged_in(other_client)
+
+    def test_logout_removes_session_from_index(self, test_user):
+        client = get_logged_in_client(test_user)
+        client.get(reverse('accounts:logout'))
+
+        assert logout_other_sessions(test_user) == 0
+
+    def test_password_change_keeps_only_current_session(self, test_user):
+        client = get_logged_in_client(test_user)
+        other_client = get_logged_in_client(test_user)
+        response = client.post(reverse('accounts:password_change'), {
+            'old_password': 'far!@#$%',
+            'new_password1': 'new!@#$%far',
+            'new_password2': 'new!@#$%far',
+        })
+
+        assert response.status_code == 302
+        assert is_logged_in(client)
+        assert not is_logged_in(other_client)
+
+    def test_api_password_change_keeps_only_current_session(self, test_user):
+        client = get_logged_in_client(test_user, APIClient)
+        other_client = get_logged_in_client(test_user)
+        response = client.put(
+            reverse('accounts:api-v1:change-password'),
+            {
+                'old_password': 'far!@#$%',
+                'new_password': 'new!@#$%far',
+                'confirm_new_password': 'new!@#$%far',
+            }
+        )
+
+        assert response.status_code == 202
+        assert is_logged_in(client)
+        assert not is_logged_in(other_client)
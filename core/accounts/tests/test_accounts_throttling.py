@@ -0,0 +1,152 @@
+from io import StringIO
+
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from accounts.throttling import (
+    LOGIN_ATTEMPTS_KEY, LOGIN_LOCKOUT_KEY,
+    check_login_attempt, get_rejection_metrics,
+)
+
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def login_budgets(settings):
+    cache.clear()
+    rate = {'ip': (4, 60), 'email': (2, 60)}
+    settings.LOGIN_THROTTLE_RATES = {
+        'form': rate, 'session': rate, 'token': rate, 'jwt': rate,
+    }
+    settings.LOGIN_LOCKOUT_BASE_DURATION = 60
+    settings.LOGIN_LOCKOUT_MAX_DURATION = 60 * 4
+
+
+@pytest.fixture
+def test_user():
+    user = User.objects.create_user(
+        email='test_email@test.com',
+        username='test_username',
+        password='far!@#$%',
+        is_verified=True,
+    )
+    return user
+
+
+def post_login(client, url_name, email, password):
+    return client.post(
+        reverse(url_name), {'email': email, 'password': password}
+    )
+
+
+@pytest.mark.django_db
+class TestAccountsLoginThrottle:
+
+    @pytest.mark.parametrize('url_name', [
+        'accounts:api-v1:session-login',
+        'accounts:api-v1:token-login',
+        'accounts:api-v1:jwt-create',
+    ])
+    def test_email_over_budget_is_rejected_before_authenticate(
+            self, test_user, url_name, django_assert_num_queries
+    ):
+        client = APIClient()
+        for _ in range(2):
+            response = post_login(client, url_name, test_user.email, 'wrong')
+            assert response.status_code in (400, 401)
+
+        # even the right password isn't checked, no user is loaded.
+        with django_assert_num_queries(0):
+            response = post_login(
+                client, url_name, test_user.email, 'far!@#$%'
+            )
+        assert response.status_code == 429
+        assert response['Retry-After'] == '60'
+
+    def test_ip_over_budget_is_rejected(self, test_user):
+        client = APIClient()
+        url_name = 'accounts:api-v1:token-login'
+        for number in range(4):
+            post_login(client, url_name, f'test_{number}@test.com', 'wrong')
+
+        response = post_login(client, url_name, test_user.email, 'far!@#$%')
+        assert response.status_code == 429
+        assert get_rejection_metrics()['token:ip'] == 1
+
+        out = StringIO()
+        call_command('login_throttle_stats', stdout=out)
+        assert 'token:ip: 1\n' in out.getvalue()
+        assert '1 login attempts rejected.' in out.getvalue()
+
+    @pytest.mark.parametrize('num_proxies', [0, 1])
+    def test_spoofed_forwarded_for_shares_the_ip_budget(
+            self, test_user, settings, num_proxies
+    ):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK, 'NUM_PROXIES': num_proxies,
+        }
+        client = APIClient()
+        url_name = 'accounts:api-v1:token-login'
+        for number in range(5):
+            # what nginx forwards, the client's header with its address.
+            forwarded_for = f'10.0.0.{number}, 127.0.0.1'
+            response = client.post(
+                reverse(url_name),
+                {'email': f'test_{number}@test.com', 'password': 'wrong'},
+                HTTP_X_FORWARDED_FOR=forwarded_for,
+            )
+
+        assert response.status_code == 429
+        assert get_rejection_metrics()['token:ip'] == 1
+
+    def test_lockout_covers_every_endpoint(self, test_user):
+        client = APIClient()
+        for _ in range(3):
+            post_login(
+                client, 'accounts:api-v1:jwt-create', test_user.email, 'wrong'
+            )
+
+        response = post_login(
+            client, 'accounts:login', test_user.email, 'far!@#$%'
+        )
+        assert response.status_code == 429
+        assert get_rejection_metrics() == {
+            'form:ip': 0, 'form:email': 1,
+            'session:ip': 0, 'session:email': 0,
+            'token:ip': 0, 'token:email': 0,
+            'jwt:ip': 0, 'jwt:email': 1,
+        }
+
+    def test_lockouts_in_a_row_back_off(self):
+        email = 'test@test.com'
+        waits = []
+        for _ in range(4):
+            for _ in range(3):
+                wait = check_login_attempt(None, 'token', email)
+            waits.append(wait)
+            # the lockout and the window are over, the strikes are not.
+            cache.delete_many([
+                LOGIN_LOCKOUT_KEY.format(scope='email', ident=email),
+                LOGIN_ATTEMPTS_KEY.format(
+                    endpoint='token', scope='email', ident=email
+                ),
+            ])
+
+        assert waits == [60, 120, 240, 240]
+
+    def test_successful_login_resets_email_budget(self, test_user):
+        client = APIClient()
+        url_name = 'accounts:api-v1:token-login'
+        post_login(client, url_name, test_user.email, 'wrong')
+        response = post_login(client, url_name, test_user.email, 'far!@#$%')
+        assert response.status_code == 200
+
+        response = post_login(client, url_name, test_user.email, 'wrong')
+        assert response.status_code == 400
@@ -9,6 +9,8 @@ from rest_framework.status import (
 )
 from time import sleep
 
+from accounts.utils import send_due_emails
+
 
 User = get_user_model()
 
@@ -37,8 +39,7 @@ class TestAccountsRegistrationViews:
         response = client.post(url, data)
         assert response.status_code == HTTP_302_FOUND
 
-        sleep(1)
-        print(mailoutbox)
+        send_due_emails()
         assert len(mailoutbox) == 1
         email = mailoutbox[0]
         assert email.subject == 'Email Verification'
@@ -54,8 +55,7 @@ class TestAccountsRegistrationViews:
         response = client.post(path=url, data=data)
         assert response.status_code == HTTP_302_FOUND
 
-        sleep(1)
-        print(mailoutbox)
+        send_due_emails()
         assert len(mailoutbox) == 1
         email = mailoutbox[0]
         assert email.subject == 'Email Verification'
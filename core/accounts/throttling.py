@@ -0,0 +1,182 @@
+import math
+import uuid
+from time import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+from django_redis.cache import RedisCache
+
+from rest_framework.throttling import BaseThrottle
+
+
+LOGIN_ATTEMPTS_KEY = 'login:attempts:{endpoint}:{scope}:{ident}'
+LOGIN_LOCKOUT_KEY = 'login:lockout:{scope}:{ident}'
+LOGIN_STRIKES_KEY = 'login:strikes:{scope}:{ident}'
+LOGIN_REJECTED_KEY = 'login:rejected:{endpoint}:{scope}'
+
+LOGIN_SCOPES = ('ip', 'email')
+
+
+class SlidingWindow:
+    """
+    Attempts of the last `window` seconds. On redis a sorted set of the
+    attempt times is trimmed, added to and counted in one transaction,
+    other caches keep a list of times, which is good enough for tests and
+    development.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.is_redis = isinstance(cache, RedisCache)
+
+    def hit(self, key, now, window):
+        """
+        Record an attempt.
+        :return: number of attempts in the window, this one included.
+        """
+
+        if self.is_redis:
+            pipeline = self.cache.client.get_client(write=True).pipeline()
+            key = self.cache.client.make_key(key)
+            pipeline.zremrangebyscore(key, 0, now - window)
+            pipeline.zadd(key, {f'{now}:{uuid.uuid4().hex}': now})
+            pipeline.zcard(key)
+            pipeline.expire(key, window)
+            return pipeline.execute()[2]
+
+        attempts = [
+            attempt for attempt in self.cache.get(key, [])
+            if attempt > now - window
+        ]
+        attempts.append(now)
+        self.cache.set(key, attempts, window)
+        return len(attempts)
+
+    def clear(self, keys):
+        if self.is_redis:
+            keys = [self.cache.client.make_key(key) for key in keys]
+            self.cache.client.get_client(write=True).delete(*keys)
+        else:
+            self.cache.delete_many(keys)
+
+
+def get_login_cache():
+    return caches[DEFAULT_CACHE_ALIAS]
+
+
+def get_client_ip(request):
+    # same client address as the api throttles. X-Forwarded-For is only
+    # read past the NUM_PROXIES trusted hops, the entries a client sends
+    # itself are ignored.
+    return BaseThrottle().get_ident(request)
+
+
+def normalize_email(email):
+    return email.strip().lower() if email else None
+
+
+def record_rejection(endpoint, scope):
+    cache = get_login_cache()
+    key = LOGIN_REJECTED_KEY.format(endpoint=endpoint, scope=scope)
+    cache.add(key, 0, None)
+    cache.incr(key)
+
+
+def get_rejection_metrics():
+    """
+    :return: dict of rejected login attempts by 'endpoint:scope'.
+    """
+
+    keys = {
+        f'{endpoint}:{scope}': LOGIN_REJECTED_KEY.format(
+            endpoint=endpoint, scope=scope
+        )
+        for endpoint in settings.LOGIN_THROTTLE_RATES
+        for scope in LOGIN_SCOPES
+    }
+    counts = get_login_cache().get_many(keys.values())
+    return {name: counts.get(key, 0) for name, key in keys.items()}
+
+
+def lock_out(scope, ident, now):
+    """
+    Lock an ip or email out of every login endpoint, each lockout in a
+    row lasts twice as long as the previous one.
+    :return: lockout duration in seconds.
+    """
+
+    cache = get_login_cache()
+    strikes_key = LOGIN_STRIKES_KEY.format(scope=scope, ident=ident)
+    cache.add(strikes_key, 0, settings.LOGIN_LOCKOUT_MAX_DURATION * 2)
+    strikes = cache.incr(strikes_key)
+
+    duration = min(
+        settings.LOGIN_LOCKOUT_BASE_DURATION * 2 ** (strikes - 1),
+        settings.LOGIN_LOCKOUT_MAX_DURATION,
+    )
+    cache.set(
+        LOGIN_LOCKOUT_KEY.format(scope=scope, ident=ident),
+        now + duration,
+        duration,
+    )
+    return duration
+
+
+def check_login_attempt(request, endpoint, email):
+    """
+    Count a login attempt against the budgets of the endpoint, before
+    its password is hashed.
+    :param request: login request, None when there is no client
+    :param endpoint: name of the budget in settings.LOGIN_THROTTLE_RATES
+    :param email: email the attempt logs in with
+    :return: seconds to wait if the attempt is rejected, otherwise None.
+    """
+
+    cache = get_login_cache()
+    now = time()
+    idents = []
+    if request is not None:
+        idents.append(('ip', get_client_ip(request)))
+    email = normalize_email(email)
+    if email:
+        idents.append(('email', email))
+
+    lockout_keys = {
+        LOGIN_LOCKOUT_KEY.format(scope=scope, ident=ident): scope
+        for scope, ident in idents
+    }
+    for key, locked_until in cache.get_many(lockout_keys).items():
+        if locked_until > now:
+            record_rejection(endpoint, lockout_keys[key])
+            return math.ceil(locked_until - now)
+
+    window = SlidingWindow(cache)
+    rates = settings.LOGIN_THROTTLE_RATES[endpoint]
+    for scope, ident in idents:
+        limit, duration = rates[scope]
+        key = LOGIN_ATTEMPTS_KEY.format(
+            endpoint=endpoint, scope=scope, ident=ident
+        )
+        if window.hit(key, now, duration) > limit:
+            record_rejection(endpoint, scope)
+            return lock_out(scope, ident, now)
+    return None
+
+
+def login_succeeded(email):
+    """
+    Forget the failed attempts and lockouts of an email after it logged in.
+    :param email: email of the logged-in user
+    """
+
+    cache = get_login_cache()
+    email = normalize_email(email)
+    keys = [
+        LOGIN_ATTEMPTS_KEY.format(
+            endpoint=endpoint, scope='email', ident=email
+        )
+        for endpoint in settings.LOGIN_THROTTLE_RATES
+    ]
+    SlidingWindow(cache).clear(keys)
+    cache.delete(LOGIN_STRIKES_KEY.format(scope='email', ident=email))
@@ -1,10 +1,182 @@
-from threading import Thread
+from collections import defaultdict
+from datetime import timedelta
+from hashlib import sha1
+from time import time
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
 
-class EmailThread(Thread):
-    def __init__(self, email_obj):
-        super().__init__()
-        self.email_obj = email_obj
+from jwt import decode
+from kombu.exceptions import OperationalError
 
-    def run(self) -> None:
-        self.email_obj.send()
+from .mails import build_message, render_mail, render_mails
+from .models import OutgoingEmail
+
+
+ACTIVATION_TOKEN_KEY = 'activation:token:{digest}'
+
+
+def decode_activation_token(token):
+    """
+    Return the user id of an activation token. A decoded token is cached
+    until it expires, clicking the same link again skips the signature
+    check.
+    :param token: jwt of the activation link
+    :return: user id
+    :raise ExpiredSignatureError, InvalidSignatureError: as jwt.decode
+    """
+
+    digest = sha1(token.encode()).hexdigest()
+    key = ACTIVATION_TOKEN_KEY.format(digest=digest)
+    user_id = cache.get(key)
+    if user_id is not None:
+        return user_id
+
+    decoded_token = decode(
+        jwt=token, key=settings.SECRET_KEY, algorithms=['HS256']
+    )
+    user_id = decoded_token.get('user_id')
+    expires_in = int(decoded_token.get('exp', 0) - time())
+    if user_id is not None and expires_in > 0:
+        cache.set(key, user_id, expires_in)
+    return user_id
+
+
+def queue_email(template_name, context, to, from_email='sender@example.com'):
+    """
+    Write an email to the outbox, in the transaction of the caller.
+    Celery is asked to send it once the transaction commits.
+    :param template_name: mail_templated template of the email
+    :param context: json serializable template context
+    :param to: recipient email address
+    :param from_email: sender email address
+    :return: OutgoingEmail
+    """
+
+    outgoing_email = OutgoingEmail.objects.create(
+        template_name=template_name,
+        context=context,
+        from_email=from_email,
+        to=to,
+    )
+    transaction.on_commit(schedule_outgoing_emails)
+    return outgoing_email
+
+
+def schedule_outgoing_emails():
+    from .tasks import send_outgoing_emails
+
+    try:
+        send_outgoing_emails.delay()
+    except OperationalError:
+        # the broker is down, the periodic drain sends the email later.
+        pass
+
+
+def render_outgoing_emails(outgoing_emails):
+    """
+    Render a batch of outbox emails with one `render_mails` call for each
+    template.
+    :param outgoing_emails: list of OutgoingEmail
+    :return: {OutgoingEmail id: RenderedMail}, the emails of a template
+        that failed are left out and rendered one by one when sent.
+    """
+
+    templates = defaultdict(list)
+    for outgoing_email in outgoing_emails:
+        templates[outgoing_email.template_name].append(outgoing_email)
+
+    rendered_mails = {}
+    for template_name, group in templates.items():
+        try:
+            rendered = render_mails(
+                template_name, [email.context for email in group]
+            )
+        except Exception:
+            continue
+        rendered_mails.update(zip([email.pk for email in group], rendered))
+    return rendered_mails
+
+
+def claim_due_emails(batch_size):
+    """
+    Claim a batch of the due outbox emails in a short transaction, their
+    next attempt is pushed EMAIL_OUTBOX_CLAIM_TIMEOUT seconds ahead so no
+    other worker picks them up while they are sent. The rows are locked
+    with SKIP LOCKED only while they are claimed, an email whose worker
+    died is sent again once its claim runs out.
+    :param batch_size: most emails claimed
+    :return: list of OutgoingEmail.
+    """
+
+    now = timezone.now()
+    with transaction.atomic():
+        outgoing_emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                status=OutgoingEmail.PENDING,
+                next_attempt_date__lte=now,
+            ).order_by('next_attempt_date')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in outgoing_emails]
+        ).update(
+            next_attempt_date=now + timedelta(
+                seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+            )
+        )
+    return outgoing_emails
+
+
+def send_due_emails(batch_size=None):
+    """
+    Send a batch of the due outbox emails over a single SMTP connection.
+    The batch is claimed first and sent outside of any transaction, each
+    sent email is deleted right away and each failed one scheduled again,
+    so concurrent workers send different batches and no lock is held
+    while the SMTP server answers.
+    :param batch_size: most emails sent, EMAIL_OUTBOX_BATCH_SIZE by default
+    :return: number of sent emails.
+    """
+
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    outgoing_emails = claim_due_emails(batch_size)
+    if not outgoing_emails:
+        return 0
+
+    rendered_mails = render_outgoing_emails(outgoing_emails)
+    sent = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for outgoing_email in outgoing_emails:
+            outgoing_email.retry_later(error)
+        return 0
+
+    try:
+        for outgoing_email in outgoing_emails:
+            # one bad email, like a broken template or a refused
+            # recipient, must not hold back the rest of the batch.
+            try:
+                rendered = rendered_mails.get(outgoing_email.pk)
+                if rendered is None:
+                    rendered = render_mail(
+                        outgoing_email.template_name, outgoing_email.context
+                    )
+                build_message(
+                    rendered,
+                    outgoing_email.from_email,
+                    [outgoing_email.to],
+                    connection=connection,
+                ).send()
+            except Exception as error:
+                outgoing_email.retry_later(error)
+            else:
+                OutgoingEmail.objects.filter(pk=outgoing_email.pk).delete()
+                sent += 1
+    finally:
+        connection.close()
+    return sent
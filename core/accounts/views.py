@@ -1,3 +1,5 @@
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.db import transaction
 from django.http import HttpResponseRedirect
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
@@ -12,15 +14,12 @@ from django.contrib.auth.views import (
     PasswordResetConfirmView, PasswordResetCompleteView
 )
 
-from jwt import decode
 from jwt.exceptions import ExpiredSignatureError, InvalidSignatureError
 
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from mail_templated import EmailMessage
-from decouple import config
-
-from .utils import EmailThread
+from .sessions import logout_other_sessions
+from .utils import decode_activation_token, queue_email
 from .forms import (
     UserCreationModelForm, AccountActivationResendForm,
     CustomAuthenticationForm
@@ -53,25 +52,26 @@ class AccountsRegisterFormView(FormView):
         :param form: registration form
         :return: if form valid register user.
         """
-        user_obj = form.save()
+        with transaction.atomic():
+            user_obj = form.save()
+            if user_obj is not None:
+                email = user_obj.email
+                username = user_obj.username
+                token = self.get_token_for_user(user_obj)
+
+                domain = 'http://127.0.0.1:8000/'
+                url = 'accounts/activation/confirm/'
+
+                queue_email(
+                    'email/activation_account.tpl',
+                    {
+                        'user': username,
+                        'token': f'{domain}{url}{token}/',
+                    },
+                    email
+                )
+
         if user_obj is not None:
-            email = user_obj.email
-            username = user_obj.username
-            token = self.get_token_for_user(user_obj)
-
-            domain = 'http://127.0.0.1:8000/'
-            url = 'accounts/activation/confirm/'
-
-            activation_email = EmailMessage(
-                'email/activation_account.tpl',
-                {
-                    'user': username,
-                    'token': f'{domain}{url}{token}/',
-                },
-                'sender@example.com',
-                [email]
-            )
-            EmailThread(activation_email).start()
             return HttpResponseRedirect(
                 reverse_lazy('accounts:activation_send')
             )
@@ -106,19 +106,12 @@ class AccountActivationConfirmTemplateView(TemplateView):
         context = {}
         token = kwargs.get('token')
         try:
-            decoded_token = decode(
-                jwt=token, key=config('SECRET_KEY'), algorithms=['HS256']
-            )
-            user_id = decoded_token.get('user_id')
-            user = User.objects.get(pk=user_id)
-            context["response"] = "Your account activated successfully."
-
-            if user.is_verified:
+            user_id = decode_activation_token(token)
+            if User.objects.activate(user_id):
+                context["response"] = "Your account activated successfully."
+            else:
                 context["response"] = "Your account has already verified."
 
-            user.is_verified = True
-            user.save()
-
         except ExpiredSignatureError:
             context["response"] = "Your token has been expired."
         except InvalidSignatureError:
@@ -176,18 +169,15 @@ class AccountActivationEmailResendFormView(FormView):
         domain = 'http://127.0.0.1:8000/'
         url = 'accounts/activation/confirm/'
 
-        activation_email = EmailMessage(
+        queue_email(
             'email/activation_account.tpl',
             {
                 'user': username,
                 'token': f'{domain}{url}{token}/',
             },
-            'sender@example.com',
-            [email]
+            email
         )
 
-        EmailThread(activation_email).start()
-
         return super(
             AccountActivationEmailResendFormView, self
         ).form_valid(form)
@@ -202,6 +192,12 @@ class AccountsPasswordChangeView(PasswordChangeView):
     template_name = 'accounts/change-password.html'
     success_url = reverse_lazy('accounts:password_change_done')
 
+    def form_valid(self, form):
+        response = super(AccountsPasswordChangeView, self).form_valid(form)
+        # the session of this request was kept by update_session_auth_hash.
+        logout_other_sessions(form.user, self.request)
+        return response
+
 
 # Account Password Change Done
 class AccountsPasswordChangeDoneView(PasswordChangeDoneView):
@@ -227,6 +223,13 @@ class AccountPasswordResetConfirmView(PasswordResetConfirmView):
     template_name = 'accounts/password-reset/password-reset-confirm.html'
     success_url = reverse_lazy('accounts:password_reset_complete')
 
+    def form_valid(self, form):
+        response = super(
+            AccountPasswordResetConfirmView, self
+        ).form_valid(form)
+        logout_other_sessions(form.user)
+        return response
+
 
 class AccountPasswordResetCompleteView(PasswordResetCompleteView):
     template_name = 'accounts/password-reset/password-reset-complete.html'
@@ -244,6 +247,7 @@ class AccountsLoginView(LoginView):
     redirect_authenticated_user = True
     success_msg = 'Logged in successfully'
     error_msg = 'Enter a correct email and password'
+    throttled_msg = 'Too many login attempts, try again later'
 
     def get_success_url(self):
         return reverse_lazy('task:list')
@@ -271,9 +275,20 @@ class AccountsLoginView(LoginView):
         return super(AccountsLoginView, self).form_valid(form)
 
     def form_invalid(self, form):
-        messages.error(self.request, self.error_msg)
+        # a throttled or shed attempt is not checked, its credentials may
+        # be right.
+        if form.has_error(NON_FIELD_ERRORS, 'throttled'):
+            messages.error(self.request, self.throttled_msg)
+            status_code = 429
+        elif form.has_error(NON_FIELD_ERRORS, 'busy'):
+            messages.error(self.request, self.throttled_msg)
+            status_code = 503
+        else:
+            messages.error(self.request, self.error_msg)
+            status_code = 401
+
         response = super(AccountsLoginView, self).form_invalid(form)
-        response.status_code = 401
+        response.status_code = status_code
         return response
 
 
@@ -0,0 +1,10 @@
+from django.db.backends.postgresql import base
+
+from core.connections import PersistentConnectionMixin
+
+
+class DatabaseWrapper(PersistentConnectionMixin, base.DatabaseWrapper):
+    """
+    django's postgresql backend with health checks of persistent
+    connections, the optional pool and connection metrics.
+    """
@@ -1,6 +1,8 @@
 import os
 
 from celery import Celery
+from celery.signals import task_postrun, task_prerun
+from django import db
 
 
 # Set the default Django settings module for the 'celery' program.
@@ -16,3 +18,12 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
+
+
+@task_prerun.connect
+@task_postrun.connect
+def close_old_connections(sender=None, **kwargs):
+    # like a request, a task drops connections past CONN_MAX_AGE or broken
+    # by an error and checks the others before its first query.
+    if not getattr(sender.request, 'is_eager', False):
+        db.close_old_connections()
@@ -0,0 +1,312 @@
+import json
+import logging
+import os
+import socket
+import threading
+from time import perf_counter, time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db import OperationalError
+
+from django_redis.cache import RedisCache
+
+
+logger = logging.getLogger(__name__)
+
+DB_CONNECTIONS_KEY = 'db:connections:{counter}'
+DB_CONNECTION_PROCESSES_KEY = 'db:connections:processes'
+
+DB_CONNECTION_COUNTERS = (
+    'opened', 'closed', 'reused', 'unusable', 'acquired', 'wait_ms',
+)
+
+
+def get_metrics_cache():
+    return caches[DEFAULT_CACHE_ALIAS]
+
+
+class ConnectionMetrics:
+    """
+    Connection counters of this process. They are added to the totals of
+    every process in the cache at most every DATABASE_METRICS_INTERVAL
+    seconds, with the connections this process holds open and the most
+    it ever held, so max_connections can be sized against the workers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.counters = dict.fromkeys(DB_CONNECTION_COUNTERS, 0)
+        self.open = 0
+        self.peak = 0
+        self.flushed_at = time()
+
+    def record(self, counter, amount=1):
+        with self.lock:
+            # a forked worker starts counting on its own.
+            if self.pid != os.getpid():
+                self.reset()
+            self.counters[counter] += amount
+            if counter == 'opened':
+                self.open += amount
+                self.peak = max(self.peak, self.open)
+            elif counter == 'closed':
+                self.open -= amount
+            if time() - self.flushed_at < settings.DATABASE_METRICS_INTERVAL:
+                return
+            counters, self.counters = self.counters, dict.fromkeys(
+                DB_CONNECTION_COUNTERS, 0
+            )
+            process = {'open': self.open, 'peak': self.peak}
+            self.flushed_at = time()
+        self.flush(counters, process)
+
+    def flush(self, counters, process):
+        # the metrics run inside connect and close, a cache outage must
+        # not fail them, it only loses the counts of this interval.
+        try:
+            self.write(counters, process)
+        except Exception:
+            logger.warning(
+                'Database connection metrics were not written to the cache.',
+                exc_info=True,
+            )
+
+    def write(self, counters, process):
+        cache = get_metrics_cache()
+        name = f'{socket.gethostname()}:{self.pid}'
+        process['updated'] = time()
+
+        if isinstance(cache, RedisCache):
+            # INCRBY creates a missing or evicted counter, one round trip.
+            pipeline = cache.client.get_client(write=True).pipeline()
+            for counter, amount in counters.items():
+                if amount:
+                    key = DB_CONNECTIONS_KEY.format(counter=counter)
+                    pipeline.incrby(cache.client.make_key(key), amount)
+            pipeline.hset(
+                cache.client.make_key(DB_CONNECTION_PROCESSES_KEY),
+                name, json.dumps(process),
+            )
+            pipeline.execute()
+            return
+
+        for counter, amount in counters.items():
+            if amount:
+                key = DB_CONNECTIONS_KEY.format(counter=counter)
+                cache.add(key, 0, None)
+                cache.incr(key, amount)
+        processes = cache.get(DB_CONNECTION_PROCESSES_KEY, {})
+        processes[name] = json.dumps(process)
+        cache.set(DB_CONNECTION_PROCESSES_KEY, processes, None)
+
+
+metrics = ConnectionMetrics()
+
+
+def get_connection_metrics():
+    """
+    Totals of every process since the counters were created, and the
+    connections of each process that reported in the last three
+    DATABASE_METRICS_INTERVAL; the others are forgotten.
+    :return: dict of the counters, 'processes' maps 'host:pid' to a dict
+        of its open and peak connections.
+    """
+
+    cache = get_metrics_cache()
+    keys = {
+        counter: DB_CONNECTIONS_KEY.format(counter=counter)
+        for counter in DB_CONNECTION_COUNTERS
+    }
+    totals = cache.get_many(keys.values())
+    result = {counter: totals.get(key, 0) for counter, key in keys.items()}
+
+    if isinstance(cache, RedisCache):
+        client = cache.client.get_client(write=True)
+        key = cache.client.make_key(DB_CONNECTION_PROCESSES_KEY)
+        processes = {
+            name.decode(): value for name, value in client.hgetall(key).items()
+        }
+    else:
+        processes = cache.get(DB_CONNECTION_PROCESSES_KEY, {})
+
+    stale = time() - settings.DATABASE_METRICS_INTERVAL * 3
+    result['processes'] = {}
+    for name, value in processes.items():
+        process = json.loads(value)
+        if process.pop('updated') > stale:
+            result['processes'][name] = process
+    return result
+
+
+class ConnectionPool:
+    """
+    Connections of one database shared by the threads of a process. At
+    most `size` of them are in use at once, a thread waits up to `timeout`
+    seconds for one to be released. An idle connection is checked before
+    it is handed out and replaced if the server dropped it.
+    """
+
+    def __init__(self, size, timeout):
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(size)
+        self.idle = []
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def acquire(self, connect, ping):
+        """
+        :param connect: callable opening a new connection
+        :param ping: callable taking a connection, True if it works
+        :return: DB-API connection.
+        """
+
+        started = perf_counter()
+        if not self.slots.acquire(timeout=self.timeout):
+            raise OperationalError(
+                f'No database connection was released in {self.timeout}s.'
+            )
+        try:
+            metrics.record('acquired')
+            metrics.record(
+                'wait_ms', round((perf_counter() - started) * 1000)
+            )
+            while True:
+                with self.lock:
+                    connection = self.idle.pop() if self.idle else None
+                if connection is None:
+                    connection = connect()
+                    metrics.record('opened')
+                    return connection
+                if ping(connection):
+                    metrics.record('reused')
+                    return connection
+                metrics.record('unusable')
+                self.discard(connection)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def release(self, connection):
+        """
+        Roll back what the connection left open and keep it for the next
+        thread, a connection that can't be rolled back is closed.
+        """
+
+        try:
+            connection.rollback()
+        except Exception:
+            self.discard(connection)
+        else:
+            with self.lock:
+                self.idle.append(connection)
+        finally:
+            self.slots.release()
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        metrics.record('closed')
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(alias):
+    """
+    :return: ConnectionPool of the database in this process, None when
+        each thread keeps its own connection.
+    """
+
+    if settings.DATABASE_POOL_SIZE <= 0:
+        return None
+
+    # a forked worker can't share the sockets of its parent.
+    pool = _pools.get(alias)
+    if pool is None or pool.pid != os.getpid():
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None or pool.pid != os.getpid():
+                pool = _pools[alias] = ConnectionPool(
+                    settings.DATABASE_POOL_SIZE,
+                    settings.DATABASE_POOL_TIMEOUT,
+                )
+    return pool
+
+
+class PersistentConnectionMixin:
+    """
+    DatabaseWrapper mixin for persistent connections. A connection kept
+    from an earlier request is checked before its first query of the
+    request when CONN_HEALTH_CHECKS is set, and dropped if the server
+    closed it, instead of failing the request. With DATABASE_POOL_SIZE
+    the threads of a process share a pool of connections rather than
+    keeping one each, for ASGI and threaded workers.
+    """
+
+    health_check_done = False
+
+    def ping(self, connection):
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+        except self.Database.Error:
+            return False
+        return True
+
+    def get_new_connection(self, conn_params):
+        parent = super(PersistentConnectionMixin, self)
+        pool = get_connection_pool(self.alias)
+        if pool is not None:
+            connection = pool.acquire(
+                lambda: parent.get_new_connection(conn_params), self.ping
+            )
+        else:
+            connection = parent.get_new_connection(conn_params)
+            metrics.record('opened')
+        self.health_check_done = True
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = get_connection_pool(self.alias)
+        if pool is not None:
+            pool.release(self.connection)
+            return
+        try:
+            super(PersistentConnectionMixin, self)._close()
+        finally:
+            metrics.record('closed')
+
+    def close_if_unusable_or_obsolete(self):
+        # runs when a request or task starts and finishes.
+        super(PersistentConnectionMixin, self).close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def close_if_health_check_failed(self):
+        if (
+            self.connection is None
+            or self.health_check_done
+            or self.in_atomic_block
+            or not self.settings_dict.get('CONN_HEALTH_CHECKS')
+        ):
+            return
+        self.health_check_done = True
+        if self.ping(self.connection):
+            metrics.record('reused')
+        else:
+            metrics.record('unusable')
+            self.close()
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super(PersistentConnectionMixin, self)._cursor(name)
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.connections import get_connection_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Showing the database connections opened and reused by every "
+        "process, and how many each of them holds, to size max_connections "
+        "against the number of workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database whose server limits are shown.'
+        )
+
+    def server_stats(self, alias):
+        connection = connections[alias]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW max_connections')
+            max_connections = int(cursor.fetchone()[0])
+            cursor.execute(
+                'SELECT count(*) FROM pg_stat_activity '
+                'WHERE datname = current_database()'
+            )
+            in_use = cursor.fetchone()[0]
+        return max_connections, in_use
+
+    def handle(self, *args, **options):
+        stats = get_connection_metrics()
+        processes = stats.pop('processes')
+        acquired, wait_ms = stats.pop('acquired'), stats.pop('wait_ms')
+
+        for counter, total in stats.items():
+            self.stdout.write(f'{counter}: {total}')
+        if acquired:
+            self.stdout.write(
+                f'pool waits: {acquired}, {wait_ms / acquired:.1f} ms on '
+                f'average'
+            )
+
+        for name, process in sorted(processes.items()):
+            self.stdout.write(
+                f'{name}: {process["open"]} open, {process["peak"]} at most'
+            )
+        peak = sum(process['peak'] for process in processes.values())
+        self.stdout.write(
+            f'{len(processes)} processes hold up to {peak} connections'
+        )
+
+        server = self.server_stats(options['database'])
+        if server is not None:
+            max_connections, in_use = server
+            message = (
+                f'server: {in_use} connections of max_connections '
+                f'{max_connections}'
+            )
+            if peak > max_connections:
+                self.stdout.write(self.style.WARNING(message))
+            else:
+                self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,129 @@
+import random
+from contextvars import ContextVar
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from accounts.principals import get_request_user_id
+
+
+REPLICA_PIN_KEY = 'db:pin:{client}'
+REPLICA_USER_PIN_KEY = 'db:pin:user:{user_id}'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingState:
+    """
+    Database routing of the current request: whether its reads may go to
+    a replica, and whether it wrote to the primary.
+    """
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+# no state outside of a request, celery tasks and commands read the primary.
+_routing_state = ContextVar('routing_state', default=None)
+
+
+class PrimaryReplicaRouter:
+    """
+    Send the reads of safe requests to a random replica and everything
+    else to the primary. A request that writes reads its own writes, the
+    rest of it reads from the primary, and so does a transaction.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or not state.use_replica:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.use_replica = False
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same rows as the primary.
+        return True
+
+
+def get_pin_key(request):
+    """
+    Identify the client of a request without a database query, by its
+    session, its token or jwt, or its address.
+    :return: cache key of the client's pin to the primary.
+    """
+
+    client = (
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get('HTTP_AUTHORIZATION')
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return get_client_pin_key(client)
+
+
+def get_client_pin_key(client):
+    digest = sha1(client.encode()).hexdigest()
+    return REPLICA_PIN_KEY.format(client=digest)
+
+
+def get_user_pin_key(user_id):
+    return REPLICA_USER_PIN_KEY.format(user_id=user_id)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe requests read from the replicas, unless their user or, for
+    anonymous requests, their client wrote in the last
+    REPLICA_PIN_TIMEOUT seconds. A user always reads their own writes
+    while the replicas catch up, from every client, so no stale list is
+    cached or tagged under the generation the write bumped.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        pin_key = get_pin_key(request)
+        is_safe = request.method in SAFE_METHODS
+        use_replica = False
+        if is_safe:
+            pin_keys = [pin_key]
+            user_id = get_request_user_id(request)
+            if user_id is not None:
+                pin_keys.append(get_user_pin_key(user_id))
+            use_replica = not cache.get_many(pin_keys)
+        state = RoutingState(use_replica=use_replica)
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+
+        if state.wrote or not is_safe:
+            pin_keys = [pin_key]
+            # a login or signup cycles the session key, the next request
+            # of the client comes with the new cookie.
+            session_cookie = response.cookies.get(settings.SESSION_COOKIE_NAME)
+            if session_cookie is not None and session_cookie.value:
+                pin_keys.append(get_client_pin_key(session_cookie.value))
+            # the user the request authenticated or logged in as.
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_keys.append(get_user_pin_key(user.pk))
+            cache.set_many(
+                dict.fromkeys(pin_keys, 1), settings.REPLICA_PIN_TIMEOUT
+            )
+        return response
@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     'drf_yasg',
     'debug_toolbar',
 
+    'core',
     'accounts.apps.AccountsConfig',
     'todo.apps.TodoConfig'
 ]
@@ -59,12 +60,14 @@ MIDDLEWARE = [
     'debug_toolbar.middleware.DebugToolbarMiddleware',
 
     'django.middleware.security.SecurityMiddleware',
+    'core.routers.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'accounts.middleware.PasswordHashingBusyMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -91,17 +94,57 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# postgresql goes through core.backends.postgresql, django's backend with
+# health checks, the connection pool and connection metrics.
+SQL_ENGINE = config("SQL_ENGINE")
+if SQL_ENGINE == 'django.db.backends.postgresql':
+    SQL_ENGINE = 'core.backends.postgresql'
+
+# each thread keeps its connection for SQL_CONN_MAX_AGE seconds and checks
+# it before its first query of a request. with SQL_POOL_SIZE the threads
+# of a process share that many connections instead, a connection goes
+# back to the pool at the end of each request and a thread waits up to
+# DATABASE_POOL_TIMEOUT seconds for one.
+DATABASE_POOL_SIZE = config('SQL_POOL_SIZE', default=0, cast=int)
+DATABASE_POOL_TIMEOUT = 10
+SQL_CONN_MAX_AGE = config('SQL_CONN_MAX_AGE', default=60, cast=int)
+
 DATABASES = {
     'default': {
-        "ENGINE": config("SQL_ENGINE"),
+        "ENGINE": SQL_ENGINE,
         "NAME": config("SQL_DATABASE"),
         "USER": config("SQL_USER"),
         "PASSWORD": config("SQL_PASSWORD"),
         "HOST": config("SQL_HOST"),
         "PORT": config("SQL_PORT"),
+        "CONN_MAX_AGE": 0 if DATABASE_POOL_SIZE else SQL_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# processes add their connection counters to the totals in the cache at
+# most this often, see the db_connection_stats command.
+DATABASE_METRICS_INTERVAL = 30
+
+# read replicas share the credentials of the primary, one alias per host
+# of SQL_REPLICA_HOSTS. safe requests read from them, a client that wrote
+# reads from the primary for REPLICA_PIN_TIMEOUT seconds.
+SQL_REPLICA_HOSTS = config(
+    'SQL_REPLICA_HOSTS',
+    cast=lambda hosts: [host.strip() for host in hosts.split(',') if host],
+    default=''
+)
+for number, host in enumerate(SQL_REPLICA_HOSTS):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+REPLICA_PIN_TIMEOUT = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -121,6 +164,29 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# the first hasher is the preferred one, a user whose password is stored
+# with another hasher or fewer iterations is rehashed on the next login.
+PASSWORD_HASHERS = config(
+    'PASSWORD_HASHERS',
+    cast=lambda hashers: [hasher.strip() for hasher in hashers.split(',')],
+    default='django.contrib.auth.hashers.PBKDF2PasswordHasher,'
+            'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher,'
+            'django.contrib.auth.hashers.Argon2PasswordHasher,'
+            'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+)
+
+# by default passwords are hashed in the request thread. with WORKERS
+# each web and celery process hashes them in its own pool of that many
+# processes, at most WORKERS at once and QUEUE_SIZE more waiting. a
+# request that can't get a place within TIMEOUT seconds gets a 503.
+PASSWORD_HASHING_WORKERS = config(
+    'PASSWORD_HASHING_WORKERS', default=0, cast=int
+)
+PASSWORD_HASHING_QUEUE_SIZE = config(
+    'PASSWORD_HASHING_QUEUE_SIZE', default=32, cast=int
+)
+PASSWORD_HASHING_TIMEOUT = 5
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
@@ -162,6 +228,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# sessions, tokens and jwt load the user from the principal cache.
+AUTHENTICATION_BACKENDS = ['accounts.authentications.CachedModelBackend']
+PRINCIPAL_CACHE_TIMEOUT = 60 * 5
+
 
 # Configure Internal IPs for Debug Toolbar for Docker
 
@@ -177,10 +247,36 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         # 'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
-    ]
+        'accounts.authentications.CachedTokenAuthentication',
+        'accounts.authentications.CachedJWTAuthentication'
+    ],
+    'EXCEPTION_HANDLER': 'accounts.api.exceptions.api_exception_handler',
+    # proxies in front of django, the client ip is the address the
+    # outermost of them saw. 0 when django is reached directly, 1 behind
+    # the nginx of default.conf, which appends to X-Forwarded-For.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+}
+
+# revoked jwt ids are checked in a redis bloom filter of 1 MiB per refresh
+# token lifetime, about 1% false positives with 850k revocations a day.
+JWT_REVOCATION_BLOOM_BITS = 2 ** 23
+JWT_REVOCATION_BLOOM_HASHES = 7
+
+
+# Login Throttle Config
+
+# login attempts are counted before their password is hashed, as
+# (attempts, seconds) sliding windows per client ip and per email.
+# going over a budget locks the ip or email out of every login endpoint,
+# for twice as long on each lockout in a row.
+LOGIN_THROTTLE_RATES = {
+    'form': {'ip': (30, 60 * 5), 'email': (10, 60 * 5)},
+    'session': {'ip': (30, 60 * 5), 'email': (10, 60 * 5)},
+    'token': {'ip': (30, 60 * 5), 'email': (10, 60 * 5)},
+    'jwt': {'ip': (60, 60 * 5), 'email': (10, 60 * 5)},
 }
+LOGIN_LOCKOUT_BASE_DURATION = 60
+LOGIN_LOCKOUT_MAX_DURATION = 60 * 60
 
 
 # Email Configuration
@@ -191,11 +287,26 @@ EMAIL_HOST = config("EMAIL_HOST")
 EMAIL_PORT = config("EMAIL_PORT")
 EMAIL_HOST_USER = config("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
+EMAIL_TIMEOUT = 10
+
+# emails are written to the accounts outbox and sent by celery in batches
+# over one smtp connection, a failed email is tried again after 1, 2, 4
+# and 8 minutes.
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_OUTBOX_DRAIN_INTERVAL = 60
+# a claimed batch is left to its worker for as long as sending every
+# email of it can take, then it is sent again by another worker.
+EMAIL_OUTBOX_CLAIM_TIMEOUT = EMAIL_OUTBOX_BATCH_SIZE * EMAIL_TIMEOUT + 60
 
 
 # Celery Config
 
 CELERY_BROKER_URL = 'redis://redis:6379/1'
+# workers keep their connections between tasks like the web processes do
+# between requests, celery itself closes them every 1000 tasks.
+CELERY_DB_REUSE_MAX = 1000
 
 
 # Caching Config for django-redis
@@ -209,3 +320,69 @@ CACHES = {
         }
     }
 }
+
+
+# Session Config
+
+# sessions live in the cache only, each user's session keys are indexed
+# so a password change logs the user out of every other session at once.
+SESSION_ENGINE = 'accounts.sessions'
+SESSION_CACHE_ALIAS = 'default'
+
+
+# Weather Config for openweather api
+
+OPEN_WEATHER_URL = config(
+    'OPEN_WEATHER_URL',
+    default='https://api.openweathermap.org/data/2.5/weather'
+)
+OPEN_WEATHER_API_KEY = config('OPEN_WEATHER_API_KEY')
+WEATHER_CITY_NAME = config('CITY_NAME')
+WEATHER_UNITS = config('UNITS')
+
+# celery beat refreshes the weather every 10 min, a cached value is fresh
+# for 20 min and a stale one is still served for up to 6 hours.
+# each process keeps its own copy for 30 sec in front of redis.
+WEATHER_REFRESH_INTERVAL = 60 * 10
+WEATHER_FRESH_TIMEOUT = 60 * 20
+WEATHER_STALE_TIMEOUT = 60 * 60 * 6
+WEATHER_LOCAL_TIMEOUT = 30
+WEATHER_LOCK_TIMEOUT = 30
+WEATHER_REQUEST_TIMEOUT = 5
+WEATHER_REQUEST_RETRIES = 3
+
+
+# Task Pagination
+
+TASK_PAGE_SIZE = 50
+TASK_MAX_PAGE_SIZE = 200
+
+# most tasks created by one request to the bulk api.
+TASK_BULK_MAX_SIZE = 500
+
+# delete_complete_tasks purges every complete task in chunks of primary
+# keys, each chunk is one short transaction. beat archives them instead,
+# the purge is only run by hand. a run stops before its lock expires and
+# the next run goes on with the rest.
+TASK_PURGE_BATCH_SIZE = 1000
+TASK_PURGE_BATCH_PAUSE = 0.05
+TASK_PURGE_LOCK_TIMEOUT = 60 * 9
+
+# beat moves tasks complete for a day to the append-only archive every
+# 10 min, in chunks like the purge. a user's archive is streamed as
+# json lines, read from the database in chunks.
+TASK_ARCHIVE_GRACE_PERIOD = 60 * 60 * 24
+TASK_ARCHIVE_BATCH_SIZE = 1000
+TASK_ARCHIVE_BATCH_PAUSE = 0.05
+TASK_ARCHIVE_LOCK_TIMEOUT = 60 * 9
+TASK_ARCHIVE_STREAM_CHUNK_SIZE = 500
+
+
+# Task List Fragment Cache
+
+# rendered task list pages are cached per user generation, the pages of
+# old generations are never read again and just expire.
+TASK_LIST_CACHE_TIMEOUT = 60 * 60
+TASK_SEARCH_CACHE_TIMEOUT = 5 * 60
+# rendered pages larger than this are not cached, in characters.
+TASK_FRAGMENT_MAX_SIZE = 256 * 1024
@@ -0,0 +1,167 @@
+from io import StringIO
+
+import pytest
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.db.backends.sqlite3 import base
+
+from core import connections as db_connections
+from core.connections import PersistentConnectionMixin, get_connection_metrics
+
+
+class DatabaseWrapper(PersistentConnectionMixin, base.DatabaseWrapper):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def connection_metrics(settings):
+    cache.clear()
+    settings.DATABASE_METRICS_INTERVAL = 0
+    settings.DATABASE_POOL_SIZE = 0
+    db_connections.metrics.reset()
+    db_connections._pools.clear()
+
+
+@pytest.fixture
+def make_wrapper(tmp_path):
+    """
+    Thread connections to a sqlite file, django keeps in-memory sqlite
+    databases open and never closes them.
+    """
+
+    wrappers = []
+
+    def make_wrapper():
+        wrapper = DatabaseWrapper({
+            **connections['default'].settings_dict,
+            'NAME': str(tmp_path / 'connections.sqlite3'),
+            'CONN_MAX_AGE': 60,
+            'CONN_HEALTH_CHECKS': True,
+        }, alias='connections_test')
+        wrappers.append(wrapper)
+        return wrapper
+
+    yield make_wrapper
+    for wrapper in wrappers:
+        wrapper.close()
+
+
+def select_one(wrapper):
+    with wrapper.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        return cursor.fetchone()[0]
+
+
+def end_request(wrapper):
+    # what close_old_connections does at the start and end of a request.
+    wrapper.close_if_unusable_or_obsolete()
+
+
+@pytest.mark.django_db
+class TestCorePersistentConnections:
+
+    def test_connection_is_checked_once_per_request(self, make_wrapper):
+        wrapper = make_wrapper()
+        select_one(wrapper)
+        select_one(wrapper)
+        end_request(wrapper)
+        select_one(wrapper)
+        select_one(wrapper)
+
+        metrics = get_connection_metrics()
+        assert metrics['opened'] == 1
+        assert metrics['reused'] == 1
+        assert metrics['unusable'] == 0
+
+    def test_broken_connection_is_replaced_before_the_query(
+            self, make_wrapper
+    ):
+        wrapper = make_wrapper()
+        select_one(wrapper)
+        end_request(wrapper)
+        # the server closed the connection between two requests.
+        wrapper.connection.close()
+
+        assert select_one(wrapper) == 1
+        metrics = get_connection_metrics()
+        assert metrics['opened'] == 2
+        assert metrics['closed'] == 1
+        assert metrics['unusable'] == 1
+
+    def test_process_reports_its_open_connections(
+            self, make_wrapper, settings
+    ):
+        first, second = make_wrapper(), make_wrapper()
+        select_one(first)
+        select_one(second)
+        first.close()
+
+        # processes that didn't report in the last three intervals are gone.
+        settings.DATABASE_METRICS_INTERVAL = 60
+        processes = get_connection_metrics()['processes']
+        assert list(processes.values()) == [{'open': 1, 'peak': 2}]
+
+        out = StringIO()
+        call_command('db_connection_stats', stdout=out)
+        assert '1 processes hold up to 2 connections' in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestCoreConnectionPool:
+
+    def test_threads_share_released_connections(self, make_wrapper, settings):
+        settings.DATABASE_POOL_SIZE = 2
+        first, second = make_wrapper(), make_wrapper()
+        select_one(first)
+        raw_connection = first.connection
+        first.close()
+
+        select_one(second)
+        assert second.connection is raw_connection
+        metrics = get_connection_metrics()
+        assert metrics['opened'] == 1
+        assert metrics['reused'] == 1
+        assert metrics['acquired'] == 2
+
+    def test_exhausted_pool_times_out(self, make_wrapper, settings):
+        settings.DATABASE_POOL_SIZE = 1
+        settings.DATABASE_POOL_TIMEOUT = 0.01
+        first, second = make_wrapper(), make_wrapper()
+        select_one(first)
+
+        with pytest.raises(OperationalError):
+            select_one(second)
+        first.close()
+        assert select_one(second) == 1
+
+    def test_broken_idle_connection_is_not_handed_out(
+            self, make_wrapper, settings
+    ):
+        settings.DATABASE_POOL_SIZE = 1
+        first, second = make_wrapper(), make_wrapper()
+        select_one(first)
+        raw_connection = first.connection
+        first.close()
+        raw_connection.close()
+
+        assert select_one(second) == 1
+        assert second.connection is not raw_connection
+        assert get_connection_metrics()['unusable'] == 1
+
+    def test_cache_outage_does_not_hold_pool_slots(
+            self, make_wrapper, settings, monkeypatch
+    ):
+        def get_metrics_cache():
+            raise ConnectionError('cache is down')
+
+        monkeypatch.setattr(
+            db_connections, 'get_metrics_cache', get_metrics_cache
+        )
+        settings.DATABASE_POOL_SIZE = 1
+        settings.DATABASE_POOL_TIMEOUT = 0.01
+        wrapper = make_wrapper()
+        for _ in range(3):
+            assert select_one(wrapper) == 1
+            wrapper.close()
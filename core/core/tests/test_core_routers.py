@@ -0,0 +1,146 @@
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from todo.models import Task
+
+
+User = get_user_model()
+
+REPLICA = 'replica_test'
+
+
+@pytest.fixture
+def replica(settings):
+    """
+    A second sqlite database standing for a replica. Nothing is copied to
+    it, rows written to the primary during a test look like replication
+    lag.
+    """
+
+    connections.databases[REPLICA] = {
+        **connections['default'].settings_dict,
+        'NAME': f'file:{REPLICA}?mode=memory&cache=shared',
+    }
+    call_command('migrate', database=REPLICA, verbosity=0)
+    settings.DATABASE_REPLICAS = [REPLICA]
+    yield connections[REPLICA]
+
+    # django keeps in-memory sqlite databases open, this drops it.
+    if connections[REPLICA].connection is not None:
+        connections[REPLICA].connection.close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+@pytest.fixture
+def test_user(replica):
+    user = User.objects.create_user(
+        email='test@test.com',
+        username='test_username',
+        password='far!@#$%'
+    )
+    # the user was replicated before the test.
+    user.save(using=REPLICA, force_insert=True)
+    return user
+
+
+def count_queries(client, method, url, **kwargs):
+    with CaptureQueriesContext(connections['default']) as primary:
+        with CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = getattr(client, method)(url, **kwargs)
+    return response, len(primary), len(replica)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCoreReplicaRouter:
+
+    def test_safe_request_reads_from_replica(self, client, test_user):
+        Task.objects.create(user=test_user, title='test_title')
+        client.force_login(test_user)
+
+        response, primary, replica = count_queries(
+            client, 'get', reverse('task:api-v1:task-list')
+        )
+        assert response.status_code == 200
+        assert (primary, replica > 0) == (0, True)
+        # the task isn't replicated yet.
+        assert response.json()['results'] == []
+
+    def test_client_reads_its_writes_from_primary(self, client, test_user):
+        client.force_login(test_user)
+        response, primary, replica = count_queries(
+            client, 'post', reverse('task:api-v1:task-list'),
+            data={'title': 'test_title', 'descriptions': 'test'},
+        )
+        assert response.status_code == 201
+        assert replica == 0
+
+        response, primary, replica = count_queries(
+            client, 'get', reverse('task:api-v1:task-list')
+        )
+        assert replica == 0
+        assert len(response.json()['results']) == 1
+
+    def test_user_reads_its_writes_from_every_client(
+            self, client, test_user
+    ):
+        client.force_login(test_user)
+        other_client = Client()
+        other_client.force_login(test_user)
+
+        response = client.post(
+            reverse('task:api-v1:task-list'),
+            data={'title': 'test_title', 'descriptions': 'test'},
+        )
+        assert response.status_code == 201
+
+        response, primary, replica = count_queries(
+            other_client, 'get', reverse('task:api-v1:task-list')
+        )
+        assert replica == 0
+        assert len(response.json()['results']) == 1
+
+    def test_login_pins_the_new_session(self, client, test_user):
+        User.objects.filter(pk=test_user.pk).update(is_verified=True)
+        response = client.post(
+            reverse('accounts:api-v1:session-login'),
+            {'email': test_user.email, 'password': 'far!@#$%'},
+        )
+        assert response.status_code == 202
+
+        # the task isn't replicated yet, the client reads it anyway.
+        Task.objects.create(user=test_user, title='test_title')
+        response, primary, replica = count_queries(
+            client, 'get', reverse('task:api-v1:task-list')
+        )
+        assert replica == 0
+        assert len(response.json()['results']) == 1
+
+    def test_safe_request_that_writes_pins_the_client(
+            self, client, test_user
+    ):
+        task = Task.objects.create(user=test_user, title='test_title')
+        task.save(using=REPLICA, force_insert=True)
+        client.force_login(test_user)
+
+        response, primary, replica = count_queries(
+            client, 'get',
+            reverse('task:complete', kwargs={'task_id': task.pk})
+        )
+        assert primary > 0
+
+        response, primary, replica = count_queries(
+            client, 'get', reverse('task:api-v1:task-list')
+        )
+        assert replica == 0
+
+    def test_reads_outside_of_requests_use_primary(self, test_user):
+        with CaptureQueriesContext(connections[REPLICA]) as replica:
+            assert Task.objects.count() == 0
+        assert len(replica) == 0
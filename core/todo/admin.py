@@ -9,9 +9,12 @@ class TaskAdmin(admin.ModelAdmin):
     list_display = ('title', 'complete', 'created_date')
     actions = ('tasks_cancellation',)
 
+    def delete_queryset(self, request, queryset):
+        queryset.purge()
+
     @admin.action(description='tasks_cancellation')
     def tasks_cancellation(self, request, queryset):
-        updated_count = queryset.update(complete=False)
+        updated_count = queryset.set_complete(False)
         self.message_user(
             request,
             f'{updated_count} tasks were successfully updated.'
@@ -0,0 +1,94 @@
+from hashlib import sha1
+
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+from rest_framework.response import Response
+from rest_framework.status import (
+    HTTP_304_NOT_MODIFIED,
+    HTTP_412_PRECONDITION_FAILED
+)
+
+from todo.caching import get_task_generation
+
+
+class TaskETagMixin:
+    """
+    Conditional requests for the task list and detail.
+
+    The ETag of a response is derived from the user's task generation of
+    `todo.caching`, which changes on every write of the user's tasks, so
+    it is known before the tasks are queried: `If-None-Match` is answered
+    with 304 without running the main query, and `If-Match` makes PUT,
+    PATCH and DELETE fail with 412 when the task list changed since the
+    client read it.
+    """
+
+    def get_etag(self, request):
+        generation = get_task_generation(request.user.id)
+        representation = request.accepted_renderer.format
+        url = request.build_absolute_uri()
+        digest = sha1(f'{generation}|{representation}|{url}'.encode())
+        return f'"{digest.hexdigest()}"'
+
+    def set_etag(self, response, etag):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+        # clients may keep the response but must revalidate it.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def conditional_read(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+        return self.set_etag(response, etag)
+
+    def conditional_write(self, handler, request, *args, **kwargs):
+        if_match = request.headers.get('If-Match')
+        if if_match is None:
+            response = handler(request, *args, **kwargs)
+        else:
+            with transaction.atomic():
+                # writes of the same task wait here, the first one bumps
+                # the generation and the others fail the check below.
+                pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+                list(
+                    self.get_queryset().select_for_update().filter(
+                        pk=pk
+                    ).values_list('pk')
+                )
+                etags = parse_etags(if_match)
+                if '*' not in etags and self.get_etag(request) not in etags:
+                    return Response(
+                        {'detail': 'The task was changed, read it again.'},
+                        status=HTTP_412_PRECONDITION_FAILED,
+                    )
+                response = handler(request, *args, **kwargs)
+
+        # the etag of the new state, read after the commit bumped the
+        # generation, lets the client write again without a GET.
+        return self.set_etag(response, self.get_etag(request))
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_read(
+            super(TaskETagMixin, self).list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_read(
+            super(TaskETagMixin, self).retrieve, request, *args, **kwargs
+        )
+
+    def update(self, request, *args, **kwargs):
+        return self.conditional_write(
+            super(TaskETagMixin, self).update, request, *args, **kwargs
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        return self.conditional_write(
+            super(TaskETagMixin, self).destroy, request, *args, **kwargs
+        )
@@ -0,0 +1,17 @@
+from rest_framework.filters import SearchFilter
+
+from todo.search import search_tasks
+
+
+class TaskSearchFilter(SearchFilter):
+    """
+    Full text search over task title and descriptions through the
+    `search` query parameter, results are ordered by relevance.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        return search_tasks(queryset, ' '.join(search_terms))
@@ -0,0 +1,104 @@
+from collections import OrderedDict
+
+from django.conf import settings
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from todo.pagination import (
+    decode_cursor, encode_cursor, is_ranked, paginate_keyset,
+)
+
+
+class TaskCursorPagination(BasePagination):
+    """
+    Keyset pagination over (complete, created_date, id) of the tasks,
+    or (search_rank, id) of search results.
+    Clients can ask for a smaller or bigger page with `page_size`,
+    up to `max_page_size`.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = settings.TASK_PAGE_SIZE
+    max_page_size = settings.TASK_MAX_PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request, ranked):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor is None:
+            return None
+
+        try:
+            return decode_cursor(cursor, ranked)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        position = self.decode_cursor(request, is_ranked(queryset))
+        tasks, last_task = paginate_keyset(
+            queryset, position, self.get_page_size(request)
+        )
+        self.next_cursor = None
+        if last_task is not None:
+            self.next_cursor = encode_cursor(last_task)
+        return tasks
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.next_cursor
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
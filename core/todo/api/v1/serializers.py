@@ -1,11 +1,42 @@
 from rest_framework import serializers
-from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import CharField, Value
+from django.db.models.functions import Concat, Substr
 
 from todo.models import Task
 
 
-# Get user model
-user = get_user_model()
+class TaskBulkCreateSerializer(serializers.ListSerializer):
+    """
+    List serializer of TaskModelSerializer that inserts all the tasks
+    with one `bulk_create` in a single transaction.
+    """
+
+    def create(self, validated_data):
+        tasks = [Task(**attrs) for attrs in validated_data]
+        using = Task.objects.db
+        with transaction.atomic(using=using, savepoint=False):
+            tasks = Task.objects.bulk_create(tasks)
+            features = connections[using].features
+            if tasks and not features.can_return_rows_from_bulk_insert:
+                self.set_ids(tasks)
+        return tasks
+
+    def set_ids(self, tasks):
+        """
+        Read back the ids that only postgresql returns from the insert.
+        The tasks are the newest of their user: the transaction that
+        inserted them holds the write lock on sqlite, and doesn't see
+        other uncommitted rows on mysql.
+        """
+
+        ids = Task.objects.filter(user_id=tasks[0].user_id).order_by(
+            '-pk'
+        ).values_list('pk', flat=True)[:len(tasks)]
+        for task, pk in zip(tasks, reversed(ids)):
+            task.pk = pk
+            task._state.adding = False
 
 
 class TaskModelSerializer(serializers.ModelSerializer):
@@ -18,6 +49,9 @@ class TaskModelSerializer(serializers.ModelSerializer):
     )
 
     def get_absolute_url(self, task_obj):
+        absolute_url_base = self.context.get('absolute_url_base')
+        if absolute_url_base is not None:
+            return f'{absolute_url_base}{task_obj.pk}'
         request = self.context.get('request')
         return request.build_absolute_uri(task_obj.pk)
 
@@ -34,12 +68,6 @@ class TaskModelSerializer(serializers.ModelSerializer):
 
         return rep
 
-    def create(self, validated_data):
-        request = self.context.get('request')
-        user_id = request.user.id
-        validated_data['user'] = user.objects.get(id=user_id)
-        return super(TaskModelSerializer, self).create(validated_data)
-
     class Meta:
         model = Task
         fields = (
@@ -47,3 +75,78 @@ class TaskModelSerializer(serializers.ModelSerializer):
             'descriptions', 'complete', 'created_date'
         )
         read_only_fields = ('user',)
+        list_serializer_class = TaskBulkCreateSerializer
+
+
+class TaskListSerializer(serializers.Serializer):
+    """
+    Read only serializer for the task list. It works on the rows of
+    `setup_queryset`, which selects only the listed columns and computes
+    the snippet in SQL, and builds absolute urls from a base computed
+    once per request.
+    """
+    id = serializers.IntegerField(read_only=True)
+    user = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    snippet = serializers.CharField(read_only=True)
+    absolute_url = serializers.SerializerMethodField(
+        method_name='get_absolute_url'
+    )
+    complete = serializers.BooleanField(read_only=True)
+    created_date = serializers.DateTimeField(read_only=True)
+
+    @staticmethod
+    def setup_queryset(queryset):
+        return queryset.values(
+            'id', 'user', 'title', 'complete', 'created_date',
+            snippet=Concat(
+                Substr('descriptions', 1, 15), Value(' ...'),
+                output_field=CharField()
+            ),
+        )
+
+    def get_absolute_url(self, task_row):
+        return f"{self.context['absolute_url_base']}{task_row['id']}"
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    Selects the tasks of a bulk action by their ids, the tasks can also
+    be selected by the filters of the task list.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+    )
+
+    def validate_ids(self, ids):
+        if len(ids) > settings.TASK_BULK_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'Ensure there are no more than '
+                f'{settings.TASK_BULK_MAX_SIZE} ids.'
+            )
+        return ids
+
+
+class TaskBulkUpdateSerializer(TaskBulkSerializer):
+    """
+    New values of the selected tasks, at least one of them is required.
+    """
+    title = serializers.CharField(max_length=255, required=False)
+    descriptions = serializers.CharField(required=False)
+    complete = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if attrs.keys() <= {'ids'}:
+            raise serializers.ValidationError(
+                'Provide at least one of title, descriptions or complete.'
+            )
+        return attrs
+
+
+class TaskBulkCompleteSerializer(TaskBulkSerializer):
+    """
+    Complete value of the selected tasks, they are toggled without it.
+    """
+    complete = serializers.BooleanField(required=False, allow_null=True)
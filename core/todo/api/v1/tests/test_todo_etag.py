@@ -0,0 +1,132 @@
+import pytest
+
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_204_NO_CONTENT,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_412_PRECONDITION_FAILED
+)
+
+from todo.models import Task
+
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user():
+    user = User.objects.create_user(
+        email='test@test_email.com',
+        username='test_username',
+        password='far!@#$%'
+    )
+    return user
+
+
+@pytest.fixture
+def test_task(test_user):
+    task = Task.objects.create(
+        user=test_user,
+        title='test_title',
+        descriptions='test_descriptions'
+    )
+    return task
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+    return client
+
+
+@pytest.mark.django_db
+class TestTodoAPITaskETag:
+    """
+    Test with pytest for conditional requests of TaskModelViewSet.
+    """
+
+    list_url = reverse('task:api-v1:task-list')
+
+    def get_detail_url(self, task):
+        return reverse('task:api-v1:task-detail', kwargs={'pk': task.pk})
+
+    def test_get_task_list_if_none_match_response_304_without_query(
+            self, api_client, test_task, django_assert_max_num_queries
+    ):
+        """
+        Test a matching If-None-Match is answered before the task query.
+        :return:
+        """
+        response = api_client.get(self.list_url)
+        etag = response['ETag']
+        assert response.status_code == HTTP_200_OK
+
+        with django_assert_max_num_queries(0):
+            response = api_client.get(
+                self.list_url, HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        assert not response.content
+
+    def test_etag_changes_with_tasks_and_url(
+            self, api_client, test_user, test_task
+    ):
+        """
+        Test the etag changes after a write and differs between urls.
+        :return:
+        """
+        etag = api_client.get(self.list_url)['ETag']
+        detail_etag = api_client.get(self.get_detail_url(test_task))['ETag']
+        assert etag != detail_etag
+
+        Task.objects.create(user=test_user, title='new', descriptions='new')
+        response = api_client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTP_200_OK
+        assert response['ETag'] != etag
+        assert len(response.data['results']) == 2
+
+    def test_patch_task_if_match(self, api_client, test_task):
+        """
+        Test If-Match allows a write at the read version, returns the etag
+        of the new version and rejects a second write at the old one.
+        :return:
+        """
+        url = self.get_detail_url(test_task)
+        etag = api_client.get(url)['ETag']
+
+        response = api_client.patch(
+            url, {'title': 'first'}, format='json', HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTP_200_OK
+        new_etag = response['ETag']
+        assert new_etag != etag
+
+        response = api_client.patch(
+            url, {'title': 'second'}, format='json', HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTP_412_PRECONDITION_FAILED
+        test_task.refresh_from_db()
+        assert test_task.title == 'first'
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=new_etag)
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+
+    def test_delete_task_if_match(self, api_client, test_task):
+        """
+        Test If-Match on delete.
+        :return:
+        """
+        url = self.get_detail_url(test_task)
+        response = api_client.delete(url, HTTP_IF_MATCH='"stale"')
+        assert response.status_code == HTTP_412_PRECONDITION_FAILED
+
+        etag = api_client.get(url)['ETag']
+        response = api_client.delete(url, HTTP_IF_MATCH=etag)
+        assert response.status_code == HTTP_204_NO_CONTENT
+        assert not Task.objects.exists()
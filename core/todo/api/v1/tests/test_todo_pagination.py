@@ -0,0 +1,109 @@
+import pytest
+
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+
+from todo.models import Task
+from todo.views import TaskListView
+from todo.api.v1.paginations import TaskCursorPagination
+
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user():
+    user = User.objects.create_user(
+        email='test@test.com',
+        username='test_username',
+        password='far!@#$%'
+    )
+    return user
+
+
+@pytest.fixture
+def test_tasks(test_user):
+    return [
+        Task.objects.create(
+            user=test_user,
+            title=f'test_title_{number}',
+            descriptions='test_descriptions',
+            complete=number % 3 == 0
+        )
+        for number in range(7)
+    ]
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_login(user=test_user)
+    return client
+
+
+def get_all_pages(api_client, url, **params):
+    pages = []
+    while url:
+        response = api_client.get(path=url, data=params)
+        assert response.status_code == HTTP_200_OK
+        pages.append([task['id'] for task in response.data['results']])
+        url, params = response.data['next'], {}
+    return pages
+
+
+@pytest.mark.django_db
+class TestTodoAPITaskPagination:
+    url = reverse('task:api-v1:task-list')
+
+    def test_pages_follow_keyset_ordering(self, api_client, test_tasks):
+        pages = get_all_pages(api_client, self.url, page_size=3)
+
+        expected = [
+            task.pk for task in Task.objects.order_by(
+                'complete', 'created_date', 'id'
+            )
+        ]
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert sum(pages, []) == expected
+
+    def test_pages_are_stable_under_inserts(
+            self, api_client, test_user, test_tasks
+    ):
+        response = api_client.get(path=self.url, data={'page_size': 3})
+        first_page = [task['id'] for task in response.data['results']]
+
+        new_task = Task.objects.create(
+            user=test_user, title='new_title', descriptions='new'
+        )
+        rest = get_all_pages(api_client, response.data['next'])
+
+        seen = first_page + sum(rest, [])
+        assert len(seen) == len(set(seen)) == 8
+        assert new_task.pk in seen
+
+    def test_page_size_is_capped(self, api_client, test_tasks, monkeypatch):
+        monkeypatch.setattr(TaskCursorPagination, 'max_page_size', 2)
+        response = api_client.get(path=self.url, data={'page_size': 1000})
+        assert len(response.data['results']) == 2
+        assert response.data['next'] is not None
+
+    def test_invalid_cursor_404(self, api_client, test_tasks):
+        response = api_client.get(path=self.url, data={'cursor': 'invalid'})
+        assert response.status_code == HTTP_404_NOT_FOUND
+
+    def test_task_list_view_pages(self, api_client, test_tasks, monkeypatch):
+        monkeypatch.setattr(TaskListView, 'page_size', 4)
+        url = reverse('task:list')
+
+        response = api_client.get(path=url)
+        first_page = list(response.context['tasks'])
+        assert len(first_page) == 4
+
+        cursor = response.context['next_cursor']
+        response = api_client.get(path=url, data={'cursor': cursor})
+        assert len(response.context['tasks']) == 3
+        assert response.context['next_cursor'] is None
+        assert not set(first_page) & set(response.context['tasks'])
@@ -3,8 +3,11 @@ import pytest
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
 from todo.models import Task
-from ..serializers import TaskModelSerializer
+from ..serializers import TaskModelSerializer, TaskListSerializer
 
 
 User = get_user_model()
@@ -31,16 +34,40 @@ def test_task(test_user):
 
 
 @pytest.mark.django_db
-def test_task_list_serializer(client, test_user):
+def test_task_list_serializer(client, test_user, test_task):
     """
-    Test with pytest for TaskModelSerializer.
+    Test with pytest for TaskListSerializer.
     """
     url = reverse('task:api-v1:task-list')
     client.force_login(user=test_user)
     response = client.get(path=url)
 
-    tasks = Task.objects.all()
-    expected_data = TaskModelSerializer(
-        tasks, many=True
+    tasks = TaskListSerializer.setup_queryset(Task.objects.all())
+    expected_data = TaskListSerializer(
+        tasks, many=True,
+        context={'absolute_url_base': f'http://testserver{url}'}
+    ).data
+    assert response.data['results'] == expected_data
+
+
+@pytest.mark.django_db
+def test_task_list_serializer_matches_model_serializer(test_task):
+    """
+    Test that the list serializer renders tasks like the
+    list representation of TaskModelSerializer.
+    """
+    url = reverse('task:api-v1:task-list')
+    request = Request(
+        APIRequestFactory().get(url), parser_context={'kwargs': {}}
+    )
+    model_data = TaskModelSerializer(
+        Task.objects.all(), many=True, context={'request': request}
+    ).data
+
+    list_data = TaskListSerializer(
+        TaskListSerializer.setup_queryset(Task.objects.all()), many=True,
+        context={'absolute_url_base': f'http://testserver{url}'}
     ).data
-    assert response.data == expected_data
+    assert [dict(row) for row in list_data] == [
+        dict(row) for row in model_data
+    ]
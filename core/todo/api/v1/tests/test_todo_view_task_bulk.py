@@ -0,0 +1,321 @@
+import pytest
+
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_403_FORBIDDEN
+)
+
+from todo.models import Task, TaskCounter
+
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user():
+    user = User.objects.create_user(
+        email='test@test_email.com',
+        username='test_username',
+        password='far!@#$%'
+    )
+    return user
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+class TestTodoAPITaskBulkCreate:
+    """
+    Test with pytest for the bulk create action of TaskModelViewSet.
+    """
+
+    url = reverse('task:api-v1:task-bulk-create')
+    data = [
+        {'title': f'test_title_{number}', 'descriptions': 'test_descriptions',
+         'complete': number % 2 == 0}
+        for number in range(10)
+    ]
+
+    def test_post_bulk_create_unauthorized_response_403_forbidden_status(
+            self, api_client
+    ):
+        """
+        Test response of bulk create for unauthorized user.
+        :return:
+        """
+        response = api_client.post(self.url, self.data, format='json')
+        assert response.status_code == HTTP_403_FORBIDDEN
+
+    def test_post_bulk_create_tasks_in_one_insert(
+            self, api_client, test_user, django_assert_max_num_queries
+    ):
+        """
+        Test bulk create inserts every task for the request user and
+        keeps the task counter in sync, with a constant number of queries.
+        :return:
+        """
+        TaskCounter.objects.recompute([test_user.id])
+        api_client.force_authenticate(user=test_user)
+        # the ids are read back on databases without RETURNING.
+        with django_assert_max_num_queries(5):
+            response = api_client.post(self.url, self.data, format='json')
+
+        assert response.status_code == HTTP_201_CREATED
+        assert len(response.data) == len(self.data)
+        assert Task.objects.filter(user=test_user).count() == len(self.data)
+
+        counter = TaskCounter.objects.get_for_user(test_user)
+        assert counter.total == 10
+        assert counter.complete == 5
+        assert counter.incomplete == 5
+
+    def test_post_bulk_create_returns_ids(self, api_client, test_user):
+        """
+        Test the created tasks come back with their ids and urls, in
+        the order they were posted.
+        :return:
+        """
+        api_client.force_authenticate(user=test_user)
+        response = api_client.post(self.url, self.data, format='json')
+
+        tasks = Task.objects.filter(user=test_user).order_by('pk')
+        assert [task['id'] for task in response.data] == [
+            task.pk for task in tasks
+        ]
+        assert [task['title'] for task in response.data] == [
+            task.title for task in tasks
+        ]
+        assert all(
+            task['absolute_url'].endswith(f"/{task['id']}")
+            for task in response.data
+        )
+
+    def test_post_bulk_create_invalid_task_creates_nothing(
+            self, api_client, test_user
+    ):
+        """
+        Test one invalid task rejects the whole list.
+        :return:
+        """
+        api_client.force_authenticate(user=test_user)
+        data = self.data + [{'descriptions': 'without title'}]
+        response = api_client.post(self.url, data, format='json')
+
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert not Task.objects.exists()
+
+    def test_post_bulk_create_too_many_tasks_response_400(
+            self, api_client, test_user, settings
+    ):
+        """
+        Test lists longer than TASK_BULK_MAX_SIZE and empty lists
+        are rejected.
+        :return:
+        """
+        settings.TASK_BULK_MAX_SIZE = 5
+        api_client.force_authenticate(user=test_user)
+
+        response = api_client.post(self.url, self.data, format='json')
+        assert response.status_code == HTTP_400_BAD_REQUEST
+
+        response = api_client.post(self.url, [], format='json')
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert not Task.objects.exists()
+
+    def test_post_create_task_does_not_query_user(
+            self, api_client, test_user, django_assert_num_queries
+    ):
+        """
+        Test single create uses the request user instead of loading it.
+        :return:
+        """
+        TaskCounter.objects.recompute([test_user.id])
+        api_client.force_authenticate(user=test_user)
+        url = reverse('task:api-v1:task-list')
+        with django_assert_num_queries(4):
+            # savepoint, insert, counter update and release.
+            response = api_client.post(url, self.data[0], format='json')
+
+        assert response.status_code == HTTP_201_CREATED
+        assert Task.objects.get().user == test_user
+
+
+@pytest.fixture
+def test_tasks(test_user):
+    return Task.objects.bulk_create([
+        Task(
+            user=test_user, title=f'test_title_{number}',
+            descriptions='test_descriptions', complete=number < 2
+        )
+        for number in range(6)
+    ])
+
+
+@pytest.fixture
+def other_task():
+    other_user = User.objects.create_user(
+        email='other@test_email.com',
+        username='other_username',
+        password='far!@#$%'
+    )
+    return Task.objects.create(
+        user=other_user, title='other_title', descriptions='other'
+    )
+
+
+@pytest.mark.django_db
+class TestTodoAPITaskBulkActions:
+    """
+    Test with pytest for bulk update, complete and delete actions
+    of TaskModelViewSet.
+    """
+
+    url = reverse('task:api-v1:task-bulk-create')
+    complete_url = reverse('task:api-v1:task-bulk-complete')
+
+    def get_ids(self, user):
+        return list(
+            Task.objects.filter(user=user).values_list('id', flat=True)
+        )
+
+    def test_bulk_actions_without_ids_or_filter_response_400(
+            self, api_client, test_user, test_tasks
+    ):
+        """
+        Test bulk actions refuse to touch every task of the user by mistake.
+        :return:
+        """
+        api_client.force_authenticate(user=test_user)
+        response = api_client.patch(self.url, {'title': 'x'}, format='json')
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        response = api_client.delete(self.url, {}, format='json')
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert Task.objects.filter(user=test_user).count() == 6
+
+    @pytest.mark.parametrize('query', ['complete=', 'complete=garbage'])
+    def test_bulk_actions_with_an_empty_filter_response_400(
+            self, api_client, test_user, test_tasks, query
+    ):
+        """
+        Test a filter that selects nothing isn't taken for a filter.
+        :return:
+        """
+        api_client.force_authenticate(user=test_user)
+        response = api_client.patch(
+            f'{self.url}?{query}', {'title': 'x'}, format='json'
+        )
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        response = api_client.post(
+            f'{self.complete_url}?{query}', {}, format='json'
+        )
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        response = api_client.delete(f'{self.url}?{query}', {}, format='json')
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert Task.objects.filter(
+            user=test_user, title__startswith='test_title'
+        ).count() == 6
+
+    def test_patch_bulk_update_by_ids_in_one_update(
+            self, api_client, test_user, test_tasks, other_task,
+            django_assert_max_num_queries
+    ):
+        """
+        Test bulk update changes only the request user's tasks of the ids
+        and returns the affected count.
+        :return:
+        """
+        ids = self.get_ids(test_user)[:3] + [other_task.id]
+        api_client.force_authenticate(user=test_user)
+        # the rows are locked, counted, then updated.
+        with django_assert_max_num_queries(5):
+            response = api_client.patch(
+                self.url, {'ids': ids, 'title': 'new_title'}, format='json'
+            )
+
+        assert response.status_code == HTTP_200_OK
+        assert response.data == {'updated': 3}
+        assert Task.objects.filter(title='new_title').count() == 3
+        other_task.refresh_from_db()
+        assert other_task.title == 'other_title'
+
+    def test_patch_bulk_update_by_filter_keeps_counters(
+            self, api_client, test_user, test_tasks
+    ):
+        """
+        Test bulk update of the tasks selected by the complete filter.
+        :return:
+        """
+        api_client.force_authenticate(user=test_user)
+        response = api_client.patch(
+            f'{self.url}?complete=false', {'complete': True}, format='json'
+        )
+
+        assert response.data == {'updated': 4}
+        counter = TaskCounter.objects.get_for_user(test_user)
+        assert (counter.complete, counter.incomplete) == (6, 0)
+
+    def test_patch_bulk_update_null_complete_response_400(
+            self, api_client, test_user, test_tasks
+    ):
+        """
+        Test null isn't taken for a complete value.
+        :return:
+        """
+        api_client.force_authenticate(user=test_user)
+        response = api_client.patch(
+            self.url, {'ids': self.get_ids(test_user), 'complete': None},
+            format='json'
+        )
+
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert 'complete' in response.data
+
+    def test_post_bulk_complete_toggles_without_value(
+            self, api_client, test_user, test_tasks
+    ):
+        """
+        Test bulk complete toggles the tasks and updates the counters.
+        :return:
+        """
+        ids = self.get_ids(test_user)
+        api_client.force_authenticate(user=test_user)
+        response = api_client.post(
+            self.complete_url, {'ids': ids}, format='json'
+        )
+
+        assert response.data == {'updated': 6}
+        assert Task.objects.filter(complete=True).count() == 4
+        counter = TaskCounter.objects.get_for_user(test_user)
+        assert (counter.complete, counter.incomplete) == (4, 2)
+
+        response = api_client.post(
+            self.complete_url, {'ids': ids, 'complete': False}, format='json'
+        )
+        assert response.data == {'updated': 6}
+        counter = TaskCounter.objects.get_for_user(test_user)
+        assert (counter.complete, counter.incomplete) == (0, 6)
+
+    def test_delete_bulk_destroy_by_ids(
+            self, api_client, test_user, test_tasks, other_task
+    ):
+        """
+        Test bulk delete removes only the request user's tasks.
+        :return:
+        """
+        ids = self.get_ids(test_user)[:2] + [other_task.id]
+        api_client.force_authenticate(user=test_user)
+        response = api_client.delete(self.url, {'ids': ids}, format='json')
+
+        assert response.status_code == HTTP_200_OK
+        assert response.data == {'deleted': 2}
+        assert Task.objects.filter(pk=other_task.pk).exists()
+        assert TaskCounter.objects.get_for_user(test_user).total == 4
@@ -1,52 +1,216 @@
-import requests
+import json
 
-from django.http import JsonResponse
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import EMPTY_VALUES
+from django.http import JsonResponse, StreamingHttpResponse
 
 from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.status import (
+    HTTP_201_CREATED,
+    HTTP_503_SERVICE_UNAVAILABLE
+)
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.filters import SearchFilter, OrderingFilter
 
+from django_filters import utils as filter_utils
 from django_filters.rest_framework import DjangoFilterBackend
 
-from todo.models import Task
-from .serializers import TaskModelSerializer
+from todo.models import ArchivedTask, Task
+from todo.weather import get_cached_weather_payload
+from .serializers import (
+    TaskModelSerializer,
+    TaskListSerializer,
+    TaskBulkSerializer,
+    TaskBulkUpdateSerializer,
+    TaskBulkCompleteSerializer,
+)
 from .permissions import IsTaskOwner
+from .paginations import TaskCursorPagination
+from .filters import TaskSearchFilter
+from .etags import TaskETagMixin
 
-from decouple import config
 
-
-class TaskModelViewSet(ModelViewSet):
+class TaskModelViewSet(TaskETagMixin, ModelViewSet):
     """
     A simple ViewSet for viewing and editing the tasks
     associated with the user.
+    The list is paginated with a cursor and always ordered by
+    (complete, created_date, id), search results are ordered by relevance.
+    A list of tasks can be created at once by posting it to `bulk/`,
+    `bulk/` and `bulk/complete/` also update, complete and delete the tasks
+    selected by ids and/or the list filters with a single statement.
+    List and detail responses carry ETags for conditional requests.
+    Archived tasks are streamed as json lines from `archive/`.
     """
 
     serializer_class = TaskModelSerializer
     permission_classes = [IsAuthenticated, IsTaskOwner]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    pagination_class = TaskCursorPagination
+    filter_backends = [DjangoFilterBackend, TaskSearchFilter]
     filterset_fields = ["complete"]
-    search_fields = ["title", "descriptions"]
-    ordering_fields = ["complete", "created_date"]
+    bulk_serializer_classes = {
+        "bulk_update": TaskBulkUpdateSerializer,
+        "bulk_complete": TaskBulkCompleteSerializer,
+        "bulk_destroy": TaskBulkSerializer,
+    }
 
     def get_queryset(self):
-        user_id = self.request.user.id
-        return Task.objects.filter(user__id=user_id)
+        tasks = Task.objects.filter(user=self.request.user)
+        if self.action == "list":
+            tasks = TaskListSerializer.setup_queryset(tasks)
+        return tasks
 
+    def get_serializer_class(self):
+        if self.action == "list":
+            return TaskListSerializer
+        if self.action in self.bulk_serializer_classes:
+            return self.bulk_serializer_classes[self.action]
+        return super().get_serializer_class()
 
-class WeatherAPIView(APIView):
-    @method_decorator(cache_page(60 * 20, key_prefix="weather-view"))
-    def get(self, request):
-        city_name = config("CITY_NAME")
-        api_key = config("OPEN_WEATHER_API_KEY")
-        units = config("UNITS")
-        open_weather_url = (
-            f"https://api.openweathermap.org/data/2.5/weather?"
-            f"q={city_name}&appid={api_key}&units={units}"
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ("list", "bulk_create"):
+            # detail urls are relative to the list url, like
+            # `request.build_absolute_uri(task.pk)` resolves them.
+            context["absolute_url_base"] = self.reverse_action("list")
+        return context
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request):
+        """
+        Create a list of tasks with one INSERT in a single transaction,
+        at most `TASK_BULK_MAX_SIZE` tasks per request.
+        """
+
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.TASK_BULK_MAX_SIZE,
         )
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=HTTP_201_CREATED)
+
+    def get_bulk_queryset(self, serializer):
+        """
+        Select the request user's tasks of a bulk action, by the ids of
+        the request body and the filters of the query string. Ownership
+        is part of the WHERE clause, ids of other users' tasks are just
+        not matched.
+        :param serializer: validated TaskBulkSerializer
+        :return: task queryset
+        """
+
+        tasks = self.get_queryset()
+        filterset = DjangoFilterBackend().get_filterset(
+            self.request, tasks, self
+        )
+        if not filterset.is_valid():
+            raise filter_utils.translate_validation(filterset.errors)
+        # an empty or unknown value is ignored by the filter, it doesn't
+        # select anything.
+        filtered = any(
+            value not in EMPTY_VALUES
+            for value in filterset.form.cleaned_data.values()
+        )
+
+        ids = serializer.validated_data.get("ids")
+        if ids is None and not filtered:
+            raise ValidationError(
+                {"ids": ["Provide the task ids or a filter."]}
+            )
+
+        tasks = filterset.qs
+        if ids is not None:
+            tasks = tasks.filter(pk__in=ids)
+        return tasks
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """
+        Update the selected tasks with one UPDATE statement.
+        """
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        fields = dict(serializer.validated_data)
+        fields.pop("ids", None)
+        updated = self.get_bulk_queryset(serializer).update_tasks(**fields)
+        return Response({"updated": updated})
+
+    @action(detail=False, methods=["post"], url_path="bulk/complete")
+    def bulk_complete(self, request):
+        """
+        Set the complete field of the selected tasks, or toggle it when
+        no value is given, with one UPDATE statement.
+        """
 
-        response = requests.get(url=open_weather_url)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tasks = self.get_bulk_queryset(serializer)
+        complete = serializer.validated_data.get("complete")
+        if complete is None:
+            updated = tasks.toggle_complete()
+        else:
+            updated = tasks.update_tasks(complete=complete)
+        return Response({"updated": updated})
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        """
+        Delete the selected tasks with one DELETE statement.
+        """
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        deleted = self.get_bulk_queryset(serializer).purge()
+        return Response({"deleted": deleted})
+
+    @action(detail=False, methods=["get"])
+    def archive(self, request):
+        """
+        Stream the request user's archived tasks as json lines, oldest
+        first. They are read with a server side cursor, a large archive
+        is never held in memory.
+        """
+
+        archived_tasks = ArchivedTask.objects.filter(
+            user=request.user
+        ).order_by("pk").values(
+            "task_id", "title", "descriptions",
+            "created_date", "completed_date", "archived_date",
+        ).iterator(chunk_size=settings.TASK_ARCHIVE_STREAM_CHUNK_SIZE)
+
+        lines = (
+            json.dumps(archived_task, cls=DjangoJSONEncoder) + "\n"
+            for archived_task in archived_tasks
+        )
+        return StreamingHttpResponse(
+            lines, content_type="application/x-ndjson"
+        )
+
+
+class WeatherAPIView(APIView):
+    """
+    Return the openweather payload from the shared weather cache,
+    which is kept up to date by celery beat.
+    """
+
+    def get(self, request):
+        payload = get_cached_weather_payload()
+        if payload is None:
+            return Response(
+                {"detail": "Weather is not available yet, try again later."},
+                status=HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "30"},
+            )
 
-        return JsonResponse(response.json())
+        return JsonResponse(payload)
@@ -0,0 +1,96 @@
+import time
+from functools import partial
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+TASK_GENERATION_KEY = 'task:generation:{user_id}'
+TASK_LIST_FRAGMENT_KEY = 'task:list:{user_id}:{generation}:{page}'
+TASK_SEARCH_FRAGMENT_KEY = 'task:search:{user_id}:{generation}:{page}'
+
+
+def _new_generation():
+    # a lost generation key restarts from the clock, far above any
+    # generation that was counted before, so old fragments never match.
+    return time.time_ns()
+
+
+def get_task_generation(user_id):
+    """
+    Return the generation of a user's tasks, it changes on every write
+    of the user's tasks.
+    :param user_id: owner of the tasks
+    :return: generation number
+    """
+
+    key = TASK_GENERATION_KEY.format(user_id=user_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def _incr_task_generations(user_ids):
+    for user_id in set(user_ids):
+        key = TASK_GENERATION_KEY.format(user_id=user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _new_generation(), timeout=None)
+
+
+def bump_task_generation(user_ids, using=None):
+    """
+    Move the users to a new generation, so their cached task lists
+    are not used anymore.
+
+    Inside a transaction the generation is bumped again on commit, a
+    request reading the new generation before the commit still sees the
+    old rows and could cache them under it.
+    :param user_ids: owners of the changed tasks
+    :param using: database alias of the write
+    """
+
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    _incr_task_generations(user_ids)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(
+            partial(_incr_task_generations, user_ids), using=using
+        )
+
+
+def get_fragment_key(user_id, cursor='', search=''):
+    """
+    :param user_id: owner of the tasks
+    :param cursor: valid cursor of the page, empty for the first page
+    :param search: search text of the page
+    :return: cache key of the rendered page at the current generation.
+    """
+
+    generation = get_task_generation(user_id)
+    page = sha1(f'{cursor}|{search}'.encode()).hexdigest()
+    key = TASK_SEARCH_FRAGMENT_KEY if search else TASK_LIST_FRAGMENT_KEY
+    return key.format(user_id=user_id, generation=generation, page=page)
+
+
+def cache_fragment(key, fragment, search=''):
+    """
+    Cache a rendered page of tasks. Search results get a shorter timeout,
+    and fragments over TASK_FRAGMENT_MAX_SIZE are not cached at all, so
+    arbitrary searches can't fill the cache with large entries.
+    """
+
+    if len(fragment) > settings.TASK_FRAGMENT_MAX_SIZE:
+        return
+    if search:
+        timeout = settings.TASK_SEARCH_CACHE_TIMEOUT
+    else:
+        timeout = settings.TASK_LIST_CACHE_TIMEOUT
+    cache.set(key, fragment, timeout=timeout)
@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from todo.models import Task
+from todo.search import search_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarking the task access patterns and printing their query "
+        "plans. Load a dataset with insert_dummy_data and run it before "
+        "and after migrating the task indexes to compare the plans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, dest='user_id',
+            help='User to query, defaults to the user with most tasks.'
+        )
+        parser.add_argument(
+            '--search', default='task',
+            help='Text of the full text search.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Number of runs for each query.'
+        )
+
+    def get_querysets(self, user_id, search):
+        tasks = Task.objects.filter(user_id=user_id)
+        return {
+            'task list': tasks.order_by('complete', 'created_date')[:50],
+            'incomplete tasks': tasks.filter(complete=False).order_by(
+                '-created_date'
+            )[:50],
+            'complete filter': tasks.filter(complete=True)[:50],
+            'text search': search_tasks(tasks, search)[:50],
+        }
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            return queryset.explain(analyze=True, buffers=True)
+        return queryset.explain()
+
+    def handle(self, *args, **options):
+        user_id = options['user_id']
+        if user_id is None:
+            busiest = Task.objects.order_by().values('user').annotate(
+                total=Count('pk')
+            ).order_by('-total').first()
+            if busiest is None:
+                raise CommandError(
+                    'There are no tasks, run insert_dummy_data first.'
+                )
+            user_id = busiest['user']
+
+        self.stdout.write(
+            f'{Task.objects.count()} tasks, benchmarking user {user_id} '
+            f'on {connection.vendor}.'
+        )
+
+        querysets = self.get_querysets(user_id, options['search'])
+        for name, queryset in querysets.items():
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(self.explain(queryset))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'median {timings[len(timings) // 2] * 1000:.2f} ms, '
+                    f'max {timings[-1] * 1000:.2f} ms'
+                )
+            )
@@ -0,0 +1,94 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from todo.models import Task
+from todo.api.v1.serializers import TaskModelSerializer, TaskListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarking the per-row cost of serializing a task list with "
+        "TaskModelSerializer against TaskListSerializer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, dest='user_id',
+            help='User whose tasks are serialized, defaults to the user '
+                 'with most tasks.'
+        )
+        parser.add_argument(
+            '--rows', type=int, default=1000,
+            help='Number of tasks serialized in each run.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Number of runs for each serializer.'
+        )
+
+    def get_request(self):
+        url = '/task/api/v1/task/'
+        request = Request(
+            APIRequestFactory().get(url), parser_context={'kwargs': {}}
+        )
+        base_url = request.build_absolute_uri(url)
+        return request, base_url
+
+    def model_serializer_run(self, tasks, request, base_url):
+        return TaskModelSerializer(
+            tasks.all(), many=True, context={'request': request}
+        ).data
+
+    def list_serializer_run(self, tasks, request, base_url):
+        return TaskListSerializer(
+            TaskListSerializer.setup_queryset(tasks.all()),
+            many=True, context={'absolute_url_base': base_url}
+        ).data
+
+    def benchmark(self, run, tasks, rows, repeat):
+        request, base_url = self.get_request()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run(tasks, request, base_url)
+            timings.append(time.perf_counter() - started)
+        return min(timings) / rows * 1000000
+
+    def handle(self, *args, **options):
+        user_id = options['user_id']
+        if user_id is None:
+            busiest = Task.objects.order_by().values('user').annotate(
+                total=Count('pk')
+            ).order_by('-total').first()
+            if busiest is None:
+                raise CommandError(
+                    'There are no tasks, run insert_dummy_data first.'
+                )
+            user_id = busiest['user']
+
+        tasks = Task.objects.filter(user_id=user_id).order_by('id')[
+            :options['rows']
+        ]
+        rows = tasks.count()
+        if not rows:
+            raise CommandError(f'User {user_id} has no tasks.')
+
+        before = self.benchmark(
+            self.model_serializer_run, tasks, rows, options['repeat']
+        )
+        after = self.benchmark(
+            self.list_serializer_run, tasks, rows, options['repeat']
+        )
+        self.stdout.write(f'{rows} tasks of user {user_id}, per row:')
+        self.stdout.write(f'TaskModelSerializer: {before:.1f} us')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'TaskListSerializer:  {after:.1f} us '
+                f'({before / after:.1f}x faster)'
+            )
+        )
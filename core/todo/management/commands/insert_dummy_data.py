@@ -1,34 +1,266 @@
-from django.core.management.base import BaseCommand
+import csv
+import io
+import math
+import multiprocessing
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.utils import timezone
 
 from faker import Faker
 
-from todo.models import Task
+from todo.caching import bump_task_generation
+
+
+# spawned workers import this module before django.setup, so the models
+# are imported in the functions.
+# titles and descriptions are drawn from a sample made once per worker,
+# faker is much slower than the inserts.
+TEXT_SAMPLE_SIZE = 1000
+
+TASK_COLUMNS = (
+    'user_id', 'title', 'descriptions', 'complete',
+    'created_date', 'updated_date',
+)
+
+
+def _setup_worker():
+    # spawned workers start without django, DJANGO_SETTINGS_MODULE is
+    # inherited from the environment of the command.
+    django.setup()
+
+
+def get_task_counts(users, tasks_per_user, skew, seed):
+    """
+    Split users * tasks_per_user tasks between the users, the user of
+    rank r gets a share proportional to 1 / r ** skew. A skew of 0 gives
+    every user the same number of tasks, 1 is Zipf's law.
+    :return: list of the number of tasks of each user, in random order.
+    """
+
+    total = users * tasks_per_user
+    weights = [1 / rank ** skew for rank in range(1, users + 1)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    # the rounded down shares are handed out to the heaviest users.
+    for rank in range(total - sum(counts)):
+        counts[rank % users] += 1
+
+    random.Random(seed).shuffle(counts)
+    return counts
+
+
+def copy_tasks(rows):
+    """
+    Load task rows with postgresql's COPY, one statement for the batch.
+    The search vector trigger fills them in like inserted rows.
+    """
+
+    from todo.models import Task
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    columns = ', '.join(TASK_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {Task._meta.db_table} ({columns}) '
+            f'FROM STDIN WITH (FORMAT csv)',
+            buffer,
+        )
+
+
+def insert_tasks(rows, use_copy):
+    from todo.models import Task
+
+    if use_copy:
+        copy_tasks(rows)
+        return
+    # the counters are recomputed once at the end, the manager of the
+    # base queryset inserts without updating them per batch.
+    Task._base_manager.bulk_create([
+        Task(
+            user_id=user_id, title=title, descriptions=descriptions,
+            complete=complete, created_date=created, updated_date=updated,
+        )
+        for user_id, title, descriptions, complete, created, updated in rows
+    ])
+
 
+def insert_chunk(chunk):
+    """
+    Create the users of a chunk and their tasks, in a worker or in the
+    command itself.
+    :param chunk: dict of the chunk number, the task count of each user
+        and the options of the run
+    :return: ids of the created users, and the number of tasks.
+    """
 
-User = get_user_model()
+    User = get_user_model()
+
+    batch_size = chunk['batch_size']
+    fake = Faker()
+    fake.seed_instance(chunk['seed'] + chunk['number'])
+    titles = [fake.text(max_nb_chars=20) for _ in range(TEXT_SAMPLE_SIZE)]
+    paragraphs = [
+        fake.paragraph(nb_sentences=5) for _ in range(TEXT_SAMPLE_SIZE)
+    ]
+
+    users = []
+    for index in range(len(chunk['task_counts'])):
+        # unique across the chunks and runs, faker's names are not.
+        suffix = f'{chunk["run"]}.{chunk["number"]}.{index}'
+        users.append(User(
+            email=f'{fake.user_name()}.{suffix}@{fake.free_email_domain()}',
+            username=f'{fake.user_name()}.{suffix}',
+            password=chunk['password'],
+            is_verified=True,
+        ))
+    User.objects.bulk_create(users, batch_size=batch_size)
+    if users and users[0].pk is None:
+        # only postgresql returns the ids of bulk inserted rows.
+        ids = dict(User.objects.filter(
+            username__in=[user.username for user in users]
+        ).values_list('username', 'pk'))
+        user_ids = [ids[user.username] for user in users]
+    else:
+        user_ids = [user.pk for user in users]
+
+    rows = []
+    now = timezone.now()
+    tasks = 0
+    for user_id, count in zip(user_ids, chunk['task_counts']):
+        for _ in range(count):
+            rows.append((
+                user_id,
+                fake.random.choice(titles),
+                fake.random.choice(paragraphs),
+                fake.random.random() < 0.65,
+                now,
+                now,
+            ))
+            if len(rows) == batch_size:
+                insert_tasks(rows, chunk['copy'])
+                tasks += len(rows)
+                rows = []
+    if rows:
+        insert_tasks(rows, chunk['copy'])
+        tasks += len(rows)
+    return user_ids, tasks
 
 
 class Command(BaseCommand):
-    help = "Inserting dummy data for tasks."
+    help = (
+        "Inserting dummy data for tasks, from one user with five tasks to "
+        "millions of tasks for capacity tests. Every user logs in with "
+        "the password far121269."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=1,
+            help='Number of users to create.'
+        )
+        parser.add_argument(
+            '--tasks-per-user', type=int, default=5,
+            help='Average number of tasks of a user.'
+        )
+        parser.add_argument(
+            '--skew', type=float, default=0,
+            help='Zipf exponent of the tasks per user, 0 spreads them evenly.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of rows per INSERT or COPY.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Number of processes inserting at once.'
+        )
+        parser.add_argument(
+            '--copy', action='store_true',
+            help="Load the tasks with postgresql's COPY instead of INSERT."
+        )
+        parser.add_argument(
+            '--seed', type=int,
+            help='Seed of the generated data, random by default.'
+        )
 
-    def __init__(self, *args, **kwargs):
-        super(Command, self).__init__(*args, **kwargs)
-        self.fake = Faker()
+    def get_chunks(self, options):
+        seed = options['seed']
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        task_counts = get_task_counts(
+            options['users'], options['tasks_per_user'], options['skew'], seed
+        )
+
+        # several chunks per worker, so a worker with the heavy users
+        # doesn't hold up the others.
+        size = math.ceil(len(task_counts) / (options['workers'] * 4))
+        size = min(max(size, 1), options['batch_size'])
+        common = {
+            'seed': seed,
+            'run': uuid.uuid4().hex[:8],
+            # hashed once, not once per user.
+            'password': make_password('far121269'),
+            'batch_size': options['batch_size'],
+            'copy': options['copy'],
+        }
+        return [
+            {
+                **common,
+                'number': number,
+                'task_counts': task_counts[start:start + size],
+            }
+            for number, start in enumerate(
+                range(0, len(task_counts), size)
+            )
+        ]
 
     def handle(self, *args, **options):
-        user = User.objects.create_user(
-            email=self.fake.email(),
-            username=self.fake.user_name(),
-            password='far121269'
-        )
-        user.is_verified = True
-        user.save()
-
-        for _ in range(5):
-            Task.objects.create(
-                user=user,
-                title=self.fake.text(max_nb_chars=20),
-                descriptions=self.fake.paragraph(nb_sentences=5),
-                complete=self.fake.boolean(chance_of_getting_true=65)
+        for name in ('users', 'batch_size', 'workers'):
+            if options[name] < 1:
+                option = name.replace('_', '-')
+                raise CommandError(f'--{option} must be 1 or more.')
+        if options['tasks_per_user'] < 0:
+            raise CommandError('--tasks-per-user must be 0 or more.')
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy needs a postgresql database.')
+        chunks = self.get_chunks(options)
+
+        if options['workers'] > 1:
+            # the workers open their own connections.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=options['workers'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_setup_worker,
             )
+            with executor:
+                results = list(executor.map(insert_chunk, chunks))
+        else:
+            results = [insert_chunk(chunk) for chunk in chunks]
+
+        user_ids = [
+            user_id for chunk_user_ids, _ in results
+            for user_id in chunk_user_ids
+        ]
+        tasks = sum(chunk_tasks for _, chunk_tasks in results)
+        call_command(
+            'recompute_task_counters', user_ids=user_ids,
+            batch_size=options['batch_size'], stdout=self.stdout,
+        )
+        bump_task_generation(user_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{len(user_ids)} users and {tasks} tasks inserted.'
+            )
+        )
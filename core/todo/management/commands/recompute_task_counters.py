@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+
+from todo.models import TaskCounter
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Recomputing the task counters of users from their tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, nargs='+', dest='user_ids',
+            help='Only repair the counters of these user ids.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of users recomputed per query.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        user_ids = options['user_ids']
+        if user_ids is None:
+            user_ids = User.objects.order_by('pk').values_list(
+                'pk', flat=True
+            ).iterator(chunk_size=batch_size)
+
+        batch = []
+        repaired = 0
+        for user_id in user_ids:
+            batch.append(user_id)
+            if len(batch) == batch_size:
+                repaired += len(TaskCounter.objects.recompute(batch))
+                batch = []
+        if batch:
+            repaired += len(TaskCounter.objects.recompute(batch))
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{repaired} task counters recomputed.')
+        )
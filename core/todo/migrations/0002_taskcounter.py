@@ -0,0 +1,47 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:40
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+def fill_task_counters(apps, schema_editor):
+    Task = apps.get_model('todo', 'Task')
+    TaskCounter = apps.get_model('todo', 'TaskCounter')
+
+    rows = Task.objects.order_by().values('user').annotate(
+        total=Count('pk'), complete=Count('pk', filter=Q(complete=True))
+    )
+    TaskCounter.objects.bulk_create(
+        (
+            TaskCounter(
+                user_id=row['user'],
+                total=row['total'],
+                complete=row['complete'],
+                incomplete=row['total'] - row['complete'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_is_verified'),
+        ('todo', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_counter', serialize=False, to='accounts.user')),
+                ('total', models.IntegerField(default=0)),
+                ('incomplete', models.IntegerField(default=0)),
+                ('complete', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(fill_task_counters, migrations.RunPython.noop),
+    ]
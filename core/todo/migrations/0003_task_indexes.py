@@ -0,0 +1,58 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+TRIGRAM_INDEXES = (
+    ('task_title_trgm_idx', 'title'),
+    ('task_descriptions_trgm_idx', 'descriptions'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # trigram indexes are postgresql only, other databases keep scanning.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    table = apps.get_model('todo', 'Task')._meta.db_table
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} '
+            f'ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('todo', '0002_taskcounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'complete', 'created_date'], name='task_user_complete_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('complete', False)), fields=['user', 'created_date'], name='task_user_incomplete_idx'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
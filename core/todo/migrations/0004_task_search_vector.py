@@ -0,0 +1,73 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:46
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}descriptions, '')), 'B')"
+)
+
+
+def create_search_vector_trigger(apps, schema_editor):
+    # full text search is postgresql only, the other databases use the
+    # inverted index of todo.search.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    table = apps.get_model('todo', 'Task')._meta.db_table
+    schema_editor.execute(f"""
+        CREATE OR REPLACE FUNCTION {table}_search_vector_update()
+        RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR_SQL.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    schema_editor.execute(f"""
+        CREATE TRIGGER {table}_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, descriptions ON {table}
+        FOR EACH ROW EXECUTE PROCEDURE {table}_search_vector_update()
+    """)
+    schema_editor.execute(
+        f"UPDATE {table} SET search_vector = "
+        f"{SEARCH_VECTOR_SQL.format(row='')}"
+    )
+    schema_editor.execute(
+        f'CREATE INDEX task_search_vector_idx '
+        f'ON {table} USING gin (search_vector)'
+    )
+
+
+def drop_search_vector_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    table = apps.get_model('todo', 'Task')._meta.db_table
+    schema_editor.execute('DROP INDEX IF EXISTS task_search_vector_idx')
+    schema_editor.execute(
+        f'DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}'
+    )
+    schema_editor.execute(
+        f'DROP FUNCTION IF EXISTS {table}_search_vector_update()'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0003_task_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            create_search_vector_trigger, drop_search_vector_trigger
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('todo', '0004_task_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('descriptions', models.TextField()),
+                ('created_date', models.DateTimeField()),
+                ('completed_date', models.DateTimeField()),
+                ('archived_date', models.DateTimeField()),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['user', 'id'], name='archived_task_user_idx'),
+        ),
+    ]
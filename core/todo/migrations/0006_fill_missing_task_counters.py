@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def fill_missing_task_counters(apps, schema_editor):
+    # users without tasks had no counter, they get one like new users.
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    TaskCounter = apps.get_model('todo', 'TaskCounter')
+
+    user_ids = User.objects.filter(task_counter__isnull=True).values_list(
+        'pk', flat=True
+    )
+    TaskCounter.objects.bulk_create(
+        (TaskCounter(user_id=user_id) for user_id in user_ids.iterator()),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('todo', '0005_archivedtask'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            fill_missing_task_counters, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+# the task searches use the search vector of 0004, nothing reads these
+# indexes and every task write paid for them.
+TRIGRAM_INDEXES = (
+    ('task_title_trgm_idx', 'title'),
+    ('task_descriptions_trgm_idx', 'descriptions'),
+)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    table = apps.get_model('todo', 'Task')._meta.db_table
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} '
+            f'ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0006_fill_missing_task_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_trigram_indexes, create_trigram_indexes),
+    ]
@@ -1,5 +1,13 @@
-from django.db import models
+import time
+
+from django.db import connections, models, transaction
+from django.db.models.deletion import Collector
+from django.db.models import Case, Count, F, Q, Value, When
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.contrib.postgres.search import SearchVectorField
+
+from .caching import bump_task_generation
 
 
 # Get user model
@@ -9,17 +17,343 @@ user = get_user_model()
 
 # Create your models here.
 
+class TaskQuerySet(models.QuerySet):
+    """
+    Task queryset whose bulk writes keep the users' task counters in sync
+    and move the users to a new task list generation.
+    """
+
+    def count_per_user(self):
+        """
+        Count total and complete tasks of the queryset for each user.
+        :return: list of {'user': id, 'total': int, 'complete': int}
+        """
+
+        return list(
+            self.order_by().values('user').annotate(
+                total=Count('pk'),
+                complete=Count('pk', filter=Q(complete=True)),
+            )
+        )
+
+    def lock_rows(self):
+        """
+        Lock the tasks of the queryset until the end of the transaction,
+        in primary key order. A concurrent bulk write over the same tasks
+        waits for this one and then only sees the rows that still match,
+        so the counter deltas counted next are never applied twice.
+        :return: queryset of the locked tasks.
+        """
+
+        pks = list(
+            self.select_for_update().order_by('pk').values_list(
+                'pk', flat=True
+            )
+        )
+        return self.filter(pk__in=pks)
+
+    def set_complete(self, complete):
+        """
+        Mark the tasks as complete or incomplete with a single UPDATE,
+        which touches updated_date like `update_tasks`, the archive reads
+        it as the completion date.
+        :param complete: new complete value
+        :return: number of tasks that changed.
+        """
+
+        sign = 1 if complete else -1
+        with transaction.atomic(using=self.db):
+            changed = self.exclude(complete=complete).lock_rows()
+            per_user = changed.count_per_user()
+            updated_count = changed.update(
+                complete=complete, updated_date=timezone.now()
+            )
+            for row in per_user:
+                TaskCounter.objects.apply_delta(
+                    row['user'], complete=sign * row['total']
+                )
+            bump_task_generation(
+                [row['user'] for row in per_user], using=self.db
+            )
+        return updated_count
+
+    def update_tasks(self, **fields):
+        """
+        Update the tasks with a single UPDATE, like `update`, but also
+        touch updated_date and keep the counters in sync when the
+        complete field is changed.
+        :param fields: new values of the task fields
+        :return: number of updated tasks.
+        """
+
+        fields['updated_date'] = timezone.now()
+        with transaction.atomic(using=self.db):
+            tasks = self.lock_rows()
+            per_user = tasks.count_per_user()
+            updated_count = tasks.update(**fields)
+            if 'complete' in fields:
+                for row in per_user:
+                    if fields['complete']:
+                        complete = row['total'] - row['complete']
+                    else:
+                        complete = -row['complete']
+                    TaskCounter.objects.apply_delta(
+                        row['user'], complete=complete
+                    )
+            bump_task_generation(
+                [row['user'] for row in per_user], using=self.db
+            )
+        return updated_count
+
+    update_tasks.alters_data = True
+    update_tasks.queryset_only = True
+
+    def toggle_complete(self):
+        """
+        Flip the complete field of the tasks with a single UPDATE.
+        :return: number of updated tasks.
+        """
+
+        with transaction.atomic(using=self.db):
+            tasks = self.lock_rows()
+            per_user = tasks.count_per_user()
+            updated_count = tasks.update(
+                complete=Case(
+                    When(complete=True, then=Value(False)),
+                    default=Value(True),
+                ),
+                updated_date=timezone.now(),
+            )
+            # complete tasks become incomplete and the other way around.
+            for row in per_user:
+                TaskCounter.objects.apply_delta(
+                    row['user'], complete=row['total'] - 2 * row['complete']
+                )
+            bump_task_generation(
+                [row['user'] for row in per_user], using=self.db
+            )
+        return updated_count
+
+    toggle_complete.alters_data = True
+    toggle_complete.queryset_only = True
+
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False):
+        """
+        Insert the tasks with batched INSERT statements in one transaction.
+        Task.save isn't called for them, so their counts are added to the
+        users' counters here, once per user.
+        """
+
+        objs = list(objs)
+        per_user = {}
+        for task in objs:
+            total, complete = per_user.get(task.user_id, (0, 0))
+            per_user[task.user_id] = (total + 1, complete + int(task.complete))
+
+        with transaction.atomic(using=self.db):
+            objs = super(TaskQuerySet, self).bulk_create(
+                objs, batch_size=batch_size,
+                ignore_conflicts=ignore_conflicts
+            )
+            if ignore_conflicts:
+                # skipped rows are not reported, count the users again.
+                TaskCounter.objects.recompute(list(per_user))
+            else:
+                for user_id, (total, complete) in per_user.items():
+                    TaskCounter.objects.apply_delta(
+                        user_id, total=total, complete=complete
+                    )
+            bump_task_generation(per_user, using=self.db)
+        return objs
+
+    bulk_create.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            tasks = self.lock_rows()
+            per_user = tasks.count_per_user()
+            deleted = super(TaskQuerySet, tasks).delete()
+            TaskCounter.objects.apply_deleted(per_user)
+            bump_task_generation(
+                [row['user'] for row in per_user], using=self.db
+            )
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def purge(self):
+        """
+        Delete the tasks with a single DELETE statement, without loading
+        them into memory. Task has no reverse relations and no delete
+        signal receivers, if that changes the tasks are deleted through
+        the collector instead.
+        :return: number of deleted tasks.
+        """
+
+        if not Collector(using=self.db).can_fast_delete(self):
+            return self.delete()[0]
+
+        with transaction.atomic(using=self.db):
+            tasks = self.lock_rows()
+            per_user = tasks.count_per_user()
+            deleted_count = tasks._raw_delete(tasks.db)
+            TaskCounter.objects.apply_deleted(per_user)
+            bump_task_generation(
+                [row['user'] for row in per_user], using=self.db
+            )
+        return deleted_count
+
+    purge.alters_data = True
+    purge.queryset_only = True
+
+    def pk_chunks(self, batch_size, pause=0, deadline=None):
+        """
+        Split the tasks in chunks of consecutive primary keys. The upper
+        key of a chunk is looked up once the previous chunk was handled.
+        :param batch_size: most tasks in a chunk
+        :param pause: seconds to sleep between two chunks
+        :param deadline: time.monotonic() after which no chunk is started,
+            the rest is left for the next run
+        :return: generator of querysets
+        """
+
+        last_pk = 0
+        while deadline is None or time.monotonic() < deadline:
+            chunk = self.filter(pk__gt=last_pk)
+            upper_pk = chunk.order_by('pk').values_list(
+                'pk', flat=True
+            )[batch_size - 1:batch_size].first()
+            if upper_pk is not None:
+                chunk = chunk.filter(pk__lte=upper_pk)
+
+            yield chunk
+            if upper_pk is None:
+                return
+
+            last_pk = upper_pk
+            if pause:
+                time.sleep(pause)
+
+    def purge_in_batches(self, batch_size, pause=0, deadline=None):
+        """
+        Purge the tasks chunk by chunk, each chunk in its own short
+        transaction, so the table is never locked for long while the users
+        write to it. The arguments are those of `pk_chunks`.
+        :return: (number of deleted tasks, number of chunks)
+        """
+
+        deleted_count = chunks = 0
+        for chunk in self.pk_chunks(batch_size, pause, deadline):
+            deleted_count += chunk.purge()
+            chunks += 1
+        return deleted_count, chunks
+
+    purge_in_batches.alters_data = True
+    purge_in_batches.queryset_only = True
+
+    def archive(self):
+        """
+        Move the tasks to the archive with one INSERT ... SELECT and purge
+        them, in one transaction. The tasks are locked first, a task that
+        changes meanwhile is neither archived twice nor lost.
+        :return: number of archived tasks.
+        """
+
+        with transaction.atomic(using=self.db):
+            task_ids = list(
+                self.order_by().select_for_update().values_list(
+                    'pk', flat=True
+                )
+            )
+            if not task_ids:
+                return 0
+
+            tasks = self.model.objects.using(self.db).filter(pk__in=task_ids)
+            ArchivedTask.objects.db_manager(self.db).insert_from(tasks)
+            return tasks.purge()
+
+    archive.alters_data = True
+    archive.queryset_only = True
+
+    def archive_in_batches(self, batch_size, pause=0, deadline=None):
+        """
+        Archive the tasks chunk by chunk, like `purge_in_batches`.
+        :return: (number of archived tasks, number of chunks)
+        """
+
+        archived_count = chunks = 0
+        for chunk in self.pk_chunks(batch_size, pause, deadline):
+            archived_count += chunk.archive()
+            chunks += 1
+        return archived_count, chunks
+
+    archive_in_batches.alters_data = True
+    archive_in_batches.queryset_only = True
+
+
+class TaskManager(models.Manager.from_queryset(TaskQuerySet)):
+
+    def get_queryset(self):
+        # the search vector is only read by postgresql itself.
+        return super(TaskManager, self).get_queryset().defer('search_vector')
+
+
 class Task(models.Model):
     """
     This is a model class to define tasks for todoapp.
     """
 
-    user = models.ForeignKey(user, on_delete=models.CASCADE)
+    # the composite indexes below start with user_id, so the foreign
+    # key doesn't need an index of its own.
+    user = models.ForeignKey(user, on_delete=models.CASCADE, db_index=False)
     title = models.CharField(max_length=255)
     descriptions = models.TextField()
     complete = models.BooleanField(default=False)
     created_date = models.DateTimeField(auto_now_add=True)
     updated_date = models.DateTimeField(auto_now=True)
+    # maintained by a postgresql trigger from title and descriptions,
+    # it stays empty on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TaskManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Task, cls).from_db(db, field_names, values)
+        # remember the stored state to update the counters on save.
+        instance._loaded_complete = instance.__dict__.get('complete')
+        return instance
+
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        loaded_complete = getattr(self, '_loaded_complete', None)
+
+        with transaction.atomic():
+            super(Task, self).save(*args, **kwargs)
+
+            if created:
+                TaskCounter.objects.apply_delta(
+                    self.user_id, total=1, complete=int(self.complete)
+                )
+            elif loaded_complete is None:
+                TaskCounter.objects.recompute([self.user_id])
+            elif loaded_complete != self.complete:
+                TaskCounter.objects.apply_delta(
+                    self.user_id, complete=1 if self.complete else -1
+                )
+            bump_task_generation([self.user_id])
+
+        self._loaded_complete = self.complete
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            deleted = super(Task, self).delete(*args, **kwargs)
+            TaskCounter.objects.apply_delta(
+                self.user_id, total=-1, complete=-int(self.complete)
+            )
+            bump_task_generation([self.user_id])
+        return deleted
 
     def get_snippet(self):
         return f'{self.descriptions[:15]} ...'
@@ -29,3 +363,196 @@ class Task(models.Model):
 
     class Meta:
         ordering = ['complete']
+        indexes = [
+            # user's task list, ordered by complete and created date,
+            # and the complete filter of the api.
+            models.Index(
+                fields=['user', 'complete', 'created_date'],
+                name='task_user_complete_created_idx',
+            ),
+            # incomplete tasks of a user, the hot part of the table.
+            models.Index(
+                fields=['user', 'created_date'],
+                name='task_user_incomplete_idx',
+                condition=Q(complete=False),
+            ),
+        ]
+
+
+class TaskCounterManager(models.Manager):
+
+    def apply_delta(self, user_id, total=0, complete=0):
+        """
+        Add the changes of a user's tasks to its counters in one UPDATE,
+        the counters are recomputed if the user doesn't have them yet.
+        :param user_id: owner of the changed tasks
+        :param total: change of the number of tasks
+        :param complete: change of the number of complete tasks
+        """
+
+        updated = self.filter(user_id=user_id).update(
+            total=F('total') + total,
+            complete=F('complete') + complete,
+            incomplete=F('incomplete') + (total - complete),
+        )
+        if not updated:
+            self.recompute([user_id])
+
+    def apply_deleted(self, per_user):
+        """
+        Subtract deleted tasks, as counted by `TaskQuerySet.count_per_user`.
+        """
+
+        for row in per_user:
+            self.apply_delta(
+                row['user'], total=-row['total'], complete=-row['complete']
+            )
+
+    def count_tasks(self, user_ids):
+        """
+        Count the tasks of the given users with one aggregate query.
+        :return: list of unsaved counters, in the order of user_ids.
+        """
+
+        counts = {
+            row['user']: row
+            for row in Task.objects.filter(
+                user__in=user_ids
+            ).count_per_user()
+        }
+        counters = []
+        for user_id in user_ids:
+            row = counts.get(user_id, {'total': 0, 'complete': 0})
+            counters.append(
+                self.model(
+                    user_id=user_id,
+                    total=row['total'],
+                    complete=row['complete'],
+                    incomplete=row['total'] - row['complete'],
+                )
+            )
+        return counters
+
+    def recompute(self, user_ids):
+        """
+        Count the tasks of the given users from scratch and replace
+        their counters.
+
+        The counter rows are created if missing and locked before the
+        tasks are counted. A task write that updated a counter first is
+        committed by then and counted, one that comes after waits for the
+        lock and adds its delta to the recomputed counts.
+        :param user_ids: list of user ids
+        :return: list of the new counters.
+        """
+
+        user_ids = sorted(user_ids)
+        with transaction.atomic(using=self.db):
+            self.bulk_create(
+                [self.model(user_id=user_id) for user_id in user_ids],
+                ignore_conflicts=True,
+            )
+            list(
+                self.select_for_update().filter(
+                    user_id__in=user_ids
+                ).order_by('pk').values_list('pk', flat=True)
+            )
+            counters = self.count_tasks(user_ids)
+            self.bulk_update(counters, ['total', 'incomplete', 'complete'])
+        return counters
+
+    def get_for_user(self, user_obj):
+        """
+        :return: counter of the user, counted without being stored for a
+            user created before the counters.
+        """
+
+        try:
+            return self.get(user=user_obj)
+        except self.model.DoesNotExist:
+            return self.count_tasks([user_obj.pk])[0]
+
+
+class TaskCounter(models.Model):
+    """
+    Denormalized task counts of a user. They are kept up to date by every
+    task write, so the task list doesn't count the tasks on each request.
+    Run `manage.py recompute_task_counters` to repair them.
+    """
+
+    user = models.OneToOneField(
+        user, on_delete=models.CASCADE,
+        primary_key=True, related_name='task_counter'
+    )
+    total = models.IntegerField(default=0)
+    incomplete = models.IntegerField(default=0)
+    complete = models.IntegerField(default=0)
+
+    objects = TaskCounterManager()
+
+    def __str__(self):
+        return f'{self.user_id}: {self.incomplete}/{self.total}'
+
+
+class ArchivedTaskManager(models.Manager):
+
+    def insert_from(self, tasks):
+        """
+        Copy tasks into the archive with a single INSERT ... SELECT, the
+        tasks are never loaded into python.
+        :param tasks: Task queryset
+        :return: number of archived tasks.
+        """
+
+        select = tasks.order_by().annotate(
+            archived_value=Value(
+                timezone.now(), output_field=models.DateTimeField()
+            )
+        ).values_list(
+            'user_id', 'pk', 'title', 'descriptions',
+            'created_date', 'updated_date', 'archived_value',
+        )
+        select_sql, params = select.query.get_compiler(self.db).as_sql()
+
+        connection = connections[self.db]
+        columns = ', '.join(
+            connection.ops.quote_name(self.model._meta.get_field(name).column)
+            for name in (
+                'user', 'task_id', 'title', 'descriptions',
+                'created_date', 'completed_date', 'archived_date',
+            )
+        )
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) {select_sql}', params
+            )
+            return cursor.rowcount
+
+
+class ArchivedTask(models.Model):
+    """
+    Append-only cold storage of the complete tasks, they are moved out of
+    the task table once TASK_ARCHIVE_GRACE_PERIOD has passed. Rows are only
+    inserted in bulk and streamed back to their user, never updated.
+    """
+
+    # the user index below covers the foreign key.
+    user = models.ForeignKey(user, on_delete=models.CASCADE, db_index=False)
+    task_id = models.BigIntegerField()
+    title = models.CharField(max_length=255)
+    descriptions = models.TextField()
+    created_date = models.DateTimeField()
+    completed_date = models.DateTimeField()
+    archived_date = models.DateTimeField()
+
+    objects = ArchivedTaskManager()
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        indexes = [
+            # a user's archive, streamed in insertion order.
+            models.Index(fields=['user', 'id'], name='archived_task_user_idx'),
+        ]
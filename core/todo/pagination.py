@@ -0,0 +1,130 @@
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+# tasks are paginated in the order of the
+# (user, complete, created_date) index, id breaks the ties.
+KEYSET_ORDERING = ('complete', 'created_date', 'id')
+# search results in the relevance order of `search_tasks`.
+SEARCH_KEYSET_ORDERING = ('-search_rank', 'id')
+
+
+def is_ranked(queryset):
+    """
+    :return: True if the queryset holds search results of `search_tasks`.
+    """
+
+    return 'search_rank' in queryset.query.annotations
+
+
+def get_position(task):
+    """
+    :param task: task instance or `values()` row of a task
+    :return: (search_rank, id) of a search result, otherwise
+        (complete, created_date, id)
+    """
+
+    if isinstance(task, dict):
+        if 'search_rank' in task:
+            return task['search_rank'], task['id']
+        return task['complete'], task['created_date'], task['id']
+    if hasattr(task, 'search_rank'):
+        return task.search_rank, task.pk
+    return task.complete, task.created_date, task.pk
+
+
+def encode_cursor(task):
+    """
+    Encode the keyset position of a task as an opaque cursor.
+    :param task: last task of a page, instance or `values()` row
+    :return: url safe cursor string
+    """
+
+    position = get_position(task)
+    if len(position) == 2:
+        # repr gives back the exact float, the rank is compared for
+        # equality on the next page.
+        rank, pk = position
+        position = f'{rank!r}|{pk}'
+    else:
+        complete, created_date, pk = position
+        position = f'{int(complete)}|{created_date.isoformat()}|{pk}'
+    return urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor, ranked=False):
+    """
+    Decode a cursor made by `encode_cursor`.
+    :param cursor: url safe cursor string
+    :param ranked: True if the cursor is a position in search results
+    :return: (search_rank, id) if ranked, otherwise
+        (complete, created_date, id)
+    :raise ValueError: if the cursor is not valid.
+    """
+
+    try:
+        position = urlsafe_b64decode(cursor.encode()).decode()
+        if ranked:
+            rank, pk = position.split('|')
+            rank = float(rank)
+            if not math.isfinite(rank):
+                raise ValueError('Invalid cursor.')
+            return rank, int(pk)
+        complete, created_date, pk = position.split('|')
+        created_date = parse_datetime(created_date)
+        if complete not in ('0', '1') or created_date is None:
+            raise ValueError('Invalid cursor.')
+        return complete == '1', created_date, int(pk)
+    except (BinasciiError, UnicodeError, TypeError) as error:
+        raise ValueError('Invalid cursor.') from error
+
+
+def paginate_keyset(queryset, position, page_size):
+    """
+    Return one page of tasks after the given keyset position.
+
+    The position is turned into a range on the created_date column of the
+    index instead of an OFFSET, so a page costs the same at any depth and
+    rows inserted before the position don't shift the next pages.
+    Search results are paginated by (search_rank, id) in their relevance
+    order.
+    :param queryset: user's tasks, filtered but not sliced
+    :param position: position of the previous page's last task, as
+        decoded by `decode_cursor`, or None for the first page
+    :param page_size: number of tasks in a page
+    :return: (tasks, last task of the page or None on the last page)
+    """
+
+    limit = page_size + 1
+
+    if is_ranked(queryset):
+        queryset = queryset.order_by(*SEARCH_KEYSET_ORDERING)
+        if position is not None:
+            rank, pk = position
+            queryset = queryset.filter(
+                Q(search_rank__lt=rank) | Q(search_rank=rank, pk__gt=pk)
+            )
+        tasks = list(queryset[:limit])
+    elif position is None:
+        tasks = list(queryset.order_by(*KEYSET_ORDERING)[:limit])
+    else:
+        queryset = queryset.order_by(*KEYSET_ORDERING)
+        complete, created_date, pk = position
+        tasks = list(
+            queryset.filter(
+                complete=complete, created_date__gte=created_date
+            ).exclude(
+                created_date=created_date, pk__lte=pk
+            )[:limit]
+        )
+        # incomplete tasks come first, continue with the complete ones.
+        if not complete and len(tasks) < limit:
+            tasks += queryset.filter(complete=True)[:limit - len(tasks)]
+
+    if len(tasks) > page_size:
+        return tasks[:page_size], tasks[page_size - 1]
+    return tasks, None
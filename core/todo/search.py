@@ -0,0 +1,85 @@
+import re
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, FloatField, Value, When
+
+
+# text search configuration of the `search_vector` trigger.
+SEARCH_CONFIG = 'english'
+
+TOKEN_RE = re.compile(r'\w+')
+TITLE_WEIGHT = 1.0
+DESCRIPTIONS_WEIGHT = 0.4
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    Pure python inverted index over task titles and descriptions.
+    It is the fallback of postgresql full text search for other databases,
+    like the sqlite test runs, and ranks matches the same way: every word
+    of the query must match and title matches weigh more.
+    """
+
+    def __init__(self, rows):
+        """
+        :param rows: iterable of (id, title, descriptions)
+        """
+
+        self.postings = defaultdict(lambda: defaultdict(float))
+        for pk, title, descriptions in rows:
+            for term in tokenize(title):
+                self.postings[term][pk] += TITLE_WEIGHT
+            for term in tokenize(descriptions):
+                self.postings[term][pk] += DESCRIPTIONS_WEIGHT
+
+    def search(self, text):
+        """
+        :param text: search query
+        :return: {task id: rank} of the tasks matching every term.
+        """
+
+        scores = None
+        for term in set(tokenize(text)):
+            postings = self.postings.get(term, {})
+            if scores is None:
+                scores = dict(postings)
+            else:
+                scores = {
+                    pk: score + postings[pk]
+                    for pk, score in scores.items() if pk in postings
+                }
+        return scores or {}
+
+
+def search_tasks(queryset, text):
+    """
+    Filter the tasks matching the search text and order them by relevance.
+    The relevance is annotated as `search_rank`.
+    :param queryset: task queryset
+    :param text: search query of the user
+    :return: task queryset
+    """
+
+    if connections[queryset.db].vendor == 'postgresql':
+        query = SearchQuery(text, config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', 'id')
+
+    index = InvertedIndex(
+        queryset.values_list('pk', 'title', 'descriptions')
+    )
+    ranks = index.search(text)
+    return queryset.filter(pk__in=ranks).annotate(
+        search_rank=Case(
+            *[When(pk=pk, then=Value(rank)) for pk, rank in ranks.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    ).order_by('-search_rank', 'id')
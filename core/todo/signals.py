@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .caching import bump_task_generation
+from .models import TaskCounter
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def start_task_generation(sender, instance, created, **kwargs):
+    # some databases reuse the id of a deleted user, a new user must not
+    # see the task lists cached for the old one.
+    if created:
+        bump_task_generation([instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_task_counter(sender, instance, created, using, **kwargs):
+    # task writes only update the counter row, it exists from the start.
+    if created:
+        TaskCounter.objects.using(using).create(user_id=instance.pk)
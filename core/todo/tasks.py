@@ -1,21 +1,132 @@
+import time
+import uuid
+from datetime import timedelta
+
 from celery.schedules import crontab
+from celery.signals import beat_init
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 
 from .models import Task
+from .weather import refresh_weather_cache
 from core.celery import app as celery_app
 
 
+TASK_JOB_LOCK_KEY = 'task:{job}:lock'
+TASK_JOB_METRICS_KEY = 'task:{job}:metrics'
+TASK_PURGE_LOCK_KEY = TASK_JOB_LOCK_KEY.format(job='purge')
+TASK_PURGE_METRICS_KEY = TASK_JOB_METRICS_KEY.format(job='purge')
+TASK_ARCHIVE_LOCK_KEY = TASK_JOB_LOCK_KEY.format(job='archive')
+TASK_ARCHIVE_METRICS_KEY = TASK_JOB_METRICS_KEY.format(job='archive')
+
+
+def run_batched_job(job, rows_name, lock_timeout, run):
+    """
+    Run a batched job under a redis lock, which keeps two beat ticks from
+    running it at once. A run that runs out of its lock stops and the next
+    tick goes on with the rest.
+    :param job: name of the job in its lock and metrics keys
+    :param rows_name: name of the row count in the metrics
+    :param lock_timeout: seconds the lock is held at most
+    :param run: callable taking the deadline, returns (rows, chunks)
+    :return: metrics of the run, None if another run holds the lock.
+    """
+
+    lock_key = TASK_JOB_LOCK_KEY.format(job=job)
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, lock_timeout):
+        return None
+
+    try:
+        started = time.monotonic()
+        rows, chunks = run(started + lock_timeout * 0.9)
+        duration = time.monotonic() - started
+        rows_per_sec = rows / duration if duration else 0.0
+        metrics = {
+            rows_name: rows,
+            'chunks': chunks,
+            'duration': round(duration, 3),
+            'rows_per_sec': round(rows_per_sec, 1),
+            'finished_at': time.time(),
+        }
+        cache.set(TASK_JOB_METRICS_KEY.format(job=job), metrics, None)
+        return metrics
+    finally:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
 @celery_app.task
 def delete_complete_tasks():
-    tasks = Task.objects.filter(complete=True).delete()
-    print(tasks)
+    """
+    Purge every complete task in batches. Beat archives the complete
+    tasks instead, this is the manual fallback that deletes them for good.
+    :return: metrics of the purge, None if another purge is running.
+    """
+
+    def purge(deadline):
+        return Task.objects.filter(complete=True).purge_in_batches(
+            settings.TASK_PURGE_BATCH_SIZE,
+            pause=settings.TASK_PURGE_BATCH_PAUSE,
+            deadline=deadline,
+        )
+
+    return run_batched_job(
+        'purge', 'deleted', settings.TASK_PURGE_LOCK_TIMEOUT, purge
+    )
+
+
+@celery_app.task
+def archive_complete_tasks():
+    """
+    Move the tasks complete for longer than TASK_ARCHIVE_GRACE_PERIOD to
+    the archive in batches.
+    :return: metrics of the run, None if another run is going on.
+    """
+
+    completed_before = timezone.now() - timedelta(
+        seconds=settings.TASK_ARCHIVE_GRACE_PERIOD
+    )
+
+    def archive(deadline):
+        return Task.objects.filter(
+            complete=True, updated_date__lt=completed_before
+        ).archive_in_batches(
+            settings.TASK_ARCHIVE_BATCH_SIZE,
+            pause=settings.TASK_ARCHIVE_BATCH_PAUSE,
+            deadline=deadline,
+        )
+
+    return run_batched_job(
+        'archive', 'archived', settings.TASK_ARCHIVE_LOCK_TIMEOUT, archive
+    )
+
+
+@celery_app.task
+def refresh_weather():
+    refresh_weather_cache()
 
 
 @celery_app.on_after_finalize.connect
 def setup_periodic_tasks(sender, **kwargs):
     sender.add_periodic_task(
         crontab(minute='*/10'),
-        delete_complete_tasks.s(),
-        name='deleting complete tasks every 10 min.'
+        archive_complete_tasks.s(),
+        name='archiving complete tasks every 10 min.'
+    )
+    sender.add_periodic_task(
+        settings.WEATHER_REFRESH_INTERVAL,
+        refresh_weather.s(),
+        name='refreshing weather ahead of its expiry.'
     )
 
+
+@beat_init.connect
+def warm_weather_cache(sender, **kwargs):
+    # fill the weather cache as soon as beat starts instead of
+    # waiting for the first refresh interval.
+    refresh_weather.delay()
+
 # celery -A core beat -l info
@@ -0,0 +1,101 @@
+import json
+from datetime import timedelta
+
+import pytest
+
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from todo.models import ArchivedTask, Task, TaskCounter
+from todo.tasks import TASK_ARCHIVE_LOCK_KEY, archive_complete_tasks
+
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_users():
+    return [
+        User.objects.create_user(
+            email=f'test_{number}@test.com',
+            username=f'test_username_{number}',
+            password='far!@#$%'
+        )
+        for number in range(2)
+    ]
+
+
+@pytest.fixture
+def test_tasks(test_users):
+    # 5 complete and 2 incomplete tasks, interleaved between the users.
+    tasks = [
+        Task.objects.create(
+            user=test_users[number % 2],
+            title=f'test_title_{number}',
+            descriptions=f'test_descriptions_{number}',
+            complete=number < 5
+        )
+        for number in range(7)
+    ]
+    # all but the last complete task are past the grace period.
+    Task.objects.filter(pk__in=[task.pk for task in tasks[:4]]).update(
+        updated_date=timezone.now() - timedelta(days=2)
+    )
+    return tasks
+
+
+def get_counts(user_obj):
+    counter = TaskCounter.objects.get(user=user_obj)
+    return counter.total, counter.incomplete, counter.complete
+
+
+@pytest.mark.django_db
+class TestTodoTaskArchive:
+
+    def test_archive_moves_tasks_in_batches(self, test_users, test_tasks):
+        archived_count, chunks = Task.objects.filter(
+            complete=True
+        ).archive_in_batches(batch_size=2)
+
+        assert (archived_count, chunks) == (5, 3)
+        assert not Task.objects.filter(complete=True).exists()
+        assert get_counts(test_users[0]) == (1, 1, 0)
+        assert get_counts(test_users[1]) == (1, 1, 0)
+
+        archived_task = ArchivedTask.objects.get(task_id=test_tasks[0].pk)
+        assert archived_task.user == test_users[0]
+        assert archived_task.title == 'test_title_0'
+        assert archived_task.descriptions == 'test_descriptions_0'
+        assert archived_task.created_date == test_tasks[0].created_date
+
+    def test_beat_archives_tasks_after_grace_period(self, test_tasks):
+        cache.delete(TASK_ARCHIVE_LOCK_KEY)
+
+        metrics = archive_complete_tasks()
+        assert metrics['archived'] == 4
+        assert ArchivedTask.objects.count() == 4
+        assert list(
+            Task.objects.filter(complete=True).values_list('pk', flat=True)
+        ) == [test_tasks[4].pk]
+
+    def test_archive_is_streamed_as_json_lines(self, test_users, test_tasks):
+        Task.objects.filter(complete=True).archive()
+        client = APIClient()
+        client.force_authenticate(user=test_users[1])
+
+        response = client.get(reverse('task:api-v1:task-archive'))
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+
+        lines = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert [line['task_id'] for line in lines] == [
+            test_tasks[1].pk, test_tasks[3].pk
+        ]
+        assert lines[0]['title'] == 'test_title_1'
@@ -0,0 +1,181 @@
+import threading
+import time
+
+import pytest
+
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+
+from todo.models import Task, TaskCounter
+from todo.tasks import delete_complete_tasks
+
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user():
+    user = User.objects.create_user(
+        email='test@test.com',
+        username='test_username',
+        password='far!@#$%'
+    )
+    return user
+
+
+@pytest.fixture
+def test_tasks(test_user):
+    return [
+        Task.objects.create(
+            user=test_user,
+            title=f'test_title_{number}',
+            descriptions='test_descriptions',
+            complete=number < 2
+        )
+        for number in range(5)
+    ]
+
+
+def get_counts(user_obj):
+    counter = TaskCounter.objects.get(user=user_obj)
+    return counter.total, counter.incomplete, counter.complete
+
+
+@pytest.mark.django_db
+class TestTodoTaskCounters:
+
+    def test_counters_follow_create(self, test_user, test_tasks):
+        assert get_counts(test_user) == (5, 3, 2)
+
+    def test_counters_follow_update_and_delete(self, test_user, test_tasks):
+        task = Task.objects.get(pk=test_tasks[4].pk)
+        task.complete = True
+        task.save()
+        assert get_counts(test_user) == (5, 2, 3)
+
+        task.title = 'test_title_edited'
+        task.save()
+        assert get_counts(test_user) == (5, 2, 3)
+
+        task.delete()
+        assert get_counts(test_user) == (4, 2, 2)
+
+    def test_counters_follow_complete_view(
+            self, client, test_user, test_tasks
+    ):
+        client.force_login(user=test_user)
+        url = reverse('task:complete', kwargs={'task_id': test_tasks[0].pk})
+        client.get(url)
+        assert get_counts(test_user) == (5, 4, 1)
+
+    def test_counters_follow_bulk_writes(self, test_user, test_tasks):
+        assert Task.objects.all().set_complete(False) == 2
+        assert get_counts(test_user) == (5, 5, 0)
+
+        first_tasks = [test_tasks[0].pk, test_tasks[1].pk]
+        Task.objects.filter(pk__in=first_tasks).set_complete(True)
+        assert get_counts(test_user) == (5, 3, 2)
+
+        delete_complete_tasks()
+        assert Task.objects.count() == 3
+        assert get_counts(test_user) == (3, 3, 0)
+
+        Task.objects.filter(pk=test_tasks[4].pk).delete()
+        assert get_counts(test_user) == (2, 2, 0)
+
+    def test_set_complete_touches_updated_date(self, test_user, test_tasks):
+        updated = test_tasks[0].updated_date
+        Task.objects.filter(pk=test_tasks[0].pk).set_complete(
+            not test_tasks[0].complete
+        )
+        test_tasks[0].refresh_from_db()
+        assert test_tasks[0].updated_date > updated
+
+    def test_task_list_uses_counter(self, client, test_user, test_tasks):
+        client.force_login(user=test_user)
+        response = client.get(reverse('task:list'))
+        assert response.context['incomplete_task_count'] == 3
+
+    def test_recompute_task_counters_command(self, test_user, test_tasks):
+        TaskCounter.objects.filter(user=test_user).update(
+            total=0, incomplete=0, complete=0
+        )
+        other_user = User.objects.create_user(
+            email='other@test.com',
+            username='other_username',
+            password='far!@#$%'
+        )
+
+        call_command('recompute_task_counters', batch_size=1)
+        assert get_counts(test_user) == (5, 3, 2)
+        assert get_counts(other_user) == (0, 0, 0)
+
+    def test_new_user_starts_with_a_counter(self):
+        user = User.objects.create_user(
+            email='new@test.com',
+            username='new_username',
+            password='far!@#$%'
+        )
+        assert get_counts(user) == (0, 0, 0)
+
+    def test_task_list_does_not_write_counters(
+            self, client, test_user, test_tasks
+    ):
+        TaskCounter.objects.filter(user=test_user).delete()
+        client.force_login(user=test_user)
+        response = client.get(reverse('task:list'))
+
+        assert response.context['incomplete_task_count'] == 3
+        assert not TaskCounter.objects.filter(user=test_user).exists()
+
+    def test_recompute_keeps_existing_rows(self, test_user, test_tasks):
+        TaskCounter.objects.recompute([test_user.pk, test_user.pk])
+        TaskCounter.objects.recompute([test_user.pk])
+        assert TaskCounter.objects.count() == 1
+        assert get_counts(test_user) == (5, 3, 2)
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='sqlite locks the whole database, there is no row lock race.',
+)
+@pytest.mark.django_db(transaction=True)
+class TestTodoTaskCountersConcurrency:
+
+    def test_concurrent_bulk_writes_are_counted_once(
+            self, test_user, test_tasks
+    ):
+        first_counted = threading.Event()
+        release = threading.Event()
+
+        def first():
+            try:
+                with transaction.atomic():
+                    Task.objects.filter(user=test_user).set_complete(True)
+                    first_counted.set()
+                    release.wait(5)
+            finally:
+                connections.close_all()
+
+        def second():
+            first_counted.wait(5)
+            try:
+                # waits for the rows the first transaction locked.
+                Task.objects.filter(user=test_user).set_complete(True)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=first), threading.Thread(target=second)
+        ]
+        for thread in threads:
+            thread.start()
+        first_counted.wait(5)
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert get_counts(test_user) == (5, 0, 5)
@@ -0,0 +1,69 @@
+from io import StringIO
+
+import pytest
+
+from django.core.management import CommandError, call_command
+from django.contrib.auth import get_user_model
+
+from todo.management.commands.insert_dummy_data import get_task_counts
+from todo.models import Task, TaskCounter
+
+
+User = get_user_model()
+
+
+def run_command(**options):
+    out = StringIO()
+    call_command('insert_dummy_data', stdout=out, **options)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+class TestTodoDummyData:
+
+    def test_default_run_inserts_one_user_with_five_tasks(self):
+        out = run_command()
+        assert '1 users and 5 tasks inserted.' in out
+
+        user = User.objects.get()
+        assert user.is_verified
+        counter = TaskCounter.objects.get(user=user)
+        assert counter.total == Task.objects.filter(user=user).count() == 5
+        assert counter.complete == Task.objects.filter(
+            user=user, complete=True
+        ).count()
+
+    def test_skewed_run_spreads_every_task(self):
+        run_command(
+            users=20, tasks_per_user=10, skew=1.2, batch_size=7, seed=3
+        )
+
+        assert User.objects.count() == 20
+        assert Task.objects.count() == 200
+        totals = sorted(
+            TaskCounter.objects.values_list('total', flat=True), reverse=True
+        )
+        assert sum(totals) == 200
+        assert totals[0] > totals[-1] * 10
+
+    def test_users_share_one_password_hash(self):
+        run_command(users=3, tasks_per_user=0)
+        assert User.objects.values('password').distinct().count() == 1
+
+    def test_copy_needs_postgresql(self):
+        with pytest.raises(CommandError):
+            run_command(copy=True)
+        assert not User.objects.exists()
+
+
+class TestTodoTaskCounts:
+
+    @pytest.mark.parametrize('skew', [0, 0.5, 1, 2])
+    def test_counts_add_up(self, skew):
+        counts = get_task_counts(100, 50, skew, seed=1)
+        assert len(counts) == 100
+        assert sum(counts) == 5000
+
+    def test_no_skew_is_even(self):
+        counts = get_task_counts(4, 5, 0, seed=1)
+        assert counts == [5, 5, 5, 5]
@@ -0,0 +1,127 @@
+import pytest
+
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from todo.models import Task
+from todo.caching import get_task_generation
+from todo.tasks import delete_complete_tasks
+
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user():
+    user = User.objects.create_user(
+        email='test@test.com',
+        username='test_username',
+        password='far!@#$%'
+    )
+    return user
+
+
+@pytest.fixture
+def test_tasks(test_user):
+    return [
+        Task.objects.create(
+            user=test_user,
+            title=f'test_title_{number}',
+            descriptions='test_descriptions',
+            complete=number < 2
+        )
+        for number in range(5)
+    ]
+
+
+def rendered_items(response):
+    return 'todo/task_list_items.html' in [
+        template.name for template in response.templates
+    ]
+
+
+@pytest.mark.django_db
+class TestTodoTaskGeneration:
+
+    def test_generation_changes_on_every_task_write(
+            self, test_user, test_tasks
+    ):
+        writes = [
+            lambda: Task.objects.create(
+                user=test_user, title='new', descriptions='new'
+            ),
+            lambda: Task.objects.filter(pk=test_tasks[0].pk).update_tasks(
+                title='edited'
+            ),
+            lambda: Task.objects.filter(user=test_user).toggle_complete(),
+            lambda: Task.objects.filter(pk=test_tasks[1].pk).delete(),
+            lambda: Task.objects.bulk_create(
+                [Task(user=test_user, title='bulk', descriptions='bulk')]
+            ),
+            delete_complete_tasks,
+        ]
+        generations = {get_task_generation(test_user.id)}
+        for write in writes:
+            write()
+            generations.add(get_task_generation(test_user.id))
+        assert len(generations) == len(writes) + 1
+
+    def test_generation_of_other_users_is_kept(self, test_user, test_tasks):
+        other_user = User.objects.create_user(
+            email='other@test.com', username='other', password='far!@#$%'
+        )
+        generation = get_task_generation(other_user.id)
+        test_tasks[0].delete()
+        assert get_task_generation(other_user.id) == generation
+
+
+@pytest.mark.django_db
+class TestTodoTaskListCache:
+
+    def test_unchanged_list_is_served_from_cache(
+            self, client, test_user, test_tasks
+    ):
+        client.force_login(test_user)
+        url = reverse('task:list')
+        first = client.get(url)
+        second = client.get(url)
+
+        assert rendered_items(first)
+        assert not rendered_items(second)
+        assert second.content == first.content
+
+    def test_task_write_invalidates_cached_list(
+            self, client, test_user, test_tasks
+    ):
+        client.force_login(test_user)
+        url = reverse('task:list')
+        client.get(url)
+
+        client.get(reverse('task:complete', args=(test_tasks[4].pk,)))
+        response = client.get(url)
+        assert rendered_items(response)
+        assert response.context['incomplete_task_count'] == 2
+
+    def test_search_results_are_cached_apart(
+            self, client, test_user, test_tasks
+    ):
+        client.force_login(test_user)
+        url = reverse('task:list')
+        client.get(url)
+
+        response = client.get(url, data={'search': 'test_title_3'})
+        assert rendered_items(response)
+        assert b'test_title_3' in response.content
+        assert b'test_title_4' not in response.content
+
+        response = client.get(url, data={'search': 'test_title_3'})
+        assert not rendered_items(response)
+
+    def test_large_fragments_are_not_cached(
+            self, client, test_user, test_tasks, settings
+    ):
+        settings.TASK_FRAGMENT_MAX_SIZE = 10
+        client.force_login(test_user)
+        url = reverse('task:list')
+        client.get(url)
+        assert rendered_items(client.get(url))
@@ -0,0 +1,86 @@
+import pytest
+
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+
+from todo.models import Task, TaskCounter
+from todo.tasks import (
+    TASK_PURGE_LOCK_KEY, TASK_PURGE_METRICS_KEY, delete_complete_tasks
+)
+
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_users():
+    return [
+        User.objects.create_user(
+            email=f'test_{number}@test.com',
+            username=f'test_username_{number}',
+            password='far!@#$%'
+        )
+        for number in range(2)
+    ]
+
+
+@pytest.fixture
+def test_tasks(test_users):
+    # 7 complete and 3 incomplete tasks, interleaved between the users.
+    return Task.objects.bulk_create([
+        Task(
+            user=test_users[number % 2],
+            title=f'test_title_{number}',
+            complete=number < 7
+        )
+        for number in range(10)
+    ])
+
+
+def get_counts(user_obj):
+    counter = TaskCounter.objects.get(user=user_obj)
+    return counter.total, counter.incomplete, counter.complete
+
+
+@pytest.mark.django_db
+class TestTodoTaskPurge:
+
+    def test_purge_in_batches_deletes_by_pk_chunks(
+            self, test_users, test_tasks
+    ):
+        deleted_count, chunks = Task.objects.filter(
+            complete=True
+        ).purge_in_batches(batch_size=2)
+
+        assert (deleted_count, chunks) == (7, 4)
+        assert not Task.objects.filter(complete=True).exists()
+        assert get_counts(test_users[0]) == (1, 1, 0)
+        assert get_counts(test_users[1]) == (2, 2, 0)
+
+    def test_purge_stops_at_deadline(self, test_tasks):
+        deleted_count, chunks = Task.objects.filter(
+            complete=True
+        ).purge_in_batches(batch_size=2, deadline=0)
+
+        assert (deleted_count, chunks) == (0, 0)
+        assert Task.objects.count() == 10
+
+    def test_delete_complete_tasks_reports_metrics(self, test_tasks, settings):
+        settings.TASK_PURGE_BATCH_SIZE = 3
+        settings.TASK_PURGE_BATCH_PAUSE = 0
+        cache.delete_many([TASK_PURGE_LOCK_KEY, TASK_PURGE_METRICS_KEY])
+
+        metrics = delete_complete_tasks()
+        assert (metrics['deleted'], metrics['chunks']) == (7, 3)
+        assert metrics['rows_per_sec'] > 0
+        assert cache.get(TASK_PURGE_METRICS_KEY) == metrics
+        assert cache.get(TASK_PURGE_LOCK_KEY) is None
+
+    def test_overlapping_purge_is_skipped(self, test_tasks):
+        cache.set(TASK_PURGE_LOCK_KEY, 'other_worker')
+        try:
+            assert delete_complete_tasks() is None
+        finally:
+            cache.delete(TASK_PURGE_LOCK_KEY)
+
+        assert Task.objects.filter(complete=True).count() == 7
@@ -0,0 +1,139 @@
+import pytest
+
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+
+from todo.models import Task
+from todo.search import InvertedIndex, search_tasks
+from todo.views import TaskListView
+from todo.api.v1.paginations import TaskCursorPagination
+
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user():
+    user = User.objects.create_user(
+        email='test@test.com',
+        username='test_username',
+        password='far!@#$%'
+    )
+    return user
+
+
+@pytest.fixture
+def test_tasks(test_user):
+    rows = [
+        ('buy milk', 'from the shop near home'),
+        ('call mom', 'ask her to buy milk on the way'),
+        ('write report', 'quarterly report for the shop'),
+        ('milk the cows', 'milk them early in the morning'),
+    ]
+    return [
+        Task.objects.create(
+            user=test_user, title=title, descriptions=descriptions
+        )
+        for title, descriptions in rows
+    ]
+
+
+class TestTodoInvertedIndex:
+
+    def test_every_term_must_match(self):
+        index = InvertedIndex([
+            (1, 'buy milk', ''),
+            (2, 'buy bread', ''),
+        ])
+        assert set(index.search('buy')) == {1, 2}
+        assert set(index.search('BUY milk')) == {1}
+        assert index.search('cheese') == {}
+        assert index.search('') == {}
+
+    def test_title_matches_rank_higher(self):
+        index = InvertedIndex([
+            (1, 'report', 'milk'),
+            (2, 'milk', 'report'),
+        ])
+        ranks = index.search('milk')
+        assert ranks[2] > ranks[1]
+
+
+@pytest.mark.django_db
+class TestTodoSearch:
+
+    def test_search_tasks_orders_by_relevance(self, test_user, test_tasks):
+        tasks = search_tasks(Task.objects.filter(user=test_user), 'milk')
+        assert [task.title for task in tasks] == [
+            'milk the cows', 'buy milk', 'call mom'
+        ]
+
+    def test_search_is_scoped_to_queryset(self, test_user, test_tasks):
+        other_user = User.objects.create_user(
+            email='other@test.com',
+            username='other_username',
+            password='far!@#$%'
+        )
+        Task.objects.create(user=other_user, title='milk', descriptions='')
+
+        tasks = search_tasks(Task.objects.filter(user=test_user), 'milk')
+        assert all(task.user_id == test_user.pk for task in tasks)
+
+    def test_api_search_param(self, test_user, test_tasks):
+        client = APIClient()
+        client.force_login(user=test_user)
+        response = client.get(
+            path=reverse('task:api-v1:task-list'), data={'search': 'shop'}
+        )
+        titles = [task['title'] for task in response.data['results']]
+        assert titles == ['buy milk', 'write report']
+        assert response.data['next'] is None
+
+    def test_api_search_pages_every_match(
+            self, test_user, test_tasks, monkeypatch
+    ):
+        # more matches than max_page_size, most of them with the same rank.
+        monkeypatch.setattr(TaskCursorPagination, 'max_page_size', 2)
+        for number in range(5):
+            Task.objects.create(
+                user=test_user, title=f'milk {number}', descriptions=''
+            )
+        expected = list(
+            search_tasks(Task.objects.filter(user=test_user), 'milk')
+            .values_list('id', flat=True)
+        )
+
+        client = APIClient()
+        client.force_login(user=test_user)
+        url, params, ids = reverse('task:api-v1:task-list'), {
+            'search': 'milk', 'page_size': 2,
+        }, []
+        while url:
+            response = client.get(path=url, data=params)
+            assert len(response.data['results']) <= 2
+            ids += [task['id'] for task in response.data['results']]
+            url, params = response.data['next'], {}
+        assert ids == expected
+
+    def test_task_list_search_pages_every_match(
+            self, client, test_user, test_tasks, monkeypatch
+    ):
+        monkeypatch.setattr(TaskListView, 'page_size', 2)
+        client.force_login(user=test_user)
+        data, titles = {'search': 'milk'}, []
+        while True:
+            response = client.get(reverse('task:list'), data=data)
+            titles += [task.title for task in response.context['tasks']]
+            if response.context['next_cursor'] is None:
+                break
+            data['cursor'] = response.context['next_cursor']
+        assert titles == ['milk the cows', 'buy milk', 'call mom']
+
+    def test_task_list_search_box(self, client, test_user, test_tasks):
+        client.force_login(user=test_user)
+        response = client.get(reverse('task:list'), data={'search': 'report'})
+        assert [task.title for task in response.context['tasks']] == [
+            'write report'
+        ]
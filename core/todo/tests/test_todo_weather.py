@@ -0,0 +1,225 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+
+from kombu.exceptions import OperationalError
+
+from rest_framework.test import APIClient
+
+from todo import weather
+from todo.tasks import refresh_weather
+
+
+User = get_user_model()
+
+WEATHER_PAYLOAD = {
+    'weather': [{'description': 'clear sky'}],
+    'main': {'temp': 21.5},
+}
+
+
+class StubWeatherHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.hits += 1
+        self.server.client_ports.add(self.client_address[1])
+        if self.server.failures:
+            self.server.failures -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = json.dumps(WEATHER_PAYLOAD).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def weather_server(settings):
+    """
+    Local stand-in for the openweather api.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubWeatherHandler)
+    server.hits = 0
+    server.failures = 0
+    server.client_ports = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    host, port = server.server_address
+    settings.OPEN_WEATHER_URL = f'http://{host}:{port}/data/2.5/weather'
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def set_cached_snapshot(snapshot):
+    cache.set(
+        weather.WEATHER_CACHE_KEY, snapshot,
+        version=weather.WEATHER_CACHE_VERSION
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_weather_cache(monkeypatch):
+    monkeypatch.setattr(weather, '_local_weather', (0, None))
+    monkeypatch.setattr(weather, '_session', None)
+    versioned_keys = [weather.WEATHER_CACHE_KEY, weather.WEATHER_PAYLOAD_KEY]
+    cache.delete_many(versioned_keys, version=weather.WEATHER_CACHE_VERSION)
+    cache.delete_many(
+        [weather.WEATHER_LOCK_KEY, weather.WEATHER_REVALIDATE_KEY]
+    )
+    yield
+    cache.delete_many(versioned_keys, version=weather.WEATHER_CACHE_VERSION)
+
+
+@pytest.fixture
+def scheduled_refreshes(monkeypatch):
+    calls = []
+    monkeypatch.setattr(refresh_weather, 'delay', lambda: calls.append(1))
+    return calls
+
+
+@pytest.fixture
+def test_user():
+    user = User.objects.create_user(
+        email='test@test.com',
+        username='test_username',
+        password='far!@#$%'
+    )
+    return user
+
+
+class TestTodoWeather:
+
+    def test_refresh_weather_cache_stores_snapshot(self, weather_server):
+        snapshot = weather.refresh_weather_cache()
+
+        assert weather_server.hits == 1
+        assert snapshot.description == 'clear sky'
+        assert snapshot.temp == 21.5
+        assert cache.get(
+            weather.WEATHER_CACHE_KEY, version=weather.WEATHER_CACHE_VERSION
+        ) == snapshot
+
+    def test_fetch_weather_reuses_connection(self, weather_server):
+        weather.fetch_weather()
+        weather.fetch_weather()
+
+        assert weather_server.hits == 2
+        assert len(weather_server.client_ports) == 1
+
+    def test_fetch_weather_retries_server_errors(self, weather_server):
+        weather_server.failures = 1
+
+        assert weather.fetch_weather() == WEATHER_PAYLOAD
+        assert weather_server.hits == 2
+
+    def test_refresh_weather_cache_is_single_flight(self, weather_server):
+        cache.add(weather.WEATHER_LOCK_KEY, 'other-worker', 30)
+
+        assert weather.refresh_weather_cache() is None
+        assert weather_server.hits == 0
+        assert weather.get_cached_weather() is None
+
+    def test_get_cached_weather_serves_stale_and_revalidates_once(
+            self, settings, scheduled_refreshes
+    ):
+        stale_snapshot = weather.WeatherSnapshot(
+            description='clear sky', temp=21.5,
+            fetched_at=time.time() - settings.WEATHER_FRESH_TIMEOUT - 1,
+        )
+        set_cached_snapshot(stale_snapshot)
+
+        assert weather.get_cached_weather() == stale_snapshot
+        assert weather.get_cached_weather() == stale_snapshot
+        assert len(scheduled_refreshes) == 1
+
+    def test_get_cached_weather_fresh_does_not_revalidate(
+            self, weather_server, scheduled_refreshes
+    ):
+        weather.refresh_weather_cache()
+
+        assert weather.get_cached_weather().description == 'clear sky'
+        assert scheduled_refreshes == []
+
+    def test_get_cached_weather_reads_redis_once(
+            self, weather_server, scheduled_refreshes
+    ):
+        set_cached_snapshot(
+            weather.WeatherSnapshot('clear sky', 21.5, time.time())
+        )
+        snapshot = weather.get_cached_weather()
+
+        # later reads are served by the per-process copy.
+        cache.delete(
+            weather.WEATHER_CACHE_KEY, version=weather.WEATHER_CACHE_VERSION
+        )
+        assert weather.get_cached_weather() == snapshot
+        assert scheduled_refreshes == []
+
+    @pytest.mark.django_db
+    def test_task_list_view_does_no_network_io(
+            self, client, test_user, monkeypatch, scheduled_refreshes
+    ):
+        def fail_fetch():
+            raise AssertionError('task list must not fetch the weather')
+
+        monkeypatch.setattr(weather, 'fetch_weather', fail_fetch)
+        client.force_login(user=test_user)
+
+        response = client.get(reverse('task:list'))
+        assert response.status_code == 200
+        assert 'weather_description' not in response.context
+        assert len(scheduled_refreshes) == 1
+
+        set_cached_snapshot(
+            weather.WeatherSnapshot('clear sky', 21.5, time.time())
+        )
+        response = client.get(reverse('task:list'))
+        assert response.context['weather_description'] == 'clear sky'
+        assert response.context['temp'] == 21.5
+
+
+class TestTodoWeatherAPI:
+
+    def test_weather_api_serves_shared_cache(
+            self, weather_server, scheduled_refreshes
+    ):
+        weather.refresh_weather_cache()
+
+        response = APIClient().get(reverse('task:api-v1:weather'))
+        assert response.status_code == 200
+        assert response.json() == WEATHER_PAYLOAD
+        assert weather_server.hits == 1
+
+    def test_weather_api_broker_outage_503(self, monkeypatch):
+        def fail_delay():
+            raise OperationalError('broker is down')
+
+        monkeypatch.setattr(refresh_weather, 'delay', fail_delay)
+        response = APIClient().get(reverse('task:api-v1:weather'))
+        assert response.status_code == 503
+        # the next request schedules the refresh again.
+        assert cache.get(weather.WEATHER_REVALIDATE_KEY) is None
+
+    def test_weather_api_cold_cache_503(self, scheduled_refreshes):
+        response = APIClient().get(reverse('task:api-v1:weather'))
+        assert response.status_code == 503
+        assert len(scheduled_refreshes) == 1
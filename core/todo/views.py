@@ -1,7 +1,8 @@
-import requests
-
+from django.conf import settings
 from django.core.cache import cache
 from django.shortcuts import redirect
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
 
@@ -10,19 +11,12 @@ from django.views.generic.list import ListView
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
 
-from .models import Task
+from .models import Task, TaskCounter
+from .caching import cache_fragment, get_fragment_key
 from .forms import TaskForm
-
-from decouple import config
-
-
-city_name = config("CITY_NAME")
-api_key = config("OPEN_WEATHER_API_KEY")
-units = config("UNITS")
-open_weather_url = (
-    f"https://api.openweathermap.org/data/2.5/weather?"
-    f"q={city_name}&appid={api_key}&units={units}"
-)
+from .pagination import decode_cursor, encode_cursor, paginate_keyset
+from .search import search_tasks
+from .weather import get_cached_weather
 
 
 # Create your views here.
@@ -31,31 +25,66 @@ open_weather_url = (
 class TaskListView(LoginRequiredMixin, ListView):
     """
     Render some Task list of objects, set by `self.model`.
+    Tasks are shown `page_size` at a time with a keyset cursor, like the
+    api pages, the rendered pages are cached per user generation of
+    `todo.caching`.
     """
 
     model = Task
     context_object_name = "tasks"
+    page_size = settings.TASK_PAGE_SIZE
+
+    def get_queryset(self):
+        return self.model.objects.filter(user=self.request.user)
+
+    def render_task_list(self, position, search):
+        """
+        Render one page of the user's tasks.
+        :param position: keyset position of the page, None for the first
+        :param search: search text, empty to list every task
+        :return: html of the page
+        """
+
+        tasks = self.get_queryset()
+        if search:
+            tasks = search_tasks(tasks, search)
+        tasks, last_task = paginate_keyset(tasks, position, self.page_size)
+        return render_to_string(
+            "todo/task_list_items.html",
+            {
+                "tasks": tasks,
+                "search": search,
+                "next_cursor": last_task and encode_cursor(last_task),
+            },
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["tasks"] = self.model.objects.filter(user=self.request.user)
-        task_count = context["tasks"].filter(complete=False).count()
-        context["incomplete_task_count"] = task_count
+        task_counter = TaskCounter.objects.get_for_user(self.request.user)
+        context["incomplete_task_count"] = task_counter.incomplete
 
         search = self.request.GET.get("search", "")
-        if search:
-            context["tasks"] = context["tasks"].filter(title__icontains=search)
         context["search"] = search
 
-        # getting weather from openweather api
-        if cache.get("weather") is None:
-            response = requests.get(url=open_weather_url)
-            cache.set("weather", response.json(), 60 * 20)
-
-        context["weather_description"] = cache.get("weather")["weather"][0][
-            "description"
-        ]
-        context["temp"] = cache.get("weather")["main"]["temp"]
+        try:
+            cursor = self.request.GET["cursor"]
+            position = decode_cursor(cursor, ranked=bool(search))
+        except (KeyError, ValueError):
+            cursor, position = "", None
+
+        # the rendered page is cached until the user's tasks change
+        key = get_fragment_key(self.request.user.id, cursor, search)
+        task_list_html = cache.get(key)
+        if task_list_html is None:
+            task_list_html = self.render_task_list(position, search)
+            cache_fragment(key, task_list_html, search)
+        context["task_list_html"] = mark_safe(task_list_html)
+
+        # weather is refreshed by celery beat, here we only read the cache
+        weather = get_cached_weather()
+        if weather is not None:
+            context["weather_description"] = weather.description
+            context["temp"] = weather.temp
 
         return context
 
@@ -0,0 +1,187 @@
+import time
+import uuid
+from typing import NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from django.conf import settings
+from django.core.cache import cache
+
+from kombu.exceptions import OperationalError
+
+
+WEATHER_CACHE_KEY = 'weather:snapshot'
+WEATHER_PAYLOAD_KEY = 'weather:payload'
+WEATHER_CACHE_VERSION = 1
+WEATHER_LOCK_KEY = 'weather:lock'
+WEATHER_REVALIDATE_KEY = 'weather:revalidate'
+
+
+class WeatherSnapshot(NamedTuple):
+    """
+    The part of the openweather payload that the task list shows.
+    Bump `WEATHER_CACHE_VERSION` when the fields change.
+    """
+
+    description: str
+    temp: float
+    fetched_at: float
+
+    @classmethod
+    def from_payload(cls, payload, fetched_at):
+        return cls(
+            description=payload['weather'][0]['description'],
+            temp=payload['main']['temp'],
+            fetched_at=fetched_at,
+        )
+
+    @property
+    def is_stale(self):
+        age = time.time() - self.fetched_at
+        return age > settings.WEATHER_FRESH_TIMEOUT
+
+
+# per-process copy of the snapshot in front of redis,
+# as (expires_at, snapshot).
+_local_weather = (0, None)
+
+
+def _set_local_weather(snapshot):
+    global _local_weather
+    expires_at = time.monotonic() + settings.WEATHER_LOCAL_TIMEOUT
+    _local_weather = (expires_at, snapshot)
+
+
+def _get_local_weather():
+    expires_at, snapshot = _local_weather
+    if time.monotonic() < expires_at:
+        return snapshot
+    return None
+
+
+_session = None
+
+
+def get_weather_session():
+    """
+    Return the process wide session for the openweather api, its pooled
+    keep-alive connections are reused by every fetch and failed requests
+    are retried with exponential backoff.
+    """
+
+    global _session
+    if _session is None:
+        retries = Retry(
+            total=settings.WEATHER_REQUEST_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET',),
+        )
+        adapter = HTTPAdapter(max_retries=retries, pool_maxsize=4)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _session = session
+    return _session
+
+
+def fetch_weather():
+    """
+    Get the current weather from the openweather api.
+    This is the only place that does network I/O for the weather and
+    it should be called from celery workers, not from the request path.
+    :return: openweather json payload
+    """
+
+    response = get_weather_session().get(
+        url=settings.OPEN_WEATHER_URL,
+        params={
+            'q': settings.WEATHER_CITY_NAME,
+            'appid': settings.OPEN_WEATHER_API_KEY,
+            'units': settings.WEATHER_UNITS,
+        },
+        timeout=settings.WEATHER_REQUEST_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def refresh_weather_cache():
+    """
+    Fetch the weather and store its snapshot and full payload in the
+    cache, one upstream call serves both the task list and the weather
+    api. The fetch is single-flight: the caller that adds the lock key does
+    the request and every concurrent caller returns right away.
+    :return: new snapshot, or None if another worker holds the lock.
+    """
+
+    token = uuid.uuid4().hex
+    if not cache.add(WEATHER_LOCK_KEY, token, settings.WEATHER_LOCK_TIMEOUT):
+        return None
+
+    try:
+        payload = fetch_weather()
+        snapshot = WeatherSnapshot.from_payload(payload, time.time())
+        cache.set_many(
+            {WEATHER_CACHE_KEY: snapshot, WEATHER_PAYLOAD_KEY: payload},
+            timeout=settings.WEATHER_STALE_TIMEOUT,
+            version=WEATHER_CACHE_VERSION
+        )
+        _set_local_weather(snapshot)
+        return snapshot
+    finally:
+        if cache.get(WEATHER_LOCK_KEY) == token:
+            cache.delete(WEATHER_LOCK_KEY)
+        cache.delete(WEATHER_REVALIDATE_KEY)
+
+
+def schedule_weather_refresh():
+    """
+    Ask a celery worker to refresh the weather, at most once per
+    lock timeout no matter how many requests see a stale value.
+    """
+
+    if cache.add(WEATHER_REVALIDATE_KEY, 1, settings.WEATHER_LOCK_TIMEOUT):
+        from .tasks import refresh_weather
+
+        try:
+            refresh_weather.delay()
+        except OperationalError:
+            # the broker is down, the stale weather is still served and
+            # the next request tries again.
+            cache.delete(WEATHER_REVALIDATE_KEY)
+
+
+def get_cached_weather():
+    """
+    Return the weather snapshot without doing any network I/O.
+    It is read from the per-process copy first and from redis at most
+    once per `WEATHER_LOCAL_TIMEOUT`. A stale snapshot is still returned
+    (stale-while-revalidate) and a refresh is scheduled in the background.
+    :return: WeatherSnapshot or None on a cold cache.
+    """
+
+    snapshot = _get_local_weather()
+    if snapshot is None:
+        snapshot = cache.get(WEATHER_CACHE_KEY, version=WEATHER_CACHE_VERSION)
+        if snapshot is not None:
+            _set_local_weather(snapshot)
+
+    if snapshot is None or snapshot.is_stale:
+        schedule_weather_refresh()
+    return snapshot
+
+
+def get_cached_weather_payload():
+    """
+    Return the full openweather payload stored by the last refresh,
+    without doing any network I/O.
+    :return: openweather json payload or None on a cold cache.
+    """
+
+    payload = cache.get(WEATHER_PAYLOAD_KEY, version=WEATHER_CACHE_VERSION)
+    if payload is None:
+        schedule_weather_refresh()
+    return payload